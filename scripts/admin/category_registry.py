@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Registro en memoria de categorías y números ocupados de songs/.
+
+Sustituye a releer indice.json + `iterdir()` en cada petición: se construye una
+vez y el admin lo mantiene al día avisando de cada fichero escrito o borrado
+(`file_written` / `file_removed`, vía `songs_changed`).
+
+Por carpeta guarda los nombres de fichero y un bitmap (int) de números de slot
+ocupados: el bit n está a 1 si hay algún fichero «NN.…» con NN = n. Con eso,
+el primer hueco libre, el siguiente número o si un número está libre son
+operaciones de bits, sin tocar disco.
+
+Los cambios hechos fuera del admin (git pull, ediciones a mano) se detectan
+con una revalidación barata (stat de indice.json, de songs/ y de cada
+carpeta) como mucho cada `max_age` segundos. Los avisos no tocan la mtime
+guardada, así que una carpeta escrita por el admin se relee una vez en la
+siguiente revalidación (por si además cambió por fuera).
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CATEGORY_RX = re.compile(r"\s*([A-Z](?:\+\d+)?)\.")
+NUMBER_RX = re.compile(r"(\d+)\.")
+
+# Segundos entre revalidaciones contra disco
+DEFAULT_MAX_AGE = 5.0
+
+
+def _number(name: str) -> Optional[int]:
+    m = NUMBER_RX.match(name)
+    return int(m.group(1)) if m else None
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def lowest_free(mask: int, start: int = 1) -> int:
+    """Primer n >= start cuyo bit está a 0 en `mask`."""
+    free = ~(mask >> start)
+    return start + (free & -free).bit_length() - 1
+
+
+class _Folder:
+    """Ficheros y bitmap de slots de una carpeta de categoría."""
+
+    __slots__ = ("files", "mask", "mtime")
+
+    def __init__(self) -> None:
+        self.files: Dict[str, Optional[int]] = {}
+        self.mask = 0
+        self.mtime: Optional[int] = None
+
+    def add(self, name: str) -> None:
+        n = _number(name)
+        self.files[name] = n
+        if n is not None:
+            self.mask |= 1 << n
+
+    def discard(self, name: str) -> None:
+        n = self.files.pop(name, None)
+        if n is not None and n not in self.files.values():
+            self.mask &= ~(1 << n)
+
+
+class CategoryRegistry:
+    """Categorías (carpetas «X. Nombre» + indice.json) y slots por carpeta."""
+
+    def __init__(self, songs_dir: Path, indice_json: Path,
+                 max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.songs_dir = songs_dir
+        self.indice_json = indice_json
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._cats: List[dict] = []
+        self._by_letter: Dict[str, dict] = {}
+        self._folders: Dict[str, _Folder] = {}
+        self._stamp: Tuple[Optional[int], Optional[int]] = (None, None)
+        self._checked_at = 0.0
+        self.reload()
+
+    # ── Carga / revalidación ──
+
+    def _load_indice(self) -> Dict[str, dict]:
+        if self.indice_json.exists():
+            with open(self.indice_json, encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _scan_folder(self, name: str) -> _Folder:
+        folder = _Folder()
+        path = self.songs_dir / name
+        folder.mtime = _mtime(path)
+        if path.exists():
+            for f in path.iterdir():
+                folder.add(f.name)
+        return folder
+
+    def reload(self) -> None:
+        """Relee indice.json y todas las carpetas (mismo resultado que el
+        antiguo list_categories())."""
+        with self._lock:
+            by_letter: Dict[str, dict] = {}
+            for key, info in self._load_indice().items():
+                title = info.get("categoryTitle", "")
+                m = CATEGORY_RX.match(title)
+                if m:
+                    by_letter[m.group(1)] = {
+                        "key": key,
+                        "title": title,
+                        "order": info.get("order", 999),
+                    }
+            cats = []
+            folders: Dict[str, _Folder] = {}
+            if self.songs_dir.exists():
+                for p in sorted(self.songs_dir.iterdir()):
+                    if not p.is_dir():
+                        continue
+                    m = CATEGORY_RX.match(p.name)
+                    if not m:
+                        continue
+                    letter = m.group(1)
+                    info = by_letter.get(letter, {})
+                    cats.append({
+                        "letter": letter,
+                        "folder": p.name,
+                        "title": info.get("title") or p.name,
+                        "indice_key": info.get("key"),
+                        "order": info.get("order", 999),
+                    })
+                    folders[p.name] = self._scan_folder(p.name)
+            cats.sort(key=lambda x: (x["order"], x["letter"]))
+            self._cats = cats
+            self._by_letter = {}
+            for c in cats:
+                self._by_letter.setdefault(c["letter"], c)
+            self._folders = folders
+            self._stamp = (_mtime(self.indice_json), _mtime(self.songs_dir))
+            self._checked_at = time.monotonic()
+
+    def revalidate(self) -> bool:
+        """Comprueba contra disco (solo stats) y recarga lo que haya cambiado.
+        Devuelve True si hubo que releer algo."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if (_mtime(self.indice_json), _mtime(self.songs_dir)) != self._stamp:
+                self.reload()
+                return True
+            changed = False
+            for name, folder in self._folders.items():
+                if _mtime(self.songs_dir / name) != folder.mtime:
+                    self._folders[name] = self._scan_folder(name)
+                    changed = True
+            return changed
+
+    def revalidate_if_due(self) -> None:
+        if time.monotonic() - self._checked_at > self.max_age:
+            self.revalidate()
+
+    # ── Avisos de escritura (desde songs_changed) ──
+
+    def _folder_for(self, path: Path) -> Optional[_Folder]:
+        if path.parent.parent != self.songs_dir:
+            return None
+        return self._folders.get(path.parent.name)
+
+    def file_written(self, path: Path) -> None:
+        with self._lock:
+            folder = self._folder_for(path)
+            if folder is None:
+                if path.parent.parent == self.songs_dir and CATEGORY_RX.match(path.parent.name):
+                    self.reload()  # carpeta de categoría nueva
+                return
+            folder.add(path.name)
+
+    def file_removed(self, path: Path) -> None:
+        with self._lock:
+            folder = self._folder_for(path)
+            if folder is None:
+                return
+            folder.discard(path.name)
+
+    # ── Consultas (sin disco) ──
+
+    def categories(self) -> List[dict]:
+        with self._lock:
+            return [dict(c) for c in self._cats]
+
+    def get(self, letter: str) -> Optional[dict]:
+        with self._lock:
+            cat = self._by_letter.get((letter or "").upper().strip())
+            return dict(cat) if cat else None
+
+    def files(self, folder_name: str) -> List[str]:
+        """Nombres de fichero de una carpeta, ordenados."""
+        with self._lock:
+            folder = self._folders.get(folder_name)
+            return sorted(folder.files) if folder else []
+
+    def slot_mask(self, folder_name: str) -> int:
+        with self._lock:
+            folder = self._folders.get(folder_name)
+            return folder.mask if folder else 0
+
+    def is_free(self, folder_name: str, number: int) -> bool:
+        return not (self.slot_mask(folder_name) >> number) & 1
+
+    def first_free(self, folder_name: str, start: int = 1) -> int:
+        return lowest_free(self.slot_mask(folder_name), start)
+
+    def next_number(self, folder_name: str) -> int:
+        """Máximo número usado + 1 (como docx2chordpro.next_song_number)."""
+        return max(self.slot_mask(folder_name).bit_length(), 1)
+
+    def preferred(self, folder_name: str, hint: Optional[int] = None) -> int:
+        """`hint` si está libre; si no, el primer hueco desde 1."""
+        if isinstance(hint, int) and hint > 0 and self.is_free(folder_name, hint):
+            return hint
+        return self.first_free(folder_name)
+
+    def knows(self, folder: Path) -> bool:
+        return folder.parent == self.songs_dir and folder.name in self._folders
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tareas en segundo plano del admin (git, Firebase, doceacordes, build-json).
+
+Las operaciones que esperan a la red (push de 60 s, fetch, descargas) no
+deben bloquear el catálogo ni el editor. Un endpoint lento puede lanzarse como
+tarea: se ejecuta en un hilo, devuelve enseguida su id y el cliente consulta
+`/api/jobs/<id>` o se suscribe a `/api/jobs/<id>/events` (SSE).
+
+La función de la tarea recibe un `progress(message, pct=None)` para ir
+informando y devuelve `(payload, http_status)`, igual que los endpoints
+síncronos, así que el mismo código sirve para los dos modos.
+
+Las tareas con el mismo `exclusive` (p. ej. "git") se ejecutan de una en una:
+dos `git` a la vez acabarían peleándose por `.git/index.lock`. Con
+`dedupe=True`, pedir una tarea de un tipo que ya está en marcha devuelve la
+existente en vez de lanzar otra (dos clics en «generar JSON» = una build).
+
+Cancelar es cooperativo: `cancel(id)` marca la tarea y la función lo consulta
+con `progress.cancelled()`; si después termina con una excepción, la tarea
+queda como `cancelled`. Una tarea cancelada mientras espera en la cola (p. ej.
+un push detrás de otro `git`) termina como `cancelled` sin llegar a ejecutarse.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Estados de una tarea
+QUEUED, RUNNING, DONE, ERROR, CANCELLED = "queued", "running", "done", "error", "cancelled"
+
+# Tareas terminadas que se conservan para poder consultarlas
+DEFAULT_KEEP = 50
+
+
+class Progress:
+    """Lo que recibe la función de la tarea: `progress(message, pct)` informa
+    y `progress.cancelled()` dice si se ha pedido cancelar."""
+
+    def __init__(self, manager: "Optional[JobManager]" = None,
+                 job: "Optional[Job]" = None) -> None:
+        self._manager = manager
+        self._job = job
+
+    def __call__(self, message: str = "", pct: Optional[float] = None) -> None:
+        if self._manager is not None and self._job is not None:
+            self._manager._progress(self._job, message, pct)
+
+    def cancelled(self) -> bool:
+        return self._job is not None and self._job.cancel_requested.is_set()
+
+
+JobFn = Callable[[Progress], Tuple[dict, int]]
+
+# `progress` para cuando la función se ejecuta en modo síncrono
+no_progress = Progress()
+
+
+class Job:
+    """Una tarea: estado, eventos de progreso y resultado final."""
+
+    def __init__(self, kind: str, exclusive: Optional[str] = None) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.exclusive = exclusive
+        self.status = QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.events: List[dict] = []
+        self.result: Optional[dict] = None
+        self.http_status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, ERROR, CANCELLED)
+
+    def to_dict(self, include_events: bool = True) -> dict:
+        d = {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "duration": (self.finished - self.started)
+            if self.started and self.finished else None,
+            "progress": self.events[-1] if self.events else None,
+            "result": self.result,
+            "http_status": self.http_status,
+            "error": self.error,
+            "cancel_requested": self.cancel_requested.is_set(),
+        }
+        if include_events:
+            d["events"] = list(self.events)
+        return d
+
+
+class JobManager:
+    """Lanza tareas en hilos y guarda su estado en memoria."""
+
+    def __init__(self, keep: int = DEFAULT_KEEP) -> None:
+        self.keep = keep
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._exclusive: Dict[str, threading.Lock] = {}
+
+    def lock(self, name: Optional[str]) -> "threading.Lock":
+        """Lock compartido por las tareas (y llamadas síncronas) de un grupo."""
+        with self._cond:
+            if name is None:
+                return threading.Lock()  # sin grupo: no serializa nada
+            return self._exclusive.setdefault(name, threading.Lock())
+
+    # ── Lanzar / ejecutar ──
+
+    def submit(self, kind: str, fn: JobFn, exclusive: Optional[str] = None,
+               dedupe: bool = False) -> Job:
+        with self._cond:
+            if dedupe:
+                for running in self._jobs.values():
+                    if running.kind == kind and not running.done:
+                        return running
+            job = Job(kind, exclusive)
+            self._jobs[job.id] = job
+            self._prune()
+        threading.Thread(target=self._run, args=(job, fn), daemon=True,
+                         name=f"job-{kind}-{job.id}").start()
+        return job
+
+    def _run(self, job: Job, fn: JobFn) -> None:
+        with self.lock(job.exclusive):
+            if job.cancel_requested.is_set():
+                # Cancelada mientras esperaba el lock: no llega a ejecutarse
+                now = time.time()
+                self._set(job, status=CANCELLED, started=now, finished=now,
+                          error="Cancelada antes de empezar", http_status=409,
+                          result={"ok": False, "cancelled": True})
+                return
+            self._set(job, status=RUNNING, started=time.time())
+            try:
+                payload, status = fn(Progress(self, job))
+                final = dict(status=DONE, result=payload, http_status=status)
+            except Exception as e:
+                if job.cancel_requested.is_set():
+                    msg = str(e) or "Cancelada"
+                    final = dict(status=CANCELLED, error=msg, http_status=409,
+                                 result={"ok": False, "cancelled": True, "error": msg})
+                else:
+                    traceback.print_exc()
+                    final = dict(status=ERROR, error=str(e), http_status=500,
+                                 result={"ok": False, "error": str(e)})
+            # estado final y hora de fin a la vez: quien espera ve la tarea completa
+            self._set(job, finished=time.time(), **final)
+
+    def _set(self, job: Job, **attrs) -> None:
+        with self._cond:
+            for k, v in attrs.items():
+                setattr(job, k, v)
+            self._cond.notify_all()
+
+    def _progress(self, job: Job, message: str, pct: Optional[float]) -> None:
+        with self._cond:
+            job.events.append({"t": time.time(), "message": message, "pct": pct})
+            self._cond.notify_all()
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.done]
+        for j in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[j.id]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is not None and not job.done:
+            job.cancel_requested.set()
+            self._set(job)  # despierta a quien espera eventos
+        return job
+
+    # ── Consultas ──
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> List[Job]:
+        with self._cond:
+            return [j for j in reversed(self._jobs.values())
+                    if kind is None or j.kind == kind]
+
+    def wait(self, job: Job, seen: int = 0, timeout: float = 15.0) -> Tuple[List[dict], bool]:
+        """Espera a que haya eventos nuevos (a partir de `seen`) o a que la
+        tarea termine. Devuelve (eventos_nuevos, terminada)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(job.events) <= seen and not job.done:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return job.events[seen:], job.done
+
+    def wait_done(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """Bloquea hasta que la tarea termine (o venza `timeout`)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: job.done, timeout)
@@ -2,19 +2,29 @@
 # -*- coding: utf-8 -*-
 """Escaneo / conversión NO interactiva de archivos LaTeX (.tex) → ChordPro.
 
-Reutiliza la lógica de `tab2chordpro.py` (carpeta padre) pero parchea su
-`translate()` para que NUNCA pregunte por consola (los acordes desconocidos
-se devuelven tal cual y se reportan como aviso).
+Reutiliza la lógica de `tab2chordpro.py` (carpeta padre) con un
+`ChordTranslator` por conversión que NUNCA pregunta por consola (los acordes
+desconocidos se devuelven tal cual y se reportan como aviso). No hay estado
+global: se puede parsear desde varios hilos o procesos a la vez.
+
+Un .tex puede ser un cancionero entero (varios `\\beginsong`): se trocea
+mientras se lee y cada canción aparece en el listado como `fichero.tex#N`.
 """
 from __future__ import annotations
 
+import json
+import os
 import re
 import shutil
+import subprocess
 import sys
+import threading
 import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 SCRIPTS_DIR = SCRIPT_DIR.parent
@@ -23,33 +33,9 @@ INPUT_DIR = SCRIPTS_DIR / "input"
 PROCESSED_DIR = INPUT_DIR / "processed"
 
 sys.path.insert(0, str(SCRIPTS_DIR))
+import latex_songs as ls  # noqa: E402
 import tab2chordpro as t2c  # noqa: E402
 
-# ─────────── Parche: translate() sin prompts ─────────── #
-
-_unknown_collected: List[str] = []
-
-
-def _translate_silent(tok: str, line_no: int = 0) -> str:
-    if not tok:
-        return tok
-    t = t2c.clean_chord(tok)
-    if '/' in t:
-        left, right = t.split('/', 1)
-        return _translate_silent(left, line_no) + '/' + _translate_silent(right, line_no)
-    if t in t2c.SP_EN:
-        return t2c.SP_EN[t]
-    if t.lower() in t2c.SP_EN:
-        return t2c.SP_EN[t.lower()]
-    if t2c.CHORD_RE.match(t):
-        return t
-    _unknown_collected.append(tok)
-    return t
-
-
-# Sustituimos la función del módulo (lo usa internamente latex_to_chordpro)
-t2c.translate = _translate_silent
-
 # ─────────── Mapeo de carpetas LaTeX → letra de categoría ─────────── #
 
 LATEX_CATEGORY_MAP: Dict[str, str] = {
@@ -75,8 +61,15 @@ LATEX_CATEGORY_MAP: Dict[str, str] = {
 }
 
 
+def _fold(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s or "")
+    return "".join(ch for ch in s if not unicodedata.combining(ch)).lower().strip()
+
+
 def latex_category_letter(folder_name: str) -> Optional[str]:
-    return LATEX_CATEGORY_MAP.get((folder_name or "").lower().strip())
+    """Letra de categoría para una carpeta o un apartado de cancionero
+    (sin distinguir tildes ni mayúsculas: «Comunión» → I)."""
+    return LATEX_CATEGORY_MAP.get(_fold(folder_name))
 
 
 # ─────────── Conversión de un .tex ─────────── #
@@ -92,13 +85,17 @@ def slugify(s: str) -> str:
 def parse_latex_song(tex_path: Path) -> dict:
     """Convierte un .tex a un dict con metadatos + cuerpo ChordPro (sin guardarlo)."""
     content = tex_path.read_text(encoding="utf-8")
+    return parse_latex_text(content, tex_path.stem.replace("_", " ").strip().title())
+
 
+def parse_latex_text(content: str, fallback_title: str) -> dict:
+    """Como `parse_latex_song`, pero sobre el texto de una canción."""
     title_m = re.search(r"\\beginsong\{([^}]+)\}", content)
     title = ""
     if title_m:
         title = title_m.group(1).replace(r"\\", " — ").strip()
     if not title:
-        title = tex_path.stem.replace("_", " ").strip().title()
+        title = fallback_title
 
     artist_m = re.search(r"by=\{([^}]+)\}", content)
     artist = artist_m.group(1).strip() if artist_m else ""
@@ -106,19 +103,21 @@ def parse_latex_song(tex_path: Path) -> dict:
     tono_m = re.search(r"\\\[([A-Ga-g][#b]?m?[^\]\s/]*)", content)
     tono_raw = tono_m.group(1) if tono_m else ""
     try:
-        tono = t2c.normalize_key(tono_raw) if tono_raw else ""
+        tono = t2c.normalize_key(tono_raw, t2c.ChordTranslator()) if tono_raw else ""
     except Exception:
         tono = ""
 
-    # Conversión completa del cuerpo (silenciosa)
-    global _unknown_collected
-    _unknown_collected = []
+    # Conversión completa del cuerpo (silenciosa, con su propio traductor)
+    translator = t2c.ChordTranslator()
+    macros: List[dict] = []
     try:
-        body, transpose_val, capo_val, musica_val = t2c.latex_to_chordpro(content)
+        song = ls.convert(content, translator)
+        body, transpose_val, capo_val, musica_val = song.body, song.transpose, song.capo, song.musica
+        macros = [{"line": line, "macro": name} for line, name in song.unknown_macros]
     except Exception as e:
         body, transpose_val, capo_val, musica_val = "", "", "", ""
-        _unknown_collected.append(f"<error: {e}>")
-    unknown = sorted(set(_unknown_collected))
+        translator.unknown.append(f"<error: {e}>")
+    unknown = sorted(set(translator.unknown))
 
     return {
         "title": title,
@@ -129,9 +128,171 @@ def parse_latex_song(tex_path: Path) -> dict:
         "musica": musica_val or "",
         "body": body or "",
         "unknown_chords": unknown,
+        "unknown_macros": macros,
+    }
+
+
+def _error_parse(tex_path: Path, e: Exception) -> dict:
+    return {
+        "title": tex_path.stem.replace("_", " ").title(),
+        "artist": "", "key": "", "capo": "", "transpose": "",
+        "musica": "", "body": "", "unknown_chords": [f"<error: {e}>"],
+        "unknown_macros": [],
     }
 
 
+# ─────────── Cancioneros: varias canciones en un .tex ─────────── #
+
+class SongChunk(NamedTuple):
+    index: int      # 1-based dentro del fichero
+    line: int       # línea del \beginsong
+    section: str    # último \songchapter / \section visto antes de la canción
+    text: str       # de \beginsong a \endsong, ambos incluidos
+
+
+_BEGIN_RE = re.compile(r"\\beginsong\b")
+_END_RE = re.compile(r"\\endsong\b")
+_SECTION_RE = re.compile(r"\\(?:songchapter|songsection|chapter|section)\*?\{([^}]*)\}")
+_COMMENT_RE = re.compile(r"(?<!\\)%.*")
+
+# Un cancionero con al menos este número de canciones se convierte en varios
+# procesos (cada canción es independiente); por debajo no compensa arrancarlos.
+# Cada proceso recibe lotes de BOOK_BATCH canciones.
+BOOK_PARALLEL_MIN = 64
+BOOK_BATCH = 32
+BOOK_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def iter_songbook(tex_path: Path) -> Iterator[SongChunk]:
+    """Trocea un .tex en canciones leyendo línea a línea (sin cargar el
+    fichero entero). Lo que hay fuera de \\beginsong…\\endsong solo se mira
+    para saber el apartado en curso."""
+    section = ""
+    buf: List[str] = []
+    start = 0
+    index = 0
+    with tex_path.open(encoding="utf-8") as f:
+        for no, line in enumerate(f, 1):
+            code = _COMMENT_RE.sub("", line)
+            if not buf:
+                m = _BEGIN_RE.search(code)
+                if not m:
+                    for sm in _SECTION_RE.finditer(code):
+                        section = sm.group(1).strip()
+                    continue
+                line, code = line[m.start():], code[m.start():]
+                start = no
+            buf.append(line)
+            m = _END_RE.search(code)
+            if m:
+                index += 1
+                buf[-1] = line[:m.end()] + "\n"
+                yield SongChunk(index, start, section, "".join(buf))
+                buf = []
+    if buf:   # \beginsong sin \endsong al final del fichero
+        yield SongChunk(index + 1, start, section, "".join(buf))
+
+
+def _parse_chunk(args: Tuple[str, SongChunk]) -> dict:
+    stem, chunk = args
+    parsed = parse_latex_text(chunk.text, f"{stem} {chunk.index}")
+    parsed.update(song_index=chunk.index, line=chunk.line, section=chunk.section,
+                  source=chunk.text)
+    return parsed
+
+
+def _convert_in_worker(stem: str, batch: List[SongChunk]) -> List[dict]:
+    """Convierte un lote en un intérprete nuevo (`latex_import.py --worker`).
+    No se usa multiprocessing: el admin llama desde hilos de Flask y de la
+    precarga (un fork con hilos puede quedarse bloqueado) y con «spawn» cada
+    worker volvería a importar server.py como __mp_main__. Así el worker solo
+    importa este módulo y fork+exec es seguro aunque haya hilos."""
+    payload = json.dumps({"stem": stem, "chunks": [c._asdict() for c in batch]},
+                         ensure_ascii=False)
+    proc = subprocess.run([sys.executable, str(Path(__file__).resolve()), "--worker"],
+                          input=payload.encode("utf-8"), capture_output=True)
+    if proc.returncode != 0:
+        err = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(f"Worker LaTeX: {err[-1] if err else proc.returncode}")
+    return json.loads(proc.stdout.decode("utf-8"))
+
+
+def _worker_main() -> None:
+    data = json.loads(sys.stdin.buffer.read().decode("utf-8"))
+    out = [_parse_chunk((data["stem"], SongChunk(**c))) for c in data["chunks"]]
+    sys.stdout.buffer.write(json.dumps(out, ensure_ascii=False).encode("utf-8"))
+
+
+def parse_latex_file(tex_path: Path, workers: Optional[int] = None) -> List[dict]:
+    """Todas las canciones de un .tex. Con una sola, es `parse_latex_song`
+    (el fichero entero, como siempre). En un cancionero grande las canciones
+    se van mandando por lotes a varios procesos según se leen."""
+    chunks = iter_songbook(tex_path)
+    head = list(islice(chunks, BOOK_PARALLEL_MIN))
+    if len(head) <= 1:
+        return [parse_latex_song(tex_path)]
+    stem = tex_path.stem.replace("_", " ").strip().title()
+    workers = BOOK_WORKERS if workers is None else workers
+    songs = chain(head, chunks)
+    if workers > 1 and len(head) == BOOK_PARALLEL_MIN:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            while True:
+                batch = list(islice(songs, BOOK_BATCH))
+                if not batch:
+                    break
+                futures.append(pool.submit(_convert_in_worker, stem, batch))
+            return [parsed for f in futures for parsed in f.result()]
+    return [_parse_chunk((stem, c)) for c in songs]
+
+
+# ─────────── Cache de parseo por fichero ─────────── #
+
+# {ruta: ((mtime_ns, tamaño), canciones)}. Un .tex solo se vuelve a convertir
+# si cambia su mtime o su tamaño; el cuerpo se guarda para preview/import.
+_parse_cache: Dict[str, Tuple[Tuple[int, int], List[dict]]] = {}
+_parse_lock = threading.Lock()   # solo protege el dict; el parseo va fuera
+
+
+def _stat_key(st: os.stat_result) -> Tuple[int, int]:
+    return (st.st_mtime_ns, st.st_size)
+
+
+def parse_latex_file_cached(tex_path: Path, st: Optional[os.stat_result] = None) -> List[dict]:
+    """`parse_latex_file` cacheado por ruta + mtime + tamaño (los errores no
+    se cachean). La lista y sus dicts son compartidos: no modificarlos."""
+    key = str(tex_path)
+    stamp = _stat_key(st or tex_path.stat())
+    hit = _parse_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    # Sin lock mientras se convierte: dos hilos con el mismo fichero sin
+    # cachear lo parsean los dos (mismo resultado) y gana el primero.
+    songs = parse_latex_file(tex_path)
+    with _parse_lock:
+        hit = _parse_cache.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        _parse_cache[key] = (stamp, songs)
+        return songs
+
+
+def parse_latex_cached(tex_path: Path, st: Optional[os.stat_result] = None,
+                       song: Optional[int] = None) -> dict:
+    """Una canción del .tex (la `song`-ésima, 1-based; la primera si no se
+    indica), a partir de `parse_latex_file_cached`."""
+    songs = parse_latex_file_cached(tex_path, st)
+    i = (song or 1) - 1
+    if not 0 <= i < len(songs):
+        raise FileNotFoundError(f"{tex_path.name}#{song}")
+    return songs[i]
+
+
+def clear_parse_cache() -> None:
+    with _parse_lock:
+        _parse_cache.clear()
+
+
 def _add_trailing_space_after_chord(text: str) -> str:
     """Si una línea acaba en ']' (acorde suelto), añade un espacio final."""
     out = []
@@ -164,30 +325,61 @@ def render_latex_cho(parsed: dict) -> str:
 
 # ─────────── Escaneo de toda la carpeta /input ─────────── #
 
-def scan_latex_files(include_parsed: bool = False) -> List[dict]:
-    """Lista todos los .tex de scripts/input/* (excluye processed/)."""
-    out: List[dict] = []
+TexFile = Tuple[str, Path, os.stat_result]   # (carpeta, ruta, stat)
+SONG_ID_SEP = "#"   # "scripts/input/libro/cancionero.tex#12" → canción 12
+
+
+def list_tex_files() -> List[TexFile]:
+    """Los .tex de scripts/input/* (excluye processed/), ordenados, con un
+    único stat por fichero."""
+    out: List[TexFile] = []
     if not INPUT_DIR.exists():
         return out
     for cat_dir in sorted(INPUT_DIR.iterdir()):
         if not cat_dir.is_dir() or cat_dir.name == "processed":
             continue
-        cat_letter = latex_category_letter(cat_dir.name)
-        for tex in sorted(cat_dir.glob("*.tex")):
-            rel = str(tex.relative_to(REPO_DIR))
-            try:
-                parsed = parse_latex_song(tex)
-            except Exception as e:
-                parsed = {
-                    "title": tex.stem.replace("_", " ").title(),
-                    "artist": "", "key": "", "capo": "", "transpose": "",
-                    "musica": "", "body": "", "unknown_chords": [f"<error: {e}>"],
-                }
+        with os.scandir(cat_dir) as it:
+            entries = sorted((e for e in it if e.name.endswith(".tex") and not e.name.startswith(".")
+                              and e.is_file()),
+                             key=lambda e: e.name)
+        for e in entries:
+            out.append((cat_dir.name, Path(e.path), e.stat()))
+    return out
+
+
+def files_snapshot(files: List[TexFile]) -> Tuple[Tuple[str, int, int], ...]:
+    """Huella de `list_tex_files()` (rutas + mtimes + tamaños) para invalidar caches."""
+    return tuple((str(path),) + _stat_key(st) for _, path, st in files)
+
+
+def scan_latex_files(include_parsed: bool = False,
+                     files: Optional[List[TexFile]] = None) -> List[dict]:
+    """Lista todos los .tex de scripts/input/* (excluye processed/), una
+    entrada por canción (sin las de cancioneros ya importadas). Solo se
+    convierten los que han cambiado desde el último escaneo."""
+    files = list_tex_files() if files is None else files
+    imported = _load_imported()
+    out: List[dict] = []
+    for folder, tex, st in files:
+        rel = str(tex.relative_to(REPO_DIR))
+        try:
+            songs = parse_latex_file_cached(tex, st)
+        except Exception as e:
+            songs = [_error_parse(tex, e)]
+        book = len(songs) > 1
+        done = _imported_indices(imported.get(_book_key(tex), {}), songs) if book else set()
+        for parsed in songs:
+            if parsed.get("song_index") in done:
+                continue   # ya importada en una tanda anterior
+            section = parsed.get("section", "")
             entry = {
-                "id": rel,
+                "id": f"{rel}{SONG_ID_SEP}{parsed['song_index']}" if book else rel,
                 "filename": tex.name,
-                "latex_folder": cat_dir.name,
-                "category_letter": cat_letter,
+                "latex_folder": folder,
+                "latex_section": section,
+                "song_index": parsed.get("song_index"),
+                "category_letter": (latex_category_letter(section)
+                                    or latex_category_letter(folder)),
                 "title": parsed["title"],
                 "artist": parsed["artist"],
                 "key": parsed["key"],
@@ -195,16 +387,34 @@ def scan_latex_files(include_parsed: bool = False) -> List[dict]:
                 "transpose": parsed["transpose"],
                 "musica": parsed["musica"],
                 "unknown_chords": parsed["unknown_chords"],
-                "suggested_slug": slugify(tex.stem.replace("_", " ")),
+                "unknown_macros": parsed["unknown_macros"],
+                "suggested_slug": slugify(parsed["title"] if book else tex.stem.replace("_", " ")),
             }
             if include_parsed:
                 entry["body"] = parsed["body"]
             out.append(entry)
+    # Olvidar los que ya no están (importados, movidos a processed/, borrados)
+    present = {str(path) for _, path, _ in files}
+    with _parse_lock:
+        for key in [k for k in _parse_cache if k not in present]:
+            del _parse_cache[key]
     return out
 
 
+def split_tex_id(rel_id: str) -> Tuple[str, Optional[int]]:
+    """Separa el id del listado en (ruta relativa, nº de canción o None).
+    Solo cuenta como canción un `#` seguido únicamente de dígitos al final:
+    `salmo#23.tex` es un nombre de fichero, no la canción 23."""
+    rel, sep, num = (rel_id or "").rpartition(SONG_ID_SEP)
+    if not sep or not num.isdigit():
+        return rel_id, None
+    if int(num) < 1:
+        raise ValueError(f"Id de canción inválido: {rel_id}")
+    return rel, int(num)
+
+
 def resolve_tex_path(rel_id: str) -> Path:
-    p = (REPO_DIR / rel_id).resolve()
+    p = (REPO_DIR / split_tex_id(rel_id)[0]).resolve()
     # Seguridad: debe estar bajo INPUT_DIR
     try:
         p.relative_to(INPUT_DIR.resolve())
@@ -215,8 +425,73 @@ def resolve_tex_path(rel_id: str) -> Path:
     return p
 
 
+def load_tex_song(rel_id: str) -> Tuple[Path, dict]:
+    """(ruta, parseo) de un id del listado; FileNotFoundError si el
+    cancionero ya no tiene esa canción."""
+    path = resolve_tex_path(rel_id)
+    return path, parse_latex_cached(path, song=split_tex_id(rel_id)[1])
+
+
+# ─────────── Canciones ya importadas de cada cancionero ─────────── #
+
+# Un cancionero se revisa en varias tandas: qué canciones ya se importaron se
+# guarda en scripts/input/.songbooks-imported.json, {fichero: {nº: título}}.
+# Una entrada solo vale si el título sigue coincidiendo (el .tex puede editarse).
+IMPORTED_NAME = ".songbooks-imported.json"
+_imported_lock = threading.Lock()
+
+
+def _imported_file() -> Path:
+    return INPUT_DIR / IMPORTED_NAME
+
+
+def _book_key(tex_path: Path) -> str:
+    return tex_path.resolve().relative_to(INPUT_DIR.resolve()).as_posix()
+
+
+def _load_imported() -> Dict[str, Dict[str, str]]:
+    try:
+        data = json.loads(_imported_file().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _save_imported(data: Dict[str, Dict[str, str]]) -> None:
+    path = _imported_file()
+    if not data:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+                   encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _imported_indices(record: Dict[str, str], songs: List[dict]) -> set:
+    return {p["song_index"] for p in songs
+            if record.get(str(p.get("song_index"))) == p["title"]}
+
+
+def mark_imported(tex_path: Path, parsed: dict) -> Tuple[int, int]:
+    """Apunta una canción de un cancionero como importada. Devuelve
+    (importadas, total) del cancionero."""
+    songs = parse_latex_file_cached(tex_path)
+    with _imported_lock:
+        data = _load_imported()
+        record = data.setdefault(_book_key(tex_path), {})
+        record[str(parsed["song_index"])] = parsed["title"]
+        _save_imported(data)
+    return len(_imported_indices(record, songs)), len(songs)
+
+
 def move_to_processed(tex_path: Path) -> Path:
-    """Mueve el .tex a scripts/input/processed/ (manteniendo nombre)."""
+    """Mueve el .tex a scripts/input/processed/ (manteniendo nombre). Si era
+    un cancionero, olvida también qué canciones se habían importado."""
+    with _imported_lock:
+        data = _load_imported()
+        if data.pop(_book_key(tex_path), None) is not None:
+            _save_imported(data)
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     dest = PROCESSED_DIR / tex_path.name
     if dest.exists():
@@ -224,3 +499,7 @@ def move_to_processed(tex_path: Path) -> Path:
         dest = PROCESSED_DIR / f"{tex_path.stem}.dup-{ts}.tex"
     shutil.move(str(tex_path), str(dest))
     return dest
+
+
+if __name__ == "__main__" and sys.argv[1:] == ["--worker"]:
+    _worker_main()
@@ -16,7 +16,17 @@ Endpoints (ver /api/health para listado):
   GET  /api/docx/preview?id=N       → conversión sin guardar
   POST /api/docx/import             → body: {ids: [N,...]} importa con TO DO
   POST /api/reorder                 → body: {category, order: [filename,...]}
-  POST /api/build-json              → ejecuta crear_songs_json.py
+  POST /api/build-json              → genera songs-vX.json (en proceso, una build a la vez)
+  GET  /api/build-json/history      → duraciones de las últimas builds
+  GET  /api/search?q=...            → búsqueda full-text (letra, acordes, metadatos)
+  POST /api/song/transpose?path=... → body: {semis | key, save?} transpone una canción
+  POST /api/category/transpose      → body: {category, semis | key, save?}
+  GET  /api/jobs/<id>               → estado de una tarea en segundo plano
+  GET  /api/jobs/<id>/events        → progreso de la tarea por SSE
+  POST /api/jobs/<id>/cancel        → pide cancelar la tarea
+
+Los endpoints lentos (git, Firebase, doceacordes, build-json) aceptan
+`?async=1`: devuelven 202 con {job} y siguen en un hilo (ver jobs.py).
 """
 from __future__ import annotations
 
@@ -26,17 +36,17 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 import unicodedata
-import urllib.error
-import urllib.parse
-import urllib.request
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from flask import Flask, jsonify, request, send_from_directory, abort
-from werkzeug.exceptions import HTTPException
+_T0 = time.perf_counter()   # para el informe de arranque (ver startup.py)
+
+from flask import Flask, Response, jsonify, request, send_from_directory, abort  # noqa: E402
+from werkzeug.exceptions import HTTPException  # noqa: E402
 
 # Importar el conversor docx como módulo (mismo paquete scripts/)
 SCRIPT_DIR = Path(__file__).resolve().parent
@@ -53,11 +63,26 @@ IGNORED_FILE = SCRIPT_DIR / "import-ignored.json"
 PETICIONES_DIR = REPO_DIR / "peticiones"
 PETICIONES_FILE = PETICIONES_DIR / "peticiones.json"
 
+# Duraciones de las últimas generaciones de songs-vX.json (local, no se versiona)
+BUILD_HISTORY_FILE = SCRIPT_DIR / "build-history.json"
+BUILD_HISTORY_KEEP = 50
+
 sys.path.insert(0, str(SCRIPTS_DIR))
-import docx2chordpro as d2c  # noqa: E402
-import latex_import as lx  # noqa: E402
-import doceacordes_import as da  # noqa: E402
+import startup as st  # noqa: E402  (importadores perezosos + precarga)
+
+# Los importadores (docx, LaTeX, doceacordes) se cargan al primer uso: el
+# admin arranca sin ellos y `warm_up()` los precarga en segundo plano.
+startup_report = st.StartupReport(_T0)
+d2c = st.LazyModule("docx2chordpro", startup_report)
+lx = st.LazyModule("latex_import", startup_report)
+da = st.LazyModule("doceacordes_import", startup_report)
+import category_registry as cr  # noqa: E402  (categorías + slots en memoria)
+import songs_payload as sp  # noqa: E402  (build-json en proceso)
+import jobs as jb  # noqa: E402  (tareas en segundo plano)
 import chordpro as cp  # noqa: E402  (módulo común: parseo campos ↔ directivas)
+import firebase_client as fbc  # noqa: E402  (REST de Firebase RTDB)
+import search_index as si  # noqa: E402  (índice full-text de los .cho)
+import transpose as tp  # noqa: E402  (motor de transposición de acordes)
 
 # Marca para canciones pendientes de revisar acordes (TO DO con espacio entre TO y DO)
 TODO_COMMENT_LINE = "{comment: TO DO: PENDIENTE REVISIÓN ACORDES}"
@@ -131,6 +156,12 @@ def number_prefix(filename: str) -> Optional[int]:
     return int(m.group(1)) if m else None
 
 
+def folder_letter(folder_name: str) -> Optional[str]:
+    """'A. Entrada' → 'A' (None si la carpeta no es de categoría)."""
+    m = re.match(r"\s*([A-Z](?:\+\d+)?)\.", folder_name or "")
+    return m.group(1) if m else None
+
+
 def normalize_title_for_match(s: str) -> str:
     s = unicodedata.normalize("NFKD", s or "")
     s = "".join(ch for ch in s if not unicodedata.combining(ch))
@@ -172,38 +203,29 @@ def load_indice() -> Dict[str, dict]:
     return {}
 
 
+_category_registry: Optional[cr.CategoryRegistry] = None
+
+
+def category_registry() -> cr.CategoryRegistry:
+    """Registro de categorías/slots (se crea al primer uso y se revalida contra
+    disco como mucho cada cr.DEFAULT_MAX_AGE segundos)."""
+    global _category_registry
+    reg = _category_registry
+    if reg is None or reg.songs_dir != SONGS_DIR:
+        reg = _category_registry = cr.CategoryRegistry(SONGS_DIR, INDICE_JSON)
+    else:
+        reg.revalidate_if_due()
+    return reg
+
+
 def list_categories() -> List[dict]:
     """Devuelve lista de carpetas-categoría del repo, mezclando con indice.json."""
-    indice = load_indice()
-    # indice.json key → categoryTitle ("A. Canciones Entrada 🎉")
-    by_letter: Dict[str, dict] = {}
-    for key, info in indice.items():
-        title = info.get("categoryTitle", "")
-        m = re.match(r"\s*([A-Z](?:\+\d+)?)\.", title)
-        if m:
-            by_letter[m.group(1)] = {
-                "key": key,
-                "title": title,
-                "order": info.get("order", 999),
-            }
-    folders = []
-    for p in sorted(SONGS_DIR.iterdir()):
-        if not p.is_dir():
-            continue
-        m = re.match(r"\s*([A-Z](?:\+\d+)?)\.", p.name)
-        if not m:
-            continue
-        letter = m.group(1)
-        info = by_letter.get(letter, {})
-        folders.append({
-            "letter": letter,
-            "folder": p.name,
-            "title": info.get("title") or p.name,
-            "indice_key": info.get("key"),
-            "order": info.get("order", 999),
-        })
-    folders.sort(key=lambda x: (x["order"], x["letter"]))
-    return folders
+    return category_registry().categories()
+
+
+def find_category(letter: str) -> Optional[dict]:
+    """Categoría por letra ("A") o None."""
+    return category_registry().get(letter)
 
 
 def list_repo_songs(category_letter: Optional[str] = None) -> List[dict]:
@@ -248,29 +270,23 @@ def list_repo_songs(category_letter: Optional[str] = None) -> List[dict]:
 # ─────────── LaTeX (input/*.tex) ─────────── #
 
 _latex_cache: Dict[str, object] = {"items": None, "snapshot": None}
-
-
-def _latex_snapshot() -> str:
-    """Devuelve una "huella" de los .tex (paths + mtimes) para invalidar cache."""
-    if not lx.INPUT_DIR.exists():
-        return ""
-    parts: List[str] = []
-    for cat in sorted(lx.INPUT_DIR.iterdir()):
-        if not cat.is_dir() or cat.name == "processed":
-            continue
-        for tex in sorted(cat.glob("*.tex")):
-            parts.append(f"{tex.name}:{int(tex.stat().st_mtime)}:{tex.stat().st_size}")
-    return "|".join(parts)
+_latex_lock = threading.Lock()   # la precarga y una petición no escanean a la vez
 
 
 def load_latex_items(force: bool = False) -> List[dict]:
-    snap = _latex_snapshot()
-    if not force and _latex_cache["items"] is not None and _latex_cache["snapshot"] == snap:
-        return _latex_cache["items"]  # type: ignore
-    items = lx.scan_latex_files(include_parsed=False)
-    _latex_cache["items"] = items
-    _latex_cache["snapshot"] = snap
-    return items
+    """Los .tex de scripts/input. Un stat por fichero; si algo cambia solo se
+    vuelven a convertir los ficheros cambiados (cache por fichero en lx)."""
+    with _latex_lock:
+        files = lx.list_tex_files()
+        snap = lx.files_snapshot(files)
+        if not force and _latex_cache["items"] is not None and _latex_cache["snapshot"] == snap:
+            return _latex_cache["items"]  # type: ignore
+        if force:
+            lx.clear_parse_cache()
+        items = lx.scan_latex_files(include_parsed=False, files=files)
+        _latex_cache["items"] = items
+        _latex_cache["snapshot"] = snap
+        return items
 
 
 def find_repo_match(title: str, repo_index: Dict[str, dict]) -> Optional[dict]:
@@ -289,14 +305,20 @@ def build_repo_title_index(repo_songs: List[dict]) -> Dict[str, dict]:
 # ─────────── Cantoral docx ─────────── #
 
 _docx_cache: Dict[str, object] = {"songs": None, "mtime": 0}
+_docx_lock = threading.Lock()
 
 
 def load_docx_songs(force: bool = False) -> List[dict]:
     """Lee y cachea las canciones del docx. Si el archivo cambia, recarga."""
-    docx_path = d2c.find_docx()
-    mtime = docx_path.stat().st_mtime
-    if not force and _docx_cache["songs"] is not None and _docx_cache["mtime"] == mtime:
-        return _docx_cache["songs"]  # type: ignore
+    with _docx_lock:
+        docx_path = d2c.find_docx()
+        mtime = docx_path.stat().st_mtime
+        if not force and _docx_cache["songs"] is not None and _docx_cache["mtime"] == mtime:
+            return _docx_cache["songs"]  # type: ignore
+        return _load_docx_songs(docx_path, mtime)
+
+
+def _load_docx_songs(docx_path: Path, mtime: float) -> List[dict]:
     paras = d2c.load_paragraphs(docx_path)
     raw_songs = d2c.split_into_songs(paras)
     indexed = []
@@ -319,8 +341,20 @@ def load_docx_songs(force: bool = False) -> List[dict]:
     return indexed
 
 
+def docx_conversion(s: dict) -> dict:
+    """`d2c.convert_song` de una canción de `load_docx_songs`, cacheada en la
+    propia entrada (se descarta con ella si el docx cambia). Solo lectura."""
+    conv = s.get("_conv")
+    if conv is None:
+        conv = s["_conv"] = d2c.convert_song(s["_song"])
+    return conv
+
+
 def first_free_number(folder: Path, start: int = 1) -> int:
     """Devuelve el primer número de slot libre en la carpeta (busca huecos)."""
+    reg = category_registry()
+    if reg.knows(folder):
+        return reg.first_free(folder.name, start)
     used = set()
     if folder.exists():
         for f in folder.iterdir():
@@ -338,6 +372,9 @@ def first_free_number(folder: Path, start: int = 1) -> int:
 
 def preferred_number(folder: Path, hint: Optional[int] = None) -> int:
     """Si el número 'hint' está libre, lo usa. Si no, primer hueco libre desde 1."""
+    reg = category_registry()
+    if reg.knows(folder):
+        return reg.preferred(folder.name, hint)
     if isinstance(hint, int) and hint > 0:
         if not folder.exists():
             return hint
@@ -348,6 +385,14 @@ def preferred_number(folder: Path, hint: Optional[int] = None) -> int:
     return first_free_number(folder)
 
 
+def next_song_number(folder: Path) -> int:
+    """Máximo número usado + 1 (como d2c.next_song_number, sin listar la carpeta)."""
+    reg = category_registry()
+    if reg.knows(folder):
+        return reg.next_number(folder.name)
+    return d2c.next_song_number(folder)
+
+
 def docx_song_to_dict(s: dict, conv: dict, include_body: bool = False) -> dict:
     out = {
         "id": s["id"],
@@ -439,7 +484,7 @@ def api_docx_ignore():
     song = next((s for s in songs if s["id"] == int(docx_id)), None)
     if not song:
         abort(404, "Canción no encontrada en el docx")
-    conv = d2c.convert_song(song["_song"])
+    conv = docx_conversion(song)
     ignored = load_ignored()
     ignored[song["title_raw"]] = {
         "title": conv["title"],
@@ -484,6 +529,174 @@ def backup_file(path: Path) -> Path:
     return dest
 
 
+# ─────────── Índice de búsqueda ─────────── #
+
+# Se construye en la primera búsqueda y después se mantiene por fichero: los
+# endpoints que escriben .cho avisan con `songs_changed()`. Los cambios hechos
+# fuera del admin (editor externo, git pull…) se recogen con un re-sync por
+# mtime, como mucho cada SEARCH_RESYNC_SECONDS.
+SEARCH_RESYNC_SECONDS = 5.0
+_search_state: Dict[str, object] = {"index": None, "synced_at": 0.0}
+# El servidor es multihilo: búsquedas y escrituras no deben pisarse el índice
+_search_lock = threading.RLock()
+
+
+def get_search_index() -> "si.SearchIndex":
+    with _search_lock:
+        idx = _search_state["index"]
+        now = time.monotonic()
+        if idx is None:
+            idx = si.build_index(SONGS_DIR, REPO_DIR)
+            _search_state["index"] = idx
+            _search_state["synced_at"] = now
+        elif now - float(_search_state["synced_at"]) > SEARCH_RESYNC_SECONDS:  # type: ignore
+            idx.sync_dir(SONGS_DIR, REPO_DIR)  # type: ignore
+            _search_state["synced_at"] = now
+        return idx  # type: ignore
+
+
+def songs_changed(written: List[Path] = (), removed: List[Path] = ()) -> None:
+    """Avisa de .cho escritos/borrados para mantener al día los índices en memoria."""
+    for p in list(removed) + list(written):
+        _chord_tables.discard(p)
+    if _category_registry is not None:
+        for p in removed:
+            _category_registry.file_removed(p)
+        for p in written:
+            _category_registry.file_written(p)
+    with _search_lock:
+        idx = _search_state["index"]
+        if idx is None:
+            return
+        for p in removed:
+            idx.remove(p.relative_to(REPO_DIR).as_posix())  # type: ignore
+        for p in written:
+            if p.exists():
+                idx.update_file(p, REPO_DIR, extra={"category_folder": p.parent.name})  # type: ignore
+
+
+@app.route("/api/search")
+def api_search():
+    """Búsqueda full-text. ?q=consulta&limit=N (ver sintaxis en search_index.py)."""
+    q = request.args.get("q", "").strip()
+    try:
+        limit = max(1, min(int(request.args.get("limit", "20")), 200))
+    except ValueError:
+        abort(400, "limit inválido")
+    t0 = time.perf_counter()
+    with _search_lock:
+        idx = get_search_index()
+        results = idx.search(q, limit=limit) if q else []
+    for r in results:
+        r["path"] = r["id"]
+        r["category_letter"] = folder_letter(r.get("category_folder", ""))
+    return jsonify({
+        "query": q,
+        "results": results,
+        "indexed": len(idx),
+        "took_ms": round((time.perf_counter() - t0) * 1000, 2),
+    })
+
+
+# ─────────── Transposición ─────────── #
+#
+# Cada .cho se analiza una vez a una tabla de acordes (transpose.ChordTable)
+# cacheada por mtime+tamaño; transponer una canción o una categoría entera es
+# solo sustituir los huecos de esas tablas.
+
+_chord_tables = tp.ChordTableCache()
+
+
+def _transpose_table(table: "tp.ChordTable", body: dict) -> Optional[dict]:
+    """Aplica {semis} o {key} del body a una tabla. None si no se puede
+    (tono destino pedido pero la canción no tiene {key:} reconocible)."""
+    target = (body.get("key") or "").strip()
+    if target:
+        semis = tp.semitones_between(table.key, target)
+        if semis is None:
+            return None
+    else:
+        try:
+            semis = int(body.get("semis", 0))
+        except (TypeError, ValueError):
+            abort(400, "semis debe ser un entero")
+    new_key = tp.transposed_key(table.key, semis) if table.key else None
+    return {
+        "semis": semis,
+        "from_key": table.key,
+        "key": new_key[0] if new_key else table.key,
+        "chords": len(table),
+        "content": table.transpose(semis),
+    }
+
+
+@app.route("/api/song/transpose", methods=["POST"])
+def api_song_transpose():
+    """Transpone una canción. ?path=...  Body: {semis: N} o {key: "Bb"}, save?: bool.
+
+    Sin `save` solo devuelve el contenido transpuesto (para previsualizar)."""
+    path_str = request.args.get("path", "")
+    if not path_str:
+        abort(400, "Falta 'path'")
+    p = safe_relpath(path_str)
+    if not p.exists():
+        abort(404, "No existe")
+    body = request.get_json(silent=True) or {}
+    res = _transpose_table(_chord_tables.get(p), body)
+    if res is None:
+        abort(400, "La canción no tiene un {key:} reconocible; usa semis")
+    res["saved"] = False
+    if body.get("save") and res["semis"] % 12:
+        backup_file(p)
+        p.write_text(res["content"], encoding="utf-8")
+        songs_changed(written=[p])
+        res["saved"] = True
+    res["path"] = str(p.relative_to(REPO_DIR))
+    return jsonify(res)
+
+
+@app.route("/api/category/transpose", methods=["POST"])
+def api_category_transpose():
+    """Re-tonaliza una categoría entera.
+
+    Body: {category: "A", semis: N | key: "G", save?: bool}
+      - semis: desplaza todas las canciones N semitonos.
+      - key:   lleva cada canción a ese tono (las que no tienen {key:} se saltan).
+    Sin `save` es un simulacro: devuelve qué tono quedaría en cada canción."""
+    body = request.get_json(silent=True) or {}
+    letter = (body.get("category") or "").upper().strip()
+    cat = find_category(letter)
+    if not cat:
+        abort(404, "Categoría no encontrada")
+    save = bool(body.get("save"))
+    t0 = time.perf_counter()
+    results = []
+    written: List[Path] = []
+    for p in sorted((SONGS_DIR / cat["folder"]).glob("*.cho")):
+        rel = str(p.relative_to(REPO_DIR))
+        res = _transpose_table(_chord_tables.get(p), body)
+        if res is None:
+            results.append({"path": rel, "ok": False, "error": "sin {key:} reconocible"})
+            continue
+        changed = bool(res["semis"] % 12) and res["chords"] > 0
+        if save and changed:
+            backup_file(p)
+            p.write_text(res["content"], encoding="utf-8")
+            written.append(p)
+        results.append({"path": rel, "ok": True, "from_key": res["from_key"],
+                        "key": res["key"], "semis": res["semis"],
+                        "chords": res["chords"], "changed": changed})
+    if written:
+        songs_changed(written=written)
+    return jsonify({
+        "ok": True,
+        "category": letter,
+        "saved": save,
+        "results": results,
+        "took_ms": round((time.perf_counter() - t0) * 1000, 2),
+    })
+
+
 # ─────────── API: Catálogo ─────────── #
 
 
@@ -493,11 +706,11 @@ def api_catalog():
     docx_songs = load_docx_songs()
     latex_items = load_latex_items()
 
-    # Cachear conversiones (caras): solo para usar el title aquí
+    # Conversiones cacheadas por canción (ver docx_conversion)
     docx_convs: Dict[int, dict] = {}
     docx_index: Dict[str, dict] = {}
     for s in docx_songs:
-        conv = d2c.convert_song(s["_song"])
+        conv = docx_conversion(s)
         docx_convs[s["id"]] = conv
         for k in title_keys(conv["title"]):
             docx_index.setdefault(k, {
@@ -638,6 +851,7 @@ def api_song_put():
         abort(400, "Body debe ser {content: string}")
     backup_file(p)
     p.write_text(content, encoding="utf-8")
+    songs_changed(written=[p])
     meta = parse_cho_metadata(content)
     return jsonify({"ok": True, "path": str(p.relative_to(REPO_DIR)), "meta": meta})
 
@@ -728,6 +942,7 @@ def api_song_meta_put():
                         "meta": parse_cho_metadata(new_content), "unchanged": True})
     backup_file(p)
     p.write_text(new_content, encoding="utf-8")
+    songs_changed(written=[p])
     return jsonify({"ok": True, "path": str(p.relative_to(REPO_DIR)),
                     "meta": parse_cho_metadata(new_content)})
 
@@ -760,6 +975,7 @@ def api_song_meta_quick_add():
     new_content = _replace_meta_block(content, new_lines)
     backup_file(p)
     p.write_text(new_content, encoding="utf-8")
+    songs_changed(written=[p])
     return jsonify({"ok": True, "meta": parse_cho_metadata(new_content)})
 
 
@@ -775,12 +991,12 @@ def api_song_new():
     user_content = body.get("content") or ""
     if not cat_letter or not title:
         abort(400, "Falta category o title")
-    cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+    cat = find_category(cat_letter)
     if not cat:
         abort(404, "Categoría no encontrada")
     folder = SONGS_DIR / cat["folder"]
     folder.mkdir(exist_ok=True)
-    num = d2c.next_song_number(folder)
+    num = next_song_number(folder)
     slug = d2c.slugify(d2c.pretty_title_case(title))
     fname = f"{num:02d}.{slug}.cho"
     fpath = folder / fname
@@ -806,6 +1022,7 @@ def api_song_new():
         content = "\n".join(header) + "\n\n" + body_text
 
     fpath.write_text(content, encoding="utf-8")
+    songs_changed(written=[fpath])
     return jsonify({
         "ok": True,
         "path": str(fpath.relative_to(REPO_DIR)),
@@ -823,6 +1040,7 @@ def api_song_delete():
         abort(404, "No existe")
     backup_file(p)
     p.unlink()
+    songs_changed(removed=[p])
     return jsonify({"ok": True})
 
 
@@ -844,7 +1062,7 @@ def api_song_move():
     src = safe_relpath(path_str)
     if not src.exists():
         abort(404, "No existe el archivo origen")
-    cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+    cat = find_category(cat_letter)
     if not cat:
         abort(404, f"Categoría {cat_letter} no encontrada")
     folder = SONGS_DIR / cat["folder"]
@@ -865,6 +1083,7 @@ def api_song_move():
         return jsonify({"ok": True, "path": str(src.relative_to(REPO_DIR)), "unchanged": True})
     backup_file(src)
     src.rename(dest)
+    songs_changed(written=[dest], removed=[src])
     return jsonify({
         "ok": True,
         "path": str(dest.relative_to(REPO_DIR)),
@@ -882,7 +1101,7 @@ def api_docx_list():
     songs = load_docx_songs()
     out = []
     for s in songs:
-        conv = d2c.convert_song(s["_song"])
+        conv = docx_conversion(s)
         out.append(docx_song_to_dict(s, conv, include_body=False))
     return jsonify(out)
 
@@ -897,7 +1116,7 @@ def api_docx_preview():
     if not (0 <= i < len(songs)):
         abort(404, "id fuera de rango")
     s = songs[i]
-    conv = d2c.convert_song(s["_song"])
+    conv = docx_conversion(s)
     return jsonify(docx_song_to_dict(s, conv, include_body=True))
 
 
@@ -922,7 +1141,7 @@ def api_docx_import():
             results.append({"id": i, "ok": False, "error": "fuera de rango"})
             continue
         s = songs[i]
-        conv = d2c.convert_song(s["_song"])
+        conv = docx_conversion(s)
         if normalize_title_for_match(conv["title"]) in repo_titles:
             results.append({"id": i, "ok": False, "error": "ya existe en repo"})
             continue
@@ -939,6 +1158,7 @@ def api_docx_import():
             results.append({"id": i, "ok": False, "error": "el archivo ya existe", "path": str(fpath.relative_to(REPO_DIR))})
             continue
         fpath.write_text(render_cho_with_todo(conv), encoding="utf-8")
+        songs_changed(written=[fpath])
         repo_titles.add(normalize_title_for_match(conv["title"]))
         results.append({
             "id": i,
@@ -994,25 +1214,33 @@ def api_latex_preview():
     if not rel:
         abort(400, "Falta id")
     try:
-        p = lx.resolve_tex_path(rel)
+        p, parsed = lx.load_tex_song(rel)
     except (ValueError, FileNotFoundError) as e:
         abort(404, str(e))
-    parsed = lx.parse_latex_song(p)
-    raw_tex = p.read_text(encoding="utf-8")
+    # En un cancionero solo se enseña el trozo de esa canción
+    raw_tex = parsed.get("source") or p.read_text(encoding="utf-8")
     return jsonify({
         "id": rel,
         "filename": p.name,
         "latex_raw": raw_tex,
-        "parsed": parsed,
+        "parsed": {k: v for k, v in parsed.items() if k != "source"},
         "content": lx.render_latex_cho(parsed),
     })
 
 
+SONGBOOK_RULE = ("Las canciones de un cancionero se importan una a una y quedan apuntadas; "
+                 "el .tex pasa a processed/ cuando ya se han importado todas "
+                 "(en esta petición o en anteriores).")
+
+
 @app.route("/api/latex/import", methods=["POST"])
 def api_latex_import():
     """Importa los .tex elegidos. Cada item puede ser:
       - { "id": "scripts/input/.../foo.tex", "mode": "new", "category_letter": "A", "slug": "..." }
       - { "id": "...", "mode": "overwrite", "repo_path": "songs/A. .../03.foo.cho" }
+    Las canciones de un cancionero (`libro.tex#N`) se importan una a una y
+    quedan apuntadas; el .tex pasa a processed/ cuando ya se han importado
+    todas, en esta petición o en anteriores (`songbook_rule`).
     """
     body = request.get_json(silent=True) or {}
     items = body.get("items") or []
@@ -1020,12 +1248,13 @@ def api_latex_import():
     if not isinstance(items, list) or not items:
         abort(400, "Falta items")
     results = []
+    books: Dict[Path, List[dict]] = {}   # cancionero → resultados de sus canciones
+    progress: Dict[Path, Tuple[int, int]] = {}   # cancionero → (importadas, total)
     for it in items:
         rel = it.get("id")
         mode = (it.get("mode") or "new").lower()
         try:
-            tex_path = lx.resolve_tex_path(rel)
-            parsed = lx.parse_latex_song(tex_path)
+            tex_path, parsed = lx.load_tex_song(rel)
             content = lx.render_latex_cho(parsed)
 
             if mode == "overwrite":
@@ -1037,13 +1266,14 @@ def api_latex_import():
                     raise FileNotFoundError(f"No existe destino: {repo_path_str}")
                 backup_file(target)
                 target.write_text(content, encoding="utf-8")
+                songs_changed(written=[target])
                 final_path = target
                 action = "overwritten"
             else:
                 cat_letter = (it.get("category_letter") or "").upper()
                 if not cat_letter:
                     raise ValueError("Falta category_letter")
-                cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+                cat = find_category(cat_letter)
                 if not cat:
                     raise ValueError(f"Categoría {cat_letter} no encontrada")
                 folder = SONGS_DIR / cat["folder"]
@@ -1052,17 +1282,18 @@ def api_latex_import():
                 slug = re.sub(r"[^a-z0-9_]+", "_", slug.lower()).strip("_") or "cancion"
                 num = it.get("number")
                 if not (isinstance(num, int) and num > 0):
-                    num = d2c.next_song_number(folder)
+                    num = next_song_number(folder)
                 fname = f"{num:02d}.{slug}.cho"
                 fpath = folder / fname
                 if fpath.exists():
                     raise FileExistsError(f"Ya existe {fname}")
                 fpath.write_text(content, encoding="utf-8")
+                songs_changed(written=[fpath])
                 final_path = fpath
                 action = "created"
 
             moved_to = None
-            if move_processed:
+            if move_processed and parsed.get("song_index") is None:
                 moved = lx.move_to_processed(tex_path)
                 moved_to = str(moved.relative_to(REPO_DIR))
             results.append({
@@ -1073,11 +1304,27 @@ def api_latex_import():
                 "moved_to": moved_to,
                 "warnings": parsed.get("unknown_chords", []),
             })
+            if parsed.get("song_index") is not None:
+                progress[tex_path] = lx.mark_imported(tex_path, parsed)
+                books.setdefault(tex_path, []).append(results[-1])
         except Exception as e:
             results.append({"id": rel, "ok": False, "error": str(e)})
+    for tex_path, done in books.items():
+        imported, total = progress[tex_path]
+        book = {"file": str(tex_path.relative_to(REPO_DIR)), "imported": imported,
+                "total": total, "moved_to": None}
+        if move_processed and imported >= total:
+            try:
+                book["moved_to"] = str(lx.move_to_processed(tex_path).relative_to(REPO_DIR))
+            except Exception as e:
+                for r in done:
+                    r["warnings"] = r["warnings"] + [f"No se pudo mover a processed/: {e}"]
+        for r in done:
+            r["moved_to"] = book["moved_to"]
+            r["songbook"] = book
     # Invalidar cache
     _latex_cache["snapshot"] = None
-    return jsonify({"results": results})
+    return jsonify({"results": results, "songbook_rule": SONGBOOK_RULE})
 
 
 @app.route("/api/latex/rescan", methods=["POST"])
@@ -1125,6 +1372,7 @@ def api_songs_bulk_status():
             if new_content != content:
                 backup_file(p)
                 p.write_text(new_content, encoding="utf-8")
+                songs_changed(written=[p])
             results.append({"path": path_str, "ok": True})
         except Exception as e:
             results.append({"path": path_str, "ok": False, "error": str(e)})
@@ -1182,7 +1430,7 @@ def api_doce_preview():
     hint_raw = request.args.get("position_hint", "").strip()
     hint = int(hint_raw) if hint_raw.isdigit() else None
     if cat_letter:
-        cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+        cat = find_category(cat_letter)
         if cat:
             suggested_number = preferred_number(SONGS_DIR / cat["folder"], hint)
     extras = parse_extra_meta(content)
@@ -1201,7 +1449,7 @@ def api_doce_preview():
 def api_doce_suggest_number():
     """Devuelve un número sugerido (primer hueco libre, o el hint si está libre)."""
     cat_letter = request.args.get("category", "").upper().strip()
-    cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+    cat = find_category(cat_letter)
     if not cat:
         abort(404, "Categoría no encontrada")
     folder = SONGS_DIR / cat["folder"]
@@ -1220,9 +1468,15 @@ def api_doce_import():
     items = body.get("items") or []
     if not isinstance(items, list) or not items:
         abort(400, "Falta items")
+    return run_or_submit("doce-import", lambda progress: _doce_import(items, progress),
+                         exclusive="doce")
+
+
+def _doce_import(items: List[dict], progress: "jb.Progress") -> tuple:
     results = []
-    for it in items:
+    for i, it in enumerate(items):
         doce_id = str(it.get("doce_id") or "").strip()
+        progress(f"doceacordes {doce_id or '?'}", 100.0 * i / len(items))
         cat_letter = (it.get("category_letter") or "").upper().strip()
         force = bool(it.get("force_refresh"))
         try:
@@ -1230,7 +1484,7 @@ def api_doce_import():
                 raise ValueError("Falta doce_id")
             if not cat_letter:
                 raise ValueError("Falta category_letter")
-            cat = next((c for c in list_categories() if c["letter"] == cat_letter), None)
+            cat = find_category(cat_letter)
             if not cat:
                 raise ValueError(f"Categoría {cat_letter} no encontrada")
             folder = SONGS_DIR / cat["folder"]
@@ -1261,6 +1515,7 @@ def api_doce_import():
             if fpath.exists():
                 raise FileExistsError(f"Ya existe {fname}")
             fpath.write_text(content, encoding="utf-8")
+            songs_changed(written=[fpath])
             results.append({
                 "doce_id": doce_id,
                 "ok": True,
@@ -1269,7 +1524,7 @@ def api_doce_import():
             })
         except Exception as e:
             results.append({"doce_id": doce_id, "ok": False, "error": str(e)})
-    return jsonify({"results": results})
+    return {"results": results}, 200
 
 
 # ─────────── API: reordenar y build-json ─────────── #
@@ -1280,18 +1535,19 @@ def api_category_slots():
     """Devuelve la representación 'con huecos' de una categoría: lista de
     `{number, filename}` donde filename es null en los slots vacíos."""
     letter = request.args.get("category", "").upper().strip()
-    cat = next((c for c in list_categories() if c["letter"] == letter), None)
+    cat = find_category(letter)
     if not cat:
         abort(404, "Categoría no encontrada")
-    folder = SONGS_DIR / cat["folder"]
     by_num: Dict[int, str] = {}
     unnumbered: List[str] = []
-    for p in sorted(folder.glob("*.cho")):
-        m = re.match(r"(\d+)\.", p.name)
+    for name in category_registry().files(cat["folder"]):
+        if not name.endswith(".cho"):
+            continue
+        m = re.match(r"(\d+)\.", name)
         if m:
-            by_num[int(m.group(1))] = p.name
+            by_num[int(m.group(1))] = name
         else:
-            unnumbered.append(p.name)
+            unnumbered.append(name)
     slots: List[dict] = []
     if by_num:
         max_num = max(by_num)
@@ -1317,7 +1573,7 @@ def api_reorder():
     order = body.get("order", [])
     if not letter or not isinstance(order, list):
         abort(400, "Falta category u order")
-    cat = next((c for c in list_categories() if c["letter"] == letter), None)
+    cat = find_category(letter)
     if not cat:
         abort(404, "Categoría no encontrada")
     folder = SONGS_DIR / cat["folder"]
@@ -1358,36 +1614,184 @@ def api_reorder():
             continue
         p = folder / fn
         base = re.sub(r"^\d+\.", "", fn)
-        tp = folder / (tmp_prefix + str(idx) + "-" + base)
-        p.rename(tp)
-        temp_pairs.append((idx, tp, base))
+        tmp_path = folder / (tmp_prefix + str(idx) + "-" + base)
+        p.rename(tmp_path)
+        temp_pairs.append((idx, tmp_path, base))
     # Paso 2: renombrar al número final
     final_names: List[Optional[str]] = [None] * len(order)
-    for slot, tp, base in temp_pairs:
+    for slot, tmp_path, base in temp_pairs:
         final_name = f"{slot:02d}.{base}"
         (folder / final_name).exists()  # no debería existir; backup ya hecho
-        tp.rename(folder / final_name)
+        tmp_path.rename(folder / final_name)
         final_names[slot - 1] = final_name
+    songs_changed(
+        written=[folder / n for n in final_names if n],
+        removed=[p for p in current.values()],
+    )
     return jsonify({"ok": True, "category": letter, "new_order": final_names})
 
 
+def _load_build_history() -> List[dict]:
+    if not BUILD_HISTORY_FILE.exists():
+        return []
+    try:
+        return json.loads(BUILD_HISTORY_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+
+
+def _record_build(entry: dict) -> None:
+    history = (_load_build_history() + [entry])[-BUILD_HISTORY_KEEP:]
+    BUILD_HISTORY_FILE.write_text(
+        json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+
 @app.route("/api/build-json", methods=["POST"])
 def api_build_json():
-    script = SCRIPTS_DIR / "crear_songs_json.py"
-    if not script.exists():
-        abort(404, "crear_songs_json.py no encontrado")
-    proc = subprocess.run(
-        [sys.executable, str(script)],
-        capture_output=True, text=True, cwd=str(REPO_DIR),
-    )
+    """Genera songs-vX.json en proceso con songs_payload (lo mismo que
+    crear_songs_json.py, sin arrancar otro intérprete).
+
+    Las peticiones que llegan mientras hay una build en marcha se unen a ella
+    (si no, dos builds calcularían el mismo número de versión). Con ?async=1
+    responde 202 {job}: el log y el % por categoría llegan por
+    /api/jobs/<id>/events y se puede cancelar con /api/jobs/<id>/cancel.
+    """
+    return run_or_submit("build-json", _build_json, exclusive="build-json", dedupe=True)
+
+
+def _build_json(progress: "jb.Progress") -> tuple:
+    lines: List[str] = []
+    state = {"pct": 0.0}
+
+    def log(msg: str) -> None:
+        lines.append(msg)
+        progress(msg, state["pct"])
+
+    def on_category(i: int, total: int, cat_key: str) -> None:
+        state["pct"] = round(100.0 * i / max(total, 1), 1)
+
+    started = datetime.now().astimezone().isoformat(timespec="seconds")
+    t0 = time.perf_counter()
+    entry = {"started": started, "ok": False, "file": None}
+    try:
+        songs_dir = str(SONGS_DIR)
+        result = sp.build(songs_dir, [sp.FileWriter(songs_dir, log=log)], log=log,
+                          on_category=on_category, cancelled=progress.cancelled)
+        if result.changed:
+            log(f"✅ ¡Hecho! {os.path.join(songs_dir, result.name)} creado.")
+    except sp.BuildCancelled:
+        raise  # la tarea queda como «cancelled»; no cuenta para el historial
+    except Exception as e:
+        entry["duration"] = round(time.perf_counter() - t0, 3)
+        entry["error"] = str(e)
+        _record_build(entry)
+        return {"ok": False, "stdout": "\n".join(lines), "stderr": f"💥 Error: {e}",
+                "returncode": 1, "duration": entry["duration"]}, 200
+    entry.update(ok=True, file=result.name, changed=result.changed,
+                 contentHash=result.content_hash,
+                 duration=round(time.perf_counter() - t0, 3))
+    _record_build(entry)
+    progress(f"✅ {entry['file']}", 100.0)
+    return {"ok": True, "stdout": "\n".join(lines) + "\n", "stderr": "",
+            "returncode": 0, "file": entry["file"], "changed": result.changed,
+            "contentHash": result.content_hash, "duration": entry["duration"]}, 200
+
+
+@app.route("/api/build-json/history")
+def api_build_json_history():
+    history = _load_build_history()
+    durations = [h["duration"] for h in history if h.get("ok") and h.get("duration")]
     return jsonify({
-        "ok": proc.returncode == 0,
-        "stdout": proc.stdout,
-        "stderr": proc.stderr,
-        "returncode": proc.returncode,
+        "builds": list(reversed(history)),
+        "avg_duration": round(sum(durations) / len(durations), 3) if durations else None,
+        "last_duration": durations[-1] if durations else None,
     })
 
 
+# ─────────── Tareas en segundo plano ─────────── #
+#
+# Los endpoints que esperan a la red o a un subproceso se escriben como una
+# función `fn(progress) -> (payload, status)`. Por defecto se ejecuta en la
+# propia petición (como siempre); con ?async=1 (o {"async": true} en el body)
+# se lanza en un hilo y se responde 202 con el id de la tarea.
+
+_jobs = jb.JobManager()
+
+
+def _wants_async() -> bool:
+    if request.args.get("async") == "1":
+        return True
+    body = request.get_json(silent=True)
+    return isinstance(body, dict) and body.get("async") is True
+
+
+def run_or_submit(kind: str, fn: "jb.JobFn", exclusive: Optional[str] = None,
+                  dedupe: bool = False):
+    """Con `dedupe`, también en modo síncrono se pasa por la cola: si ya hay
+    una tarea de ese tipo en marcha, se espera a ella y se devuelve su
+    resultado en vez de lanzar otra."""
+    if _wants_async():
+        job = _jobs.submit(kind, fn, exclusive=exclusive, dedupe=dedupe)
+        return jsonify({"ok": True, "job": job.to_dict()}), 202
+    if dedupe:
+        job = _jobs.submit(kind, fn, exclusive=exclusive, dedupe=True)
+        _jobs.wait_done(job)
+        return jsonify(job.result), job.http_status
+    with _jobs.lock(exclusive):
+        payload, status = fn(jb.no_progress)
+    return jsonify(payload), status
+
+
+@app.route("/api/jobs")
+def api_jobs_list():
+    kind = request.args.get("kind") or None
+    return jsonify({"jobs": [j.to_dict(include_events=False) for j in _jobs.list(kind)]})
+
+
+@app.route("/api/jobs/<job_id>")
+def api_job_get(job_id: str):
+    job = _jobs.get(job_id)
+    if job is None:
+        abort(404, "Tarea no encontrada")
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def api_job_cancel(job_id: str):
+    """Cancelación cooperativa: la tarea se detiene en su siguiente punto de
+    control (build-json: entre categorías y antes de escribir)."""
+    job = _jobs.cancel(job_id)
+    if job is None:
+        abort(404, "Tarea no encontrada")
+    return jsonify({"ok": True, "job": job.to_dict(include_events=False)})
+
+
+@app.route("/api/jobs/<job_id>/events")
+def api_job_events(job_id: str):
+    """Progreso por Server-Sent Events: `progress` por cada evento y un `done`
+    final con la tarea completa (resultado incluido)."""
+    job = _jobs.get(job_id)
+    if job is None:
+        abort(404, "Tarea no encontrada")
+
+    def stream():
+        seen = 0
+        while True:
+            events, done = _jobs.wait(job, seen)
+            for ev in events:
+                yield f"event: progress\ndata: {json.dumps(ev, ensure_ascii=False)}\n\n"
+            seen += len(events)
+            if done:
+                yield f"event: done\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                return
+            if not events:
+                yield ": ping\n\n"  # mantiene viva la conexión
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # ─────────── API: git (estado / commit&push rápido) ─────────── #
 
 def _run_git(args: List[str], timeout: int = 30) -> subprocess.CompletedProcess:
@@ -1404,10 +1808,17 @@ def api_git_status():
     ?fetch=1 → hace `git fetch` antes (para saber si la rama está desfasada).
     Devuelve rama, upstream, ahead/behind y archivos sin commitear.
     """
+    fetch = request.args.get("fetch") == "1"
+    return run_or_submit("git-status", lambda progress: _git_status(fetch, progress))
+
+
+def _git_status(fetch: bool, progress: "jb.Progress") -> tuple:
     try:
         fetched = False
-        if request.args.get("fetch") == "1":
-            f = _run_git(["fetch", "--quiet"], timeout=25)
+        if fetch:
+            progress("git fetch")
+            with _jobs.lock("git"):
+                f = _run_git(["fetch", "--quiet"], timeout=25)
             fetched = f.returncode == 0
         branch = _run_git(["rev-parse", "--abbrev-ref", "HEAD"]).stdout.strip()
         # Archivos modificados / nuevos (incluye sin trackear)
@@ -1422,7 +1833,7 @@ def api_git_status():
             counts = _run_git(["rev-list", "--left-right", "--count", "@{u}...HEAD"]).stdout.split()
             if len(counts) == 2:
                 behind, ahead = int(counts[0]), int(counts[1])
-        return jsonify({
+        return {
             "ok": True,
             "branch": branch,
             "upstream": up_name,
@@ -1433,9 +1844,9 @@ def api_git_status():
             "changed_files": changed,
             "changed_count": len(changed),
             "fetched": fetched,
-        })
+        }, 200
     except Exception as e:
-        return jsonify({"ok": False, "error": str(e)})
+        return {"ok": False, "error": str(e)}, 200
 
 
 @app.route("/api/git/commit", methods=["POST"])
@@ -1449,9 +1860,15 @@ def api_git_commit():
     message = (body.get("message") or "").strip()
     if not message:
         abort(400, "Falta el mensaje del commit")
+    return run_or_submit("git-commit", lambda progress: _git_commit(message, progress),
+                         exclusive="git")
+
+
+def _git_commit(message: str, progress: "jb.Progress") -> tuple:
     steps = []
 
     def step(name, proc):
+        progress(f"git {name}")
         steps.append({
             "step": name, "returncode": proc.returncode,
             "stdout": proc.stdout, "stderr": proc.stderr,
@@ -1460,20 +1877,20 @@ def api_git_commit():
 
     try:
         if not step("add", _run_git(["add", "-A"])):
-            return jsonify({"ok": False, "steps": steps, "error": "Fallo en git add"}), 500
+            return {"ok": False, "steps": steps, "error": "Fallo en git add"}, 500
         commit = _run_git(["commit", "-m", message])
         # "nothing to commit" no es un error fatal que debamos esconder
         step("commit", commit)
         if commit.returncode != 0 and "nothing to commit" not in (commit.stdout + commit.stderr):
-            return jsonify({"ok": False, "steps": steps, "error": "Fallo en git commit"}), 500
+            return {"ok": False, "steps": steps, "error": "Fallo en git commit"}, 500
         branch = _run_git(["rev-parse", "--abbrev-ref", "HEAD"]).stdout.strip()
         has_upstream = _run_git(["rev-parse", "--abbrev-ref", "@{u}"]).returncode == 0
         push_args = ["push"] if has_upstream else ["push", "-u", "origin", branch]
         if not step("push", _run_git(push_args, timeout=60)):
-            return jsonify({"ok": False, "steps": steps, "error": "Fallo en git push (¿conexión?)"}), 500
-        return jsonify({"ok": True, "steps": steps, "branch": branch})
+            return {"ok": False, "steps": steps, "error": "Fallo en git push (¿conexión?)"}, 500
+        return {"ok": True, "steps": steps, "branch": branch}, 200
     except Exception as e:
-        return jsonify({"ok": False, "steps": steps, "error": str(e)}), 500
+        return {"ok": False, "steps": steps, "error": str(e)}, 500
 
 
 # ─────────── Static + fallback ─────────── #
@@ -1550,62 +1967,30 @@ def api_backups_cleanup():
 
 # ─────────── Peticiones de la gente (Firebase) ─────────── #
 
-_ENV_LOADED = False
-
-
-def _load_env_once() -> None:
-    """Carga el .env de la raíz del repo (FIREBASE_URL / FIREBASE_TOKEN) sin
-    depender de python-dotenv. No pisa variables ya presentes en el entorno."""
-    global _ENV_LOADED
-    if _ENV_LOADED:
-        return
-    _ENV_LOADED = True
-    env_path = REPO_DIR / ".env"
-    if not env_path.exists():
-        return
-    try:
-        for raw in env_path.read_text(encoding="utf-8").splitlines():
-            line = raw.strip()
-            if not line or line.startswith("#") or "=" not in line:
-                continue
-            key, _, val = line.partition("=")
-            key = key.strip()
-            val = val.strip().strip('"').strip("'")
-            if key and key not in os.environ:
-                os.environ[key] = val
-    except Exception:
-        pass
+_fb_client: Optional["fbc.FirebaseClient"] = None
+_fb_client_lock = threading.Lock()
 
 
 def _fb_get_json(path: str):
-    """GET a Firebase RTDB vía REST usando solo la stdlib (urllib).
-
-    Autenticación, igual que los scripts de sync:
+    """GET a Firebase RTDB con el cliente común (`firebase_client`: conexiones
+    reutilizadas, reintentos, gzip). FIREBASE_URL / FIREBASE_TOKEN salen del
+    entorno o del .env de la raíz del repo (cargado una vez, sin pisar el
+    entorno). Autenticación igual que los scripts de sync:
       - FIREBASE_TOKEN que empieza por 'Bearer ' → cabecera Authorization
       - token normal → query param ?auth=TOKEN
       - una API key 'AIza…' NO sirve como token de DB → se ignora
     """
-    _load_env_once()
-    base = (os.environ.get("FIREBASE_URL") or "").strip().rstrip("/")
-    token = (os.environ.get("FIREBASE_TOKEN") or "").strip()
-    if not base:
-        raise RuntimeError(
-            "Falta FIREBASE_URL en el archivo .env de la raíz del repo. "
-            "Añade FIREBASE_URL y FIREBASE_TOKEN para consultar las peticiones."
-        )
-    if token.startswith("AIza"):
-        token = ""  # una API key no es un token válido para la Realtime Database
-
-    url = f"{base}/{path}.json"
-    headers = {}
-    if token.startswith("Bearer "):
-        headers["Authorization"] = token
-    elif token:
-        url += "?auth=" + urllib.parse.quote(token, safe="")
-
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=25) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    global _fb_client
+    with _fb_client_lock:
+        if _fb_client is None:
+            fbc.load_env(str(REPO_DIR / ".env"))
+            if not (os.environ.get("FIREBASE_URL") or "").strip():
+                raise RuntimeError(
+                    "Falta FIREBASE_URL en el archivo .env de la raíz del repo. "
+                    "Añade FIREBASE_URL y FIREBASE_TOKEN para consultar las peticiones."
+                )
+            _fb_client = fbc.FirebaseClient.from_env()
+    return _fb_client.get(path)
 
 
 def _flatten_fallitos(raw) -> Dict[str, dict]:
@@ -1744,19 +2129,25 @@ def api_peticiones_get():
 def api_peticiones_refresh():
     """Consulta Firebase (songs/solicitudes y songs/fallitos), funde con el
     histórico local y lo persiste en peticiones/peticiones.json."""
+    return run_or_submit("peticiones-refresh", _peticiones_refresh, exclusive="peticiones")
+
+
+def _peticiones_refresh(progress: "jb.Progress") -> tuple:
     data = _load_peticiones_file()
     try:
+        progress("Firebase songs/solicitudes")
         sol_raw = _fb_get_json("songs/solicitudes")
+        progress("Firebase songs/fallitos")
         fal_raw = _fb_get_json("songs/fallitos")
-    except urllib.error.HTTPError as e:
-        return jsonify({
+    except fbc.FirebaseError as e:
+        return {
             "ok": False,
-            "error": f"Firebase respondió {e.code}. Revisa FIREBASE_TOKEN y los permisos de lectura.",
-        }), 502
-    except urllib.error.URLError as e:
-        return jsonify({"ok": False, "error": f"No pude conectar con Firebase: {e.reason}"}), 502
+            "error": f"Firebase respondió {e.status}. Revisa FIREBASE_TOKEN y los permisos de lectura.",
+        }, 502
+    except OSError as e:
+        return {"ok": False, "error": f"No pude conectar con Firebase: {e}"}, 502
     except Exception as e:
-        return jsonify({"ok": False, "error": str(e)}), 500
+        return {"ok": False, "error": str(e)}, 500
 
     now = datetime.now().astimezone().isoformat(timespec="seconds")
     sol_fetched = sol_raw if isinstance(sol_raw, dict) else {}
@@ -1772,13 +2163,17 @@ def api_peticiones_refresh():
     summary["fetched_solicitudes"] = len(sol_fetched)
     summary["fetched_fallitos"] = len(fal_fetched)
     summary["saved_to"] = str(PETICIONES_FILE.relative_to(REPO_DIR))
-    return jsonify({"ok": True, **summary})
+    return {"ok": True, **summary}, 200
 
 
 @app.route("/api/peticiones/commit", methods=["POST"])
 def api_peticiones_commit():
     """Hace git add/commit/push SOLO de la carpeta peticiones/ (no toca otras
     ediciones .cho que tengas en curso)."""
+    return run_or_submit("peticiones-commit", _peticiones_commit, exclusive="git")
+
+
+def _peticiones_commit(progress: "jb.Progress") -> tuple:
     data = _load_peticiones_file()
     counts = _peticiones_summary(data)["counts"]
     message = (
@@ -1788,6 +2183,7 @@ def api_peticiones_commit():
     steps = []
 
     def step(name, proc):
+        progress(f"git {name}")
         steps.append({
             "step": name, "returncode": proc.returncode,
             "stdout": proc.stdout, "stderr": proc.stderr,
@@ -1797,25 +2193,52 @@ def api_peticiones_commit():
     try:
         rel = str(PETICIONES_DIR.relative_to(REPO_DIR))
         if not step("add", _run_git(["add", rel])):
-            return jsonify({"ok": False, "steps": steps, "error": "Fallo en git add"}), 500
+            return {"ok": False, "steps": steps, "error": "Fallo en git add"}, 500
         commit = _run_git(["commit", "-m", message])
         step("commit", commit)
         nothing = "nothing to commit" in (commit.stdout + commit.stderr)
         if commit.returncode != 0 and not nothing:
-            return jsonify({"ok": False, "steps": steps, "error": "Fallo en git commit"}), 500
+            return {"ok": False, "steps": steps, "error": "Fallo en git commit"}, 500
         if nothing:
-            return jsonify({"ok": True, "nothing": True, "steps": steps,
-                            "message": "No hay cambios nuevos que guardar (ya estaba todo commiteado)."})
+            return {"ok": True, "nothing": True, "steps": steps,
+                    "message": "No hay cambios nuevos que guardar (ya estaba todo commiteado)."}, 200
         branch = _run_git(["rev-parse", "--abbrev-ref", "HEAD"]).stdout.strip()
         has_upstream = _run_git(["rev-parse", "--abbrev-ref", "@{u}"]).returncode == 0
         push_args = ["push"] if has_upstream else ["push", "-u", "origin", branch]
         if not step("push", _run_git(push_args, timeout=60)):
-            return jsonify({"ok": False, "steps": steps,
-                            "error": "Commit hecho, pero falló el push (¿conexión?)."}), 500
-        return jsonify({"ok": True, "branch": branch, "steps": steps,
-                        "message": f"Guardado y subido a la rama {branch}."})
+            return {"ok": False, "steps": steps,
+                    "error": "Commit hecho, pero falló el push (¿conexión?)."}, 500
+        return {"ok": True, "branch": branch, "steps": steps,
+                "message": f"Guardado y subido a la rama {branch}."}, 200
     except Exception as e:
-        return jsonify({"ok": False, "steps": steps, "error": str(e)}), 500
+        return {"ok": False, "steps": steps, "error": str(e)}, 500
+
+
+# ─────────── Arranque: precarga en segundo plano ─────────── #
+
+# CANTORAL_ADMIN_WARMUP=0 desactiva la precarga (todo se carga al primer uso)
+WARMUP_ENV = "CANTORAL_ADMIN_WARMUP"
+_warmup: Optional[st.WarmUp] = None
+
+
+def warm_up_steps() -> List[tuple]:
+    """Lo caro del primer /api/catalog, por orden: docx (lectura + conversión
+    de cada canción), .tex, índice de doceacordes e índice de búsqueda."""
+    return [
+        ("docx", lambda: [docx_conversion(s) for s in load_docx_songs()]),
+        ("latex", load_latex_items),
+        ("doceacordes", lambda: da.doce_items()),
+        ("búsqueda", get_search_index),
+    ]
+
+
+def start_warm_up() -> Optional[st.WarmUp]:
+    global _warmup
+    if os.environ.get(WARMUP_ENV, "1").strip().lower() in ("0", "no", "false", "off"):
+        return None
+    _warmup = st.WarmUp(warm_up_steps(), startup_report,
+                        on_done=lambda r: print(f"⏱  Arranque: {r.format()}", flush=True))
+    return _warmup.start()
 
 
 @app.route("/api/health")
@@ -1829,6 +2252,10 @@ def api_health():
         "ok": True,
         "songs_dir": str(SONGS_DIR),
         "docx_ok": docx_ok,
+        "startup": {
+            "warmup": _warmup.state if _warmup is not None else "off",
+            "phases": startup_report.as_dict(),
+        },
         "endpoints": [
             "GET  /api/catalog",
             "GET  /api/song?path=...",
@@ -1839,6 +2266,13 @@ def api_health():
             "POST /api/docx/import",
             "POST /api/reorder",
             "POST /api/build-json",
+            "GET  /api/build-json/history",
+            "GET  /api/search?q=...",
+            "POST /api/song/transpose?path=...",
+            "POST /api/category/transpose",
+            "GET  /api/jobs/<id>",
+            "GET  /api/jobs/<id>/events",
+            "POST /api/jobs/<id>/cancel",
         ],
     })
 
@@ -1846,8 +2280,19 @@ def api_health():
 def main():
     port = int(os.environ.get("CANTORAL_ADMIN_PORT", "8765"))
     host = os.environ.get("CANTORAL_ADMIN_HOST", "127.0.0.1")
-    print(f"\n🎵  Cantoral Admin\n   Abre  http://{host}:{port}/\n   Ctrl+C para parar\n")
-    app.run(host=host, port=port, debug=False)
+    startup_report.mark("servidor listo")
+    print(f"\n🎵  Cantoral Admin\n   Abre  http://{host}:{port}/\n   Ctrl+C para parar")
+    print(f"   Listo en {time.perf_counter() - _T0:.2f} s", end="")
+    print("; precargando docx, LaTeX y doceacordes en segundo plano\n" if start_warm_up() else "\n")
+    # Multihilo: un push o un fetch lento no deja en cola al catálogo ni al
+    # editor. waitress si está instalado; si no, el servidor de Flask con hilos.
+    try:
+        from waitress import serve
+    except ImportError:
+        app.run(host=host, port=port, debug=False, threaded=True)
+    else:
+        threads = int(os.environ.get("CANTORAL_ADMIN_THREADS", "8"))
+        serve(app, host=host, port=port, threads=threads)
 
 
 if __name__ == "__main__":
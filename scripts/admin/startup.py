@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Arranque rápido del admin: importadores perezosos, precarga en segundo
+plano e informe de tiempos.
+
+server.py no importa docx2chordpro, latex_import ni doceacordes_import al
+cargar: cada uno es un `LazyModule` que se importa la primera vez que se usa
+un atributo suyo. Al arrancar, `WarmUp` carga en un hilo las fuentes caras
+(docx, .tex, índice de doceacordes) mientras el servidor ya atiende; si una
+petición llega antes, carga ella lo que necesite (con los mismos locks, sin
+repetir trabajo).
+
+`StartupReport` apunta cuánto tarda cada fase (importar, leer el docx, …)
+desde que arrancó el proceso; se imprime al terminar la precarga y se
+devuelve en /api/health.
+"""
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+class StartupReport:
+    """Tiempos de arranque por fase (ms), relativos a `t0`."""
+
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._lock = threading.Lock()
+        self._phases: Dict[str, dict] = {}
+
+    def mark(self, name: str) -> None:
+        """Hito sin duración (p. ej. «servidor listo»)."""
+        self._add(name, None, None)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._add(name, time.perf_counter() - t, error)
+
+    def _add(self, name: str, seconds: Optional[float], error: Optional[str]) -> None:
+        entry = {"at_ms": round((time.perf_counter() - self.t0) * 1000, 1)}
+        if seconds is not None:
+            entry["ms"] = round(seconds * 1000, 1)
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self._phases.setdefault(name, entry)   # cuenta la primera vez
+
+    def as_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._phases.items()}
+
+    def format(self) -> str:
+        parts = []
+        for name, e in self.as_dict().items():
+            if "ms" in e:
+                parts.append(f"{name} {e['ms'] / 1000:.2f} s")
+            else:
+                parts.append(f"{name} a los {e['at_ms'] / 1000:.2f} s")
+            if "error" in e:
+                parts[-1] += " (error)"
+        return " · ".join(parts)
+
+
+class LazyModule:
+    """Proxy de un módulo que se importa al primer acceso a un atributo.
+    `d2c = LazyModule("docx2chordpro")` y luego `d2c.convert_song(...)` igual
+    que con `import docx2chordpro as d2c`."""
+
+    def __init__(self, name: str, report: Optional[StartupReport] = None):
+        self.__dict__["_name"] = name
+        self.__dict__["_report"] = report
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    if self._report is not None:
+                        with self._report.phase(f"import {self._name}"):
+                            module = importlib.import_module(self._name)
+                    else:
+                        module = importlib.import_module(self._name)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self.load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "cargado" if self.loaded else "sin cargar"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class WarmUp:
+    """Ejecuta `steps` [(nombre, función)] en orden en un hilo daemon y apunta
+    cada uno en `report`. Un paso que falla se anota y no para a los demás
+    (la petición que lo necesite volverá a intentarlo y verá el error)."""
+
+    def __init__(self, steps: Sequence[Tuple[str, Callable[[], object]]],
+                 report: StartupReport, on_done: Optional[Callable[[StartupReport], None]] = None):
+        self.steps: List[Tuple[str, Callable[[], object]]] = list(steps)
+        self.report = report
+        self.on_done = on_done
+        self.done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "WarmUp":
+        self._thread = threading.Thread(target=self._run, name="admin-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        try:
+            for name, fn in self.steps:
+                try:
+                    with self.report.phase(name):
+                        fn()
+                except (Exception, SystemExit):   # find_docx sale con sys.exit
+                    pass
+            self.report.mark("precarga completa")
+        finally:
+            self.done.set()
+            if self.on_done is not None:
+                self.on_done(self.report)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self.done.wait(timeout)
+
+    @property
+    def state(self) -> str:
+        if self._thread is None:
+            return "off"
+        return "done" if self.done.is_set() else "running"
@@ -145,12 +145,34 @@ function app() {
       setInterval(() => this.loadGitStatus(true), 90000);
     },
 
+    // ─────────── Tareas en segundo plano (/api/jobs) ───────────
+    // Lanza un endpoint lento (git, Firebase, doceacordes) con ?async=1 y espera
+    // el resultado consultando /api/jobs/<id>: el servidor sigue atendiendo al
+    // catálogo y al editor mientras tanto. Devuelve {status, data} como si
+    // hubiera sido una petición normal.
+    async runJob(url, init = {}) {
+      const r = await fetch(url + (url.includes('?') ? '&' : '?') + 'async=1', init);
+      const j = await r.json();
+      if (r.status !== 202 || !j.job) return { status: r.status, data: j };
+      for (;;) {
+        await new Promise(res => setTimeout(res, 500));
+        const jr = await fetch('/api/jobs/' + j.job.id);
+        const job = await jr.json();
+        if (!jr.ok) throw new Error(job.error || ('HTTP ' + jr.status));
+        // 'cancelled' también es final (cancelar, o cancelada antes de empezar: 409)
+        if (job.status === 'done' || job.status === 'error' || job.status === 'cancelled') {
+          return { status: job.http_status || 200, data: job.result || { ok: false, error: job.error } };
+        }
+      }
+    },
+
     // ─────────── Git: estado + commit/push rápido ───────────
     async loadGitStatus(fetch_ = false) {
       this.git.loading = true;
       try {
-        const r = await fetch('/api/git/status' + (fetch_ ? '?fetch=1' : ''));
-        const j = await r.json();
+        const { data: j } = fetch_
+          ? await this.runJob('/api/git/status?fetch=1')
+          : { data: await (await fetch('/api/git/status')).json() };
         if (j.ok) {
           this.git = {
             ...this.git,
@@ -193,12 +215,11 @@ function app() {
       m.saving = true;
       m.result = null;
       try {
-        const r = await fetch('/api/git/commit', {
+        const { data: j } = await this.runJob('/api/git/commit', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({ message: m.message.trim() }),
         });
-        const j = await r.json();
         if (!j.ok) throw new Error(j.error || 'Error en commit/push');
         m.result = 'ok';
         await this.loadGitStatus(true);
@@ -396,7 +417,7 @@ function app() {
       if (this.latexFolderFilter) list = list.filter(l => l.latex_folder === this.latexFolderFilter);
       if (this.latexMatchFilter === 'new') list = list.filter(l => !l.repo_match);
       else if (this.latexMatchFilter === 'match') list = list.filter(l => !!l.repo_match);
-      else if (this.latexMatchFilter === 'warn') list = list.filter(l => l.unknown_chords.length > 0);
+      else if (this.latexMatchFilter === 'warn') list = list.filter(l => l.unknown_chords.length > 0 || (l.unknown_macros || []).length > 0);
       if (this.latexSearch) {
         const q = this.normalizeSearch(this.latexSearch);
         list = list.filter(l => this.normalizeSearch(l.title).includes(q) || this.normalizeSearch(l.filename).includes(q));
@@ -624,12 +645,11 @@ function app() {
           include_meta: this.doceIncludeMeta,
           content: overrideContent || undefined,
         };
-        const r = await fetch('/api/doce/import', {
+        const { data: json } = await this.runJob('/api/doce/import', {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({ items: [item] }),
         });
-        const json = await r.json();
         const newResults = json.results || [];
         this.doceResults = [...newResults, ...this.doceResults].slice(0, 30);
         await this.loadDoce(true);
@@ -1945,9 +1965,8 @@ function app() {
       this.peticiones.error = null;
       this.peticiones.message = '';
       try {
-        const r = await fetch('/api/peticiones/refresh', { method: 'POST' });
-        const d = await r.json();
-        if (!d.ok) throw new Error(d.error || ('HTTP ' + r.status));
+        const { status, data: d } = await this.runJob('/api/peticiones/refresh', { method: 'POST' });
+        if (!d.ok) throw new Error(d.error || ('HTTP ' + status));
         this._applyPeticiones(d);
         this.peticiones.loaded = true;
         const ns = d.new_solicitudes || 0, nf = d.new_fallitos || 0;
@@ -1967,9 +1986,8 @@ function app() {
       this.peticiones.committing = true;
       this.peticiones.error = null;
       try {
-        const r = await fetch('/api/peticiones/commit', { method: 'POST' });
-        const d = await r.json();
-        if (!d.ok) throw new Error(d.error || ('HTTP ' + r.status));
+        const { status, data: d } = await this.runJob('/api/peticiones/commit', { method: 'POST' });
+        if (!d.ok) throw new Error(d.error || ('HTTP ' + status));
         this.peticiones.message = '✓ ' + (d.message || 'Guardado en el repo.');
         this.loadGitStatus(true);
       } catch (e) {
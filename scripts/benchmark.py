@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmarks del pipeline de conversión y build del cantoral.
+
+Mide tiempo (mín/mediana de N repeticiones, tras un calentamiento) y pico de
+memoria (tracemalloc, en una pasada aparte) de los caminos calientes:
+
+  build_json        crear_songs_json.main sobre una copia de songs/
+  docx_convert      docx2chordpro.convert_song sobre todas las canciones del docx
+  latex_scan        latex_import.scan_latex_files (scripts/input), en frío
+  latex_rescan      lo mismo sin cambios en los .tex (cache por fichero)
+  doce_candidates   doceacordes_import.find_candidates para cada título del repo
+  catalog           GET /api/catalog del admin (cachés calientes)
+  catalog_cold      GET /api/catalog sin cachés de docx/LaTeX
+  search_index      search_index.build_index sobre songs/
+
+Con --scale 1000,10000 repite build_json, search_index, list_repo_songs,
+catalog, docx_convert y latex_parse sobre corpus sintéticos de ese tamaño
+(generados con synth_corpus.py: .cho, docx y .tex realistas).
+
+Las entradas son fijas (ficheros del repo), así que dos ejecuciones en la misma
+máquina son comparables: --save guarda los resultados en JSON y --compare los
+contrasta con uno guardado, marcando las regresiones.
+
+Uso:
+  python scripts/benchmark.py                         # todo, 5 repeticiones
+  python scripts/benchmark.py --only build_json,catalog --repeat 10
+  python scripts/benchmark.py --scale 1000,10000 --save bench-base.json
+  python scripts/benchmark.py --compare bench-base.json --fail-on-regression
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPTS_DIR.parent
+SONGS_DIR = REPO_DIR / "songs"
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+FORMAT_VERSION = 1
+DEFAULT_THRESHOLD = 0.15  # +15 % sobre la mediana/pico = regresión
+
+
+class Skip(Exception):
+    """El benchmark no puede correr aquí (falta el docx, Flask…)."""
+
+
+# ─────────── Registro de benchmarks ─────────── #
+#
+# Cada benchmark es una función de preparación que recibe el directorio
+# temporal de la sesión y devuelve {"fn": callable, "n": nº de elementos,
+# "reset": callable opcional, sin cronometrar, antes de cada repetición,
+# "teardown": callable opcional al terminar}.
+
+BENCHES: Dict[str, Callable[[Path], dict]] = {}
+
+
+def bench(name: str):
+    def deco(setup: Callable[[Path], dict]):
+        BENCHES[name] = setup
+        return setup
+    return deco
+
+
+def _quiet(fn: Callable[[], object]) -> Callable[[], object]:
+    """Envuelve `fn` descartando lo que imprime (los scripts son muy verbosos)."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def _copy_songs(dest: Path, src: Path = SONGS_DIR) -> Path:
+    """Copia las carpetas de categoría + indice.json (sin los songs-v*.json)."""
+    dest.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(src / "indice.json", dest / "indice.json")
+    for d in src.iterdir():
+        if d.is_dir():
+            shutil.copytree(d, dest / d.name)
+    return dest
+
+
+def _clear_versions(songs_dir: Path) -> None:
+    # también el manifiesto: si no, una build idéntica sería un no-op
+    for p in [*songs_dir.glob("songs-v*.json"), *songs_dir.glob("songs-manifest.json")]:
+        p.unlink()
+
+
+def _build_json_bench(songs_dir: Path) -> dict:
+    import crear_songs_json as csj
+    n = len(list(songs_dir.glob("*/*.cho")))
+    return {"fn": _quiet(lambda: csj.main(str(songs_dir))), "n": n,
+            "reset": lambda: _clear_versions(songs_dir)}
+
+
+@bench("build_json")
+def _bench_build_json(tmp: Path) -> dict:
+    return _build_json_bench(_copy_songs(tmp / "songs"))
+
+
+@bench("docx_convert")
+def _bench_docx_convert(tmp: Path) -> dict:
+    import docx2chordpro as d2c
+    matches = list(d2c.SCRIPT_DIR.glob(d2c.DOCX_GLOB))
+    if not matches:
+        raise Skip("no hay .docx del cantoral en scripts/")
+    songs = d2c.split_into_songs(d2c.load_paragraphs(matches[0]))
+    return {"fn": lambda: [d2c.convert_song(s) for s in songs], "n": len(songs)}
+
+
+@bench("latex_scan")
+def _bench_latex_scan(tmp: Path) -> dict:
+    import latex_import as lx
+    n = len(list(lx.INPUT_DIR.glob("*/*.tex")))
+    if not n:
+        raise Skip("no hay .tex en scripts/input")
+    # En frío: sin la cache de parseo por fichero (ver latex_rescan)
+    return {"fn": _quiet(lx.scan_latex_files), "n": n, "reset": lx.clear_parse_cache}
+
+
+@bench("latex_rescan")
+def _bench_latex_rescan(tmp: Path) -> dict:
+    import latex_import as lx
+    n = len(list(lx.INPUT_DIR.glob("*/*.tex")))
+    if not n:
+        raise Skip("no hay .tex en scripts/input")
+    return {"fn": _quiet(lx.scan_latex_files), "n": n}
+
+
+@bench("doce_candidates")
+def _bench_doce_candidates(tmp: Path) -> dict:
+    import chordpro as cp
+    import doceacordes_import as da
+    if not da.DOCE_INDEX_JSON.exists():
+        raise Skip("falta canciones_doce_acordes.json")
+    titles = []
+    for p in sorted(SONGS_DIR.glob("*/*.cho")):
+        meta = cp.parse_basic_meta(p.read_text(encoding="utf-8"))
+        titles.append((meta["title"], meta["author"]))
+    da.doce_items()  # carga del índice fuera del cronómetro
+    return {"fn": lambda: [da.find_candidates(t, a) for t, a in titles], "n": len(titles)}
+
+
+def _catalog_client():
+    try:
+        import server
+    except ImportError as e:  # Flask no instalado
+        raise Skip(f"admin no importable: {e}")
+    return server, server.app.test_client()
+
+
+def _get_catalog(client) -> None:
+    resp = client.get("/api/catalog")
+    if resp.status_code != 200:
+        raise RuntimeError(f"/api/catalog devolvió {resp.status_code}")
+
+
+@bench("catalog")
+def _bench_catalog(tmp: Path) -> dict:
+    server, client = _catalog_client()
+    n = len(list(SONGS_DIR.glob("*/*.cho")))
+    return {"fn": _quiet(lambda: _get_catalog(client)), "n": n}
+
+
+@bench("catalog_cold")
+def _bench_catalog_cold(tmp: Path) -> dict:
+    server, client = _catalog_client()
+
+    def reset():
+        server._docx_cache["songs"] = None
+        server._latex_cache["items"] = None
+        server.lx.clear_parse_cache()
+
+    n = len(list(SONGS_DIR.glob("*/*.cho")))
+    return {"fn": _quiet(lambda: _get_catalog(client)), "n": n, "reset": reset}
+
+
+@bench("search_index")
+def _bench_search_index(tmp: Path) -> dict:
+    import search_index as si
+    n = len(list(SONGS_DIR.glob("*/*.cho")))
+    return {"fn": lambda: si.build_index(SONGS_DIR, REPO_DIR), "n": n}
+
+
+# ─────────── Corpus sintético (synth_corpus.py) ─────────── #
+
+def _synth(tmp: Path, n: int) -> Path:
+    """songs/ sintético de `n` canciones, compartido por los benchmarks de ese tamaño."""
+    import synth_corpus as sc
+    root = tmp.parent / f"synth-{n}"
+    if not (root / "songs").exists():
+        sc.write_cho_corpus(root / "songs", n)
+    return root
+
+
+def _admin_at(root: Path):
+    """Apunta el admin a otro árbol (root/songs) y devuelve cómo restaurarlo."""
+    server, client = _catalog_client()
+    saved = (server.REPO_DIR, server.SONGS_DIR, server.INDICE_JSON)
+    server.REPO_DIR, server.SONGS_DIR = root, root / "songs"
+    server.INDICE_JSON = root / "songs" / "indice.json"
+
+    def restore():
+        server.REPO_DIR, server.SONGS_DIR, server.INDICE_JSON = saved
+    return server, client, restore
+
+
+def scaled_benches(scales: List[int]) -> Dict[str, Callable[[Path], dict]]:
+    """Benchmarks sobre corpus sintéticos de cada tamaño de `scales`."""
+    out: Dict[str, Callable[[Path], dict]] = {}
+    for n in scales:
+        def build(tmp: Path, n=n) -> dict:
+            root = _synth(tmp, n)
+            work = _copy_songs(tmp / "songs", root / "songs")
+            return _build_json_bench(work)
+
+        def index(tmp: Path, n=n) -> dict:
+            import search_index as si
+            root = _synth(tmp, n)
+            return {"fn": lambda: si.build_index(root / "songs", root), "n": n}
+
+        def repo_songs(tmp: Path, n=n) -> dict:
+            server, _, restore = _admin_at(_synth(tmp, n))
+            return {"fn": server.list_repo_songs, "n": n, "teardown": restore}
+
+        def catalog(tmp: Path, n=n) -> dict:
+            _, client, restore = _admin_at(_synth(tmp, n))
+            return {"fn": _quiet(lambda: _get_catalog(client)), "n": n, "teardown": restore}
+
+        def docx(tmp: Path, n=n) -> dict:
+            import docx2chordpro as d2c
+            import synth_corpus as sc
+            path = sc.write_docx_corpus(tmp / sc.DOCX_NAME, n)
+            songs = d2c.split_into_songs(d2c.load_paragraphs(path))
+            return {"fn": lambda: [d2c.convert_song(s) for s in songs], "n": len(songs)}
+
+        def latex(tmp: Path, n=n) -> dict:
+            import latex_import as lx
+            import synth_corpus as sc
+            paths = sc.write_tex_corpus(tmp / "input", n)
+            return {"fn": _quiet(lambda: [lx.parse_latex_song(p) for p in paths]), "n": n}
+
+        out[f"build_json@{n}"] = build
+        out[f"search_index@{n}"] = index
+        out[f"list_repo_songs@{n}"] = repo_songs
+        out[f"catalog@{n}"] = catalog
+        out[f"docx_convert@{n}"] = docx
+        out[f"latex_parse@{n}"] = latex
+    return out
+
+
+# ─────────── Medición ─────────── #
+
+def measure(spec: dict, repeat: int) -> dict:
+    fn, reset = spec["fn"], spec.get("reset")
+    if reset:
+        reset()
+    fn()  # calentamiento (imports perezosos, cachés de primer uso)
+    times = []
+    for _ in range(repeat):
+        if reset:
+            reset()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    # Memoria en una pasada aparte: tracemalloc ralentiza y falsearía los tiempos
+    if reset:
+        reset()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    median = statistics.median(times)
+    n = spec.get("n") or 0
+    return {
+        "n": n,
+        "repeat": repeat,
+        "min_ms": round(min(times) * 1000, 3),
+        "median_ms": round(median * 1000, 3),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        "per_item_us": round(median / n * 1e6, 2) if n else None,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                             capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def run(names: Optional[List[str]] = None, repeat: int = 5,
+        scales: List[int] = ()) -> dict:
+    """Ejecuta los benchmarks pedidos y devuelve el informe (serializable)."""
+    benches = dict(BENCHES)
+    benches.update(scaled_benches(list(scales)))
+    if names:
+        unknown = [n for n in names if n not in benches]
+        if unknown:
+            raise ValueError(f"Benchmarks desconocidos: {', '.join(unknown)}")
+        benches = {n: benches[n] for n in names}
+    results: Dict[str, dict] = {}
+    skipped: Dict[str, str] = {}
+    with tempfile.TemporaryDirectory(prefix="cantoral-bench-") as tmp:
+        for name, setup in benches.items():
+            bench_dir = Path(tmp) / name.replace("@", "-")
+            bench_dir.mkdir()
+            try:
+                spec = setup(bench_dir)
+            except Skip as e:
+                skipped[name] = str(e)
+                print(f"⏭️  {name}: {e}")
+                continue
+            reps = repeat if "@" not in name else max(1, min(repeat, 3))
+            try:
+                res = measure(spec, reps)
+            finally:
+                if spec.get("teardown"):
+                    spec["teardown"]()
+            results[name] = res
+            print(f"⏱️  {name:22s} {res['median_ms']:10.1f} ms  "
+                  f"(mín {res['min_ms']:.1f}, n={res['n']}, pico {res['peak_kb']:.0f} KB)")
+    return {
+        "version": FORMAT_VERSION,
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """Contrasta dos informes. Devuelve una fila por benchmark común con el
+    cambio relativo de mediana y pico; `regression` si alguno supera `threshold`."""
+    rows = []
+    for name, cur in current.get("results", {}).items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        d_time = cur["median_ms"] / base["median_ms"] - 1 if base["median_ms"] else 0.0
+        d_mem = cur["peak_kb"] / base["peak_kb"] - 1 if base["peak_kb"] else 0.0
+        rows.append({
+            "name": name,
+            "median_ms": cur["median_ms"], "base_median_ms": base["median_ms"],
+            "time_delta": round(d_time, 4),
+            "peak_kb": cur["peak_kb"], "base_peak_kb": base["peak_kb"],
+            "mem_delta": round(d_mem, 4),
+            "regression": d_time > threshold or d_mem > threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[dict]) -> None:
+    print("\n📊 Comparación con la línea base:")
+    for r in rows:
+        mark = "⚠️ " if r["regression"] else "✅"
+        print(f"  {mark} {r['name']:22s} tiempo {r['time_delta']:+7.1%} "
+              f"({r['base_median_ms']:.1f} → {r['median_ms']:.1f} ms)  "
+              f"memoria {r['mem_delta']:+7.1%}")
+
+
+# ─────────── CLI ─────────── #
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del cantoral")
+    parser.add_argument("--only", help="Lista separada por comas (ver --list)")
+    parser.add_argument("--list", action="store_true", help="Lista los benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", default="",
+                        help="Tamaños del corpus sintético, p.ej. 100,1000,10000")
+    parser.add_argument("--save", metavar="PATH", help="Guarda el informe en JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Informe base con el que comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Cambio relativo que cuenta como regresión (0.15 = 15%%)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Sale con código 1 si hay regresiones")
+    args = parser.parse_args(argv)
+
+    scales = [int(x) for x in args.scale.split(",") if x.strip()]
+    if args.list:
+        for name in list(BENCHES) + list(scaled_benches(scales or [100])):
+            print(name)
+        return 0
+    names = [n.strip() for n in args.only.split(",")] if args.only else None
+    report = run(names, repeat=args.repeat, scales=scales)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Informe guardado en {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print_comparison(rows)
+        if args.fail_on_regression and any(r["regression"] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
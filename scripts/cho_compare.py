@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Comparación en bloque de ChordPro: .cho del repo vs conversión generada.
+
+Lo usa `docx2chordpro.py compare --all` (y vale para cualquier par de .cho).
+
+  - `normalize`: una sola pasada por texto. Saltos de línea y Unicode (NFC)
+    unificados, sin espacios al final ni directivas multimedia, y bloques de
+    líneas en blanco colapsados. Cada línea queda separada en letra + acordes
+    con su posición.
+  - `compare`: similitud por líneas. Primero alinea líneas enteras (las
+    iguales cuentan enteras y solo las sustituidas se comparan carácter a
+    carácter), así que no hace un SequenceMatcher de la canción entera. Con
+    `reject`, las cotas baratas (longitudes y `quick_ratio`) descartan antes
+    los pares que no llegan. Además da la similitud de la letra sola, la
+    colocación de acordes y el diff de la letra.
+  - `compare_many`: lo mismo para muchos pares, en paralelo (procesos).
+  - `write_report`: informe JSON o CSV.
+
+Solo stdlib (más `chordpro` del propio repo).
+"""
+from __future__ import annotations
+
+import csv
+import difflib
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import chordpro as cp
+
+CHORD_RX = re.compile(r"\[([^\]]*)\]")
+DIRECTIVE_RX = re.compile(r"^\s*\{[^}]*\}\s*$")
+
+# Dos líneas sustituidas con menos parecido que esto (cota de quick_ratio) se
+# cuentan como distintas sin calcular el emparejamiento exacto
+LINE_FLOOR = 0.3
+# Líneas de diff de letra que se guardan por canción en el informe
+MAX_DIFF_LINES = 40
+
+
+class Line(NamedTuple):
+    text: str                            # línea normalizada (con acordes)
+    lyric: str                           # letra sin acordes
+    chords: Tuple[Tuple[int, str], ...]  # (posición en `lyric`, acorde)
+    directive: bool                      # {title: …}, {soc}, …
+
+
+class Song(NamedTuple):
+    text: str
+    lines: Tuple[Line, ...]
+
+
+def split_line(line: str) -> Line:
+    """Separa «[G]Ven a cele[D]brar» en letra y (posición, acorde)."""
+    chords, parts, pos, last = [], [], 0, 0
+    for m in CHORD_RX.finditer(line):
+        chunk = line[last:m.start()]
+        parts.append(chunk)
+        pos += len(chunk)
+        chords.append((pos, m.group(1).strip()))
+        last = m.end()
+    parts.append(line[last:])
+    lyric = "".join(parts).rstrip()
+    return Line(line, lyric, tuple(chords), bool(DIRECTIVE_RX.match(line)))
+
+
+def normalize(text: str) -> Song:
+    text = unicodedata.normalize("NFC", cp.strip_media(cp.nl(text)))
+    lines: List[Line] = []
+    blank = True  # colapsa blancos (y quita los del principio)
+    for raw in text.split("\n"):
+        line = raw.rstrip()
+        if not line:
+            if not blank:
+                lines.append(Line("", "", (), False))
+            blank = True
+            continue
+        blank = False
+        lines.append(split_line(line))
+    while lines and not lines[-1].text:
+        lines.pop()
+    return Song("\n".join(ln.text for ln in lines), tuple(lines))
+
+
+# ─────────── Similitud ─────────── #
+
+# Dentro de un bloque sustituido se busca primero la pareja más parecida por
+# encima de este umbral (el mismo que usa difflib.Differ)
+PAIR_CUTOFF = 0.75
+# Bloques más grandes que esto (líneas × líneas) no buscan pareja: van en orden
+MAX_BLOCK_CELLS = 2500
+
+
+@lru_cache(maxsize=8192)
+def _matches(a: str, b: str) -> int:
+    """Caracteres coincidentes entre dos líneas (0 si ni la cota LINE_FLOOR
+    llega). Cacheado: estribillos y líneas repetidas se comparan una vez."""
+    if a == b:
+        return len(a)
+    sm = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    if sm.real_quick_ratio() < LINE_FLOOR or sm.quick_ratio() < LINE_FLOOR:
+        return 0
+    return sum(m.size for m in sm.get_matching_blocks())
+
+
+@lru_cache(maxsize=8192)
+def _quick(a: str, b: str) -> float:
+    """Cota superior barata de la similitud de dos líneas (`quick_ratio`)."""
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).quick_ratio()
+
+
+def _align_block(a: Sequence[str], b: Sequence[str], i1: int, i2: int, j1: int, j2: int,
+                 out: List[Tuple[int, int, int]]) -> None:
+    """Empareja las líneas de un bloque sustituido como `difflib.Differ`: la
+    pareja más parecida (≥ PAIR_CUTOFF, podando con las cotas baratas antes
+    de calcular nada) y recursivamente lo que queda a cada lado. Si no hay
+    ninguna tan parecida, en orden. Añade (i, j, coincidencias)."""
+    if i1 >= i2 or j1 >= j2:
+        return
+    best, bi, bj = PAIR_CUTOFF, -1, -1
+    if (i2 - i1) * (j2 - j1) <= MAX_BLOCK_CELLS:
+        for i in range(i1, i2):
+            la = len(a[i])
+            for j in range(j1, j2):
+                lb = len(b[j])
+                if la + lb == 0 or 2.0 * min(la, lb) / (la + lb) <= best:
+                    continue  # cota por longitudes
+                if _quick(a[i], b[j]) <= best:
+                    continue  # cota por multiconjunto de caracteres
+                r = 2.0 * _matches(a[i], b[j]) / (la + lb)
+                if r > best:
+                    best, bi, bj = r, i, j
+    if bi < 0:
+        for i, j in zip(range(i1, i2), range(j1, j2)):
+            m = _matches(a[i], b[j])
+            if m:
+                out.append((i, j, m))
+        return
+    _align_block(a, b, i1, bi, j1, bj, out)
+    out.append((bi, bj, _matches(a[bi], b[bj])))
+    _align_block(a, b, bi + 1, i2, bj + 1, j2, out)
+
+
+def line_similarity(a: Sequence[str], b: Sequence[str]) -> Tuple[float, List[Tuple[int, int]]]:
+    """(similitud 0..1, pares (i, j) de líneas alineadas). Como la `ratio()`
+    por caracteres (contando el salto de línea), pero alineando primero
+    líneas enteras: solo las de los bloques sustituidos se comparan carácter
+    a carácter."""
+    sm = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    matched, pairs = 0, []
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == "equal":
+            matched += sum(len(x) + 1 for x in a[i1:i2])
+            pairs.extend(zip(range(i1, i2), range(j1, j2)))
+        elif tag == "replace":
+            block: List[Tuple[int, int, int]] = []
+            _align_block(a, b, i1, i2, j1, j2, block)
+            for i, j, m in block:
+                matched += m + 1
+                pairs.append((i, j))
+    total = sum(len(x) + 1 for x in a) + sum(len(x) + 1 for x in b)
+    return (2.0 * matched / total if total else 1.0), pairs
+
+
+def chord_placement(a: Sequence[Line], b: Sequence[Line],
+                    pairs: Sequence[Tuple[int, int]]) -> Tuple[int, int]:
+    """(acordes en la misma posición y con el mismo nombre, total) sobre las
+    líneas de letra alineadas. El total es, por línea, el máximo de acordes
+    de las dos versiones; los acordes de líneas sin pareja cuentan como fallo."""
+    placed = total = 0
+    seen_a, seen_b = set(), set()
+    for i, j in pairs:
+        seen_a.add(i)
+        seen_b.add(j)
+        ca, cb = set(a[i].chords), set(b[j].chords)
+        placed += len(ca & cb)
+        total += max(len(ca), len(cb))
+    total += sum(len(ln.chords) for k, ln in enumerate(a) if k not in seen_a)
+    total += sum(len(ln.chords) for k, ln in enumerate(b) if k not in seen_b)
+    return placed, total
+
+
+def compare(original: str, generated: str, reject: float = 0.0) -> Dict[str, object]:
+    """Compara dos .cho. Con `reject > 0`, si las cotas superiores baratas ya
+    quedan por debajo se devuelve la cota (`bounded: True`) sin más detalle."""
+    a, b = normalize(original), normalize(generated)
+    if reject > 0:
+        sm = difflib.SequenceMatcher(None, a.text, b.text, autojunk=False)
+        bound = sm.real_quick_ratio()
+        if bound >= reject:
+            bound = sm.quick_ratio()
+        if bound < reject:
+            return {"similarity": round(bound, 4), "bounded": True, "lyricSimilarity": None,
+                    "chordPlacement": None, "chordsPlaced": None, "chordsTotal": None,
+                    "lyricDiff": []}
+
+    similarity, _ = line_similarity([ln.text for ln in a.lines], [ln.text for ln in b.lines])
+    la = [ln for ln in a.lines if not ln.directive and ln.lyric]
+    lb = [ln for ln in b.lines if not ln.directive and ln.lyric]
+    # La letra se compara sin mayúsculas (el docx pone los estribillos en mayúsculas)
+    lyric_sim, pairs = line_similarity([ln.lyric.casefold() for ln in la],
+                                       [ln.lyric.casefold() for ln in lb])
+    placed, total = chord_placement(la, lb, pairs)
+    diff = list(difflib.unified_diff([ln.lyric for ln in la], [ln.lyric for ln in lb],
+                                     "existing", "generated", n=0, lineterm=""))[2:]
+    return {
+        "similarity": round(similarity, 4),
+        "bounded": False,
+        "lyricSimilarity": round(lyric_sim, 4),
+        "chordPlacement": round(placed / total, 4) if total else 1.0,
+        "chordsPlaced": placed,
+        "chordsTotal": total,
+        "lyricDiff": diff[:MAX_DIFF_LINES],
+    }
+
+
+def _compare_args(args: Tuple[str, str, float]) -> Dict[str, object]:
+    return compare(*args)
+
+
+def compare_many(pairs: Sequence[Tuple[str, str]], reject: float = 0.0,
+                 workers: int = 0) -> List[Dict[str, object]]:
+    """`compare` para cada (original, generado), en orden. Con `workers > 1`
+    en procesos aparte."""
+    jobs = [(a, b, reject) for a, b in pairs]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_compare_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    return [compare(*job) for job in jobs]
+
+
+# ─────────── Informe ─────────── #
+
+CSV_FIELDS = ("index", "section", "title", "path", "status", "similarity", "bounded",
+              "lyricSimilarity", "chordPlacement", "chordsPlaced", "chordsTotal",
+              "lyricDiffLines")
+
+
+def write_report(rows: Sequence[Dict[str, object]], path: str,
+                 fields: Sequence[str] = CSV_FIELDS) -> None:
+    """JSON (lista de filas, con el diff de letra) o CSV (una fila por canción,
+    con las columnas `fields` y el número de líneas de diff) según la
+    extensión de `path`."""
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            w.writeheader()
+            for row in rows:
+                w.writerow({**row, "lyricDiffLines": len(row.get("lyricDiff") or [])})
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(list(rows), f, ensure_ascii=False, indent=2)
+            f.write("\n")
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Evaluación de la colocación de acordes de los importadores frente a los
+.cho revisados a mano de /songs.
+
+Importadores evaluados:
+  - docx         `docx2chordpro.convert_song` sobre el Cantoral Castellón.
+  - latex        `tab2chordpro.latex_to_chordpro` (vía admin/latex_import)
+                 sobre scripts/input/*/*.tex y scripts/ejempos_latex/*.tex.
+  - doceacordes  `adapt_chordpro` sobre los .cho crudos de la caché
+                 (scripts/cache_doceacordes) y de scripts/ejemplos_doceacordes.es.
+
+Cada lado se parte en tuplas (letra, acorde, posición) con `cho_compare`;
+las líneas de letra se alinean igual que en `compare --all` y, dentro de
+cada par de líneas, los acordes se emparejan por nombre y en orden. El
+error de un acorde es la diferencia de posición (en caracteres, con signo:
+positivo = el importador lo pone más a la derecha) tras llevar la posición
+generada a las coordenadas de la letra revisada.
+
+El parseo de los .cho revisados se cachea por (ruta, mtime, tamaño), así que
+evaluar muchas variantes de un importador (p. ej. barridos de
+CHORD_STACK_THRESHOLD_PX / WORD_PREFERENCE_PX) solo parsea el repo una vez.
+
+Uso:
+  python scripts/chord_eval.py                          # los tres importadores
+  python scripts/chord_eval.py --importer latex doceacordes --worst 10
+  python scripts/chord_eval.py --workers 4 --report /tmp/acordes.csv
+
+Solo stdlib (más los módulos del propio repo; el docx necesita Pillow).
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import difflib
+import re
+import statistics
+import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import chordpro as cp
+import cho_compare as cc
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPT_DIR.parent
+SONGS_DIR = REPO_DIR / "songs"
+ADMIN_DIR = SCRIPT_DIR / "admin"
+LATEX_DIRS = (SCRIPT_DIR / "input", SCRIPT_DIR / "ejempos_latex")
+DOCE_DIRS = (SCRIPT_DIR / "cache_doceacordes", SCRIPT_DIR / "ejemplos_doceacordes.es")
+
+# Errores de hasta estos caracteres cuentan como "cerca" (misma sílaba)
+NEAR_CHARS = 2
+# Cubos del histograma de |error|: 0, 1, 2, 3-5, 6-10, >10
+HIST_EDGES = (0, 1, 2, 5, 10)
+
+
+class Sample(NamedTuple):
+    importer: str   # docx | latex | doceacordes
+    name: str       # de dónde sale (índice del docx, ruta del .tex/.cho)
+    title: str
+    text: str       # .cho generado por el importador
+
+
+# ─────────── Parseo cacheado ─────────── #
+
+def chord_tuples(song: cc.Song) -> List[Tuple[str, str, int]]:
+    """(letra, acorde, posición) de todas las líneas de la canción."""
+    return [(ln.lyric, chord, pos) for ln in song.lines if not ln.directive
+            for pos, chord in ln.chords]
+
+
+@lru_cache(maxsize=4096)
+def _parse_file(path: str, mtime_ns: int, size: int) -> cc.Song:
+    return cc.normalize(Path(path).read_text(encoding="utf-8", errors="replace"))
+
+
+def curated_song(path: Path) -> cc.Song:
+    """`cc.normalize` de un .cho del repo, parseado una vez por versión del
+    fichero (la clave incluye mtime y tamaño: si se edita, se vuelve a leer)."""
+    st = path.stat()
+    return _parse_file(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _norm_title(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    return re.sub(r"[^a-z0-9]+", " ", s).strip()
+
+
+class CuratedIndex:
+    """{título normalizado: ruta} de los .cho de /songs. Mismo criterio que
+    `docx2chordpro.find_existing_cho`: exacto y, si no, por substring."""
+
+    def __init__(self, songs_dir: Path = SONGS_DIR):
+        self.by_title: Dict[str, Path] = {}
+        for cho in sorted(songs_dir.rglob("*.cho")) if songs_dir.exists() else ():
+            try:
+                head = cho.read_text(encoding="utf-8", errors="replace")[:500]
+            except OSError:
+                continue
+            title = cp.get_directive(head, "title")
+            if title:
+                self.by_title.setdefault(_norm_title(title), cho)
+
+    def find(self, title: str) -> Optional[Path]:
+        key = _norm_title(title)
+        if not key:
+            return None
+        if key in self.by_title:
+            return self.by_title[key]
+        for k, p in self.by_title.items():
+            if key in k or k in key:
+                return p
+        return None
+
+
+# ─────────── Emparejado de acordes ─────────── #
+
+def _offset_map(cur: str, gen: str) -> Callable[[int], int]:
+    """Función posición-en-`gen` → posición-en-`cur`, por los bloques comunes
+    de las dos letras. Entre bloques se avanza desde el final del anterior."""
+    if cur == gen:
+        return lambda j: j
+    blocks = difflib.SequenceMatcher(None, cur, gen, autojunk=False).get_matching_blocks()
+    starts = [b.b for b in blocks]
+
+    def to_cur(j: int) -> int:
+        k = bisect.bisect_right(starts, j) - 1
+        if k < 0:
+            return min(j, len(cur))
+        blk = blocks[k]
+        if j < blk.b + blk.size:
+            return blk.a + (j - blk.b)
+        return min(blk.a + blk.size + (j - blk.b - blk.size), len(cur))
+    return to_cur
+
+
+def match_line(cur: cc.Line, gen: cc.Line) -> Tuple[List[int], int, int, int]:
+    """(errores con signo de los acordes emparejados, renombrados, faltan,
+    sobran) de un par de líneas alineadas. Se emparejan por nombre y en
+    orden; en un tramo sustituido, los primeros de cada lado cuentan como
+    renombrados (se mide su posición igualmente) y el resto faltan o sobran."""
+    ca, cb = cur.chords, gen.chords
+    if not ca or not cb:
+        return [], 0, len(ca), len(cb)
+    to_cur = _offset_map(cur.lyric.casefold(), gen.lyric.casefold())
+    sm = difflib.SequenceMatcher(None, [c for _, c in ca], [c for _, c in cb], autojunk=False)
+    errors: List[int] = []
+    renamed = missing = extra = 0
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        n = i2 - i1 if tag == "equal" else min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        errors.extend(to_cur(cb[j1 + k][0]) - ca[i1 + k][0] for k in range(n))
+        if tag == "replace":
+            renamed += n
+        missing += i2 - i1 - n
+        extra += j2 - j1 - n
+    return errors, renamed, missing, extra
+
+
+def _chord_lines(song: cc.Song) -> List[cc.Line]:
+    return [ln for ln in song.lines if not ln.directive and (ln.lyric or ln.chords)]
+
+
+def evaluate_songs(cur: cc.Song, gen: cc.Song) -> Dict[str, object]:
+    """Estadísticas de colocación de `gen` frente a la versión revisada `cur`."""
+    la, lb = _chord_lines(cur), _chord_lines(gen)
+    # Como en cho_compare: la letra se alinea sin mayúsculas
+    _, pairs = cc.line_similarity([ln.lyric.casefold() for ln in la],
+                                  [ln.lyric.casefold() for ln in lb])
+    errors: List[int] = []
+    renamed = missing = extra = 0
+    seen_a, seen_b = set(), set()
+    for i, j in pairs:
+        seen_a.add(i)
+        seen_b.add(j)
+        e, r, m, x = match_line(la[i], lb[j])
+        errors.extend(e)
+        renamed, missing, extra = renamed + r, missing + m, extra + x
+    missing += sum(len(ln.chords) for k, ln in enumerate(la) if k not in seen_a)
+    extra += sum(len(ln.chords) for k, ln in enumerate(lb) if k not in seen_b)
+    return _stats(errors, renamed, missing, extra)
+
+
+def _stats(errors: Sequence[int], renamed: int, missing: int, extra: int) -> Dict[str, object]:
+    absolute = sorted(abs(e) for e in errors)
+    curated = len(errors) + missing
+    exact = sum(1 for e in absolute if e == 0)
+    near = sum(1 for e in absolute if e <= NEAR_CHARS)
+    return {
+        "chordsCurated": curated,
+        "chordsGenerated": len(errors) + extra,
+        "matched": len(errors),
+        "renamed": renamed,
+        "missing": missing,
+        "extra": extra,
+        "exact": exact,
+        "near": near,
+        # Sobre el total de acordes de cualquiera de los dos lados
+        "exactRate": round(exact / (curated + extra), 4) if curated + extra else 1.0,
+        "meanAbsError": round(statistics.fmean(absolute), 3) if absolute else None,
+        "medianAbsError": statistics.median(absolute) if absolute else None,
+        "maxAbsError": absolute[-1] if absolute else None,
+        "offsetErrors": list(errors),
+    }
+
+
+def evaluate(curated: str, generated: str) -> Dict[str, object]:
+    """`evaluate_songs` sobre dos textos .cho."""
+    return evaluate_songs(cc.normalize(curated), cc.normalize(generated))
+
+
+def evaluate_path(curated_path: Path, generated: str) -> Dict[str, object]:
+    """Como `evaluate`, con el .cho revisado del parseo cacheado."""
+    return evaluate_songs(curated_song(Path(curated_path)), cc.normalize(generated))
+
+
+def _evaluate_args(args: Tuple[str, str]) -> Dict[str, object]:
+    return evaluate_path(Path(args[0]), args[1])
+
+
+def evaluate_many(jobs: Sequence[Tuple[Path, str]], workers: int = 0) -> List[Dict[str, object]]:
+    """`evaluate_path` para cada (ruta revisada, .cho generado), en orden. Con
+    `workers > 1` en procesos aparte (cada uno con su caché de parseo)."""
+    jobs = [(str(p), text) for p, text in jobs]
+    if workers and workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_evaluate_args, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    return [_evaluate_args(job) for job in jobs]
+
+
+def histogram(errors: Iterable[int]) -> Dict[str, int]:
+    """|error| repartido en los cubos de HIST_EDGES."""
+    labels = ["0", "1", "2", "3-5", "6-10", ">10"]
+    out = dict.fromkeys(labels, 0)
+    for e in errors:
+        out[labels[bisect.bisect_left(HIST_EDGES, abs(e))]] += 1
+    return out
+
+
+def summarize(rows: Sequence[Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+    """Totales por importador (solo filas evaluadas) con la distribución de
+    |error| de todos sus acordes."""
+    groups: Dict[str, List[Dict[str, object]]] = {}
+    for row in rows:
+        if row.get("status") == "evaluated":
+            groups.setdefault(str(row["importer"]), []).append(row)
+    out: Dict[str, Dict[str, object]] = {}
+    for importer, group in groups.items():
+        errors = [e for row in group for e in row["offsetErrors"]]
+        stats = _stats(errors, *(sum(int(r[k]) for r in group) for k in ("renamed", "missing", "extra")))
+        absolute = sorted(abs(e) for e in errors)
+        stats["songs"] = len(group)
+        stats["p90AbsError"] = absolute[int(0.9 * (len(absolute) - 1))] if absolute else None
+        stats["histogram"] = histogram(errors)
+        del stats["offsetErrors"]
+        out[importer] = stats
+    return out
+
+
+# ─────────── Fuentes ─────────── #
+
+def docx_samples() -> Iterator[Sample]:
+    import docx2chordpro as d2c  # Pillow: solo si se evalúa el docx
+
+    songs = d2c.split_into_songs(d2c.load_paragraphs(d2c.find_docx()))
+    for i, song in enumerate(songs):
+        conv = d2c.convert_song(song)
+        yield Sample("docx", str(i), conv["title"], d2c.render_cho(conv))
+
+
+def _under(path: Path) -> str:
+    try:
+        return str(path.relative_to(REPO_DIR))
+    except ValueError:
+        return str(path)
+
+
+def latex_samples(dirs: Sequence[Path] = LATEX_DIRS) -> Iterator[Sample]:
+    sys.path.insert(0, str(ADMIN_DIR))
+    import latex_import as li
+
+    for base in dirs:
+        if not base.exists():
+            continue
+        for tex in sorted(base.rglob("*.tex")):
+            if li.PROCESSED_DIR in tex.parents:
+                continue
+            parsed = li.parse_latex_song(tex)
+            yield Sample("latex", _under(tex), parsed["title"], li.render_latex_cho(parsed))
+
+
+def doceacordes_samples(dirs: Sequence[Path] = DOCE_DIRS) -> Iterator[Sample]:
+    sys.path.insert(0, str(ADMIN_DIR))
+    import doceacordes_import as di
+
+    for base in dirs:
+        if not base.exists():
+            continue
+        for raw_path in sorted(base.glob("*.cho")):
+            raw = raw_path.read_text(encoding="utf-8", errors="replace")
+            text = di.adapt_chordpro(raw)
+            yield Sample("doceacordes", _under(raw_path), cp.get_directive(text, "title"), text)
+
+
+IMPORTERS: Dict[str, Callable[[], Iterable[Sample]]] = {
+    "docx": docx_samples,
+    "latex": latex_samples,
+    "doceacordes": doceacordes_samples,
+}
+
+
+def run(samples: Iterable[Sample], index: CuratedIndex, workers: int = 0) -> List[Dict[str, object]]:
+    """Una fila por muestra: las que tienen .cho revisado, evaluadas; el
+    resto, `status: missing`."""
+    rows: List[Dict[str, object]] = []
+    jobs: List[Tuple[Path, str]] = []
+    for s in samples:
+        path = index.find(s.title)
+        rows.append({"importer": s.importer, "name": s.name, "title": s.title,
+                     "path": _under(path) if path else None,
+                     "status": "evaluated" if path else "missing"})
+        if path is not None:
+            jobs.append((path, s.text))
+    results = iter(evaluate_many(jobs, workers=workers))
+    for row in rows:
+        if row["status"] == "evaluated":
+            row.update(next(results))
+    return rows
+
+
+CSV_FIELDS = ("importer", "name", "title", "path", "status", "chordsCurated", "chordsGenerated",
+              "matched", "renamed", "missing", "extra", "exact", "near", "exactRate",
+              "meanAbsError", "medianAbsError", "maxAbsError")
+
+
+# ─────────── CLI ─────────── #
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Errores de colocación de acordes por importador")
+    parser.add_argument("--importer", nargs="+", choices=list(IMPORTERS), default=list(IMPORTERS))
+    parser.add_argument("--workers", type=int, default=0, help="procesos para evaluar (0 = en serie)")
+    parser.add_argument("--worst", type=int, default=5, help="canciones peor colocadas a listar por importador")
+    parser.add_argument("--report", metavar="PATH", help="informe por canción (.json o .csv)")
+    args = parser.parse_args(argv)
+
+    index = CuratedIndex()
+    rows: List[Dict[str, object]] = []
+    for name in args.importer:
+        try:
+            rows.extend(run(IMPORTERS[name](), index, workers=args.workers))
+        except (OSError, SystemExit) as e:   # docx o Pillow ausentes, etc.
+            print(f"[{name}] no evaluable: {e}", file=sys.stderr)
+
+    summary = summarize(rows)
+    for name in args.importer:
+        total = sum(1 for r in rows if r["importer"] == name)
+        st = summary.get(name)
+        if not st:
+            print(f"{name:12s} {total} muestras, ninguna con .cho revisado")
+            continue
+        print(f"{name:12s} {st['songs']}/{total} canciones  acordes {st['chordsCurated']}  "
+              f"exactos {st['exactRate']:.1%}  ≤{NEAR_CHARS} {st['near']}  "
+              f"faltan {st['missing']} sobran {st['extra']}  "
+              f"|err| media {st['meanAbsError']} mediana {st['medianAbsError']} p90 {st['p90AbsError']}")
+        print(f"{'':12s} histograma |err|: " + "  ".join(f"{k}:{v}" for k, v in st["histogram"].items()))
+        worst = sorted((r for r in rows if r["importer"] == name and r["status"] == "evaluated"),
+                       key=lambda r: r["exactRate"])[:args.worst]
+        for r in worst:
+            print(f"{'':14s}{r['exactRate']:6.1%}  {r['title']}  ({r['name']} -> {r['path']})")
+    if args.report:
+        cc.write_report(rows, args.report, fields=CSV_FIELDS)
+        print(f"Informe: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,7 @@
 
 Fuente ÚNICA del mapeo «campo JSON ↔ directiva .cho» y del parseo/limpieza de
 las directivas multimedia/meta. La usan:
-  - crear_songs_json.py             (.cho → songs-vX.json)
+  - songs_payload.py                (.cho → songs-vX.json; CLI crear_songs_json.py)
   - sincronizaCambiosDeFirebase.py  (ediciones de Firebase → .cho)
   - admin/server.py                 (editor local)
 
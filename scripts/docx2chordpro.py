@@ -21,6 +21,7 @@ Uso típico (Windows / Mac / Linux):
   python docx2chordpro.py extract --all             # vuelca todas a staging
   python docx2chordpro.py compare 12                # diff entre conversion y .cho existente
   python docx2chordpro.py compare --all             # idem para todas las que ya existen
+  python docx2chordpro.py compare --all --workers 4 --report informe.json   # (o .csv)
 
 El id puede ser:
   - número entero (índice mostrado por 'list')
@@ -37,15 +38,14 @@ import re
 import sys
 import unicodedata
 import zipfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 from xml.etree import ElementTree as ET
 
-try:
-    from PIL import ImageFont
-except ImportError:
-    print("Falta Pillow. Instálalo con:  pip install pillow", file=sys.stderr)
-    sys.exit(1)
+import cho_compare as cc  # motor de comparación en bloque (compare --all)
+import font_metrics as fm  # anchos de fuente.ttf (tabla precalculada; Pillow opcional)
+
 
 
 # ─────────── Rutas y constantes ─────────── #
@@ -54,7 +54,6 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_DIR = SCRIPT_DIR.parent
 SONGS_DIR = REPO_DIR / "songs"
 STAGING_DIR = SCRIPT_DIR / "staging_docx2cho"
-FONT_PATH = SCRIPT_DIR / "fuente.ttf"  # Calibri Regular (verificado)
 DOCX_GLOB = "Cantoral*Castell*v2.0.4.docx"  # tolerante a NFC/NFD del nombre
 
 W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
@@ -157,19 +156,12 @@ def is_chord_token(tok: str) -> bool:
 
 # ─────────── Métrica de texto ─────────── #
 
-_font_cache: Dict[int, "ImageFont.ImageFont"] = {}
-
-
-def get_font(sz_halfpoints: int) -> "ImageFont.ImageFont":
+def get_font(sz_halfpoints: int) -> "fm.TableMetrics":
+    """Métrica de fuente.ttf para un tamaño del docx (medios puntos)."""
     sz_halfpoints = max(sz_halfpoints or 24, 8)
     # Tamaño en píxeles a 96 dpi
     px = max(int(round((sz_halfpoints / 2) * PX_PER_PT)), 6)
-    if px not in _font_cache:
-        try:
-            _font_cache[px] = ImageFont.truetype(str(FONT_PATH), px)
-        except Exception:
-            _font_cache[px] = ImageFont.load_default()
-    return _font_cache[px]
+    return fm.get_metrics(px)
 
 
 def text_width_px(text: str, sz_halfpoints: int) -> float:
@@ -414,16 +406,25 @@ def line_is_uppercase(text: str) -> bool:
     return upper / len(letters) >= 0.70
 
 
-def classify_line(atoms: List[Atom]) -> str:
-    """Devuelve 'chord' | 'lyric' | 'empty'."""
-    text = line_atoms_text(atoms).strip()
-    if not text:
-        return "empty"
-    tokens = re.findall(r"\S+", text)
+# Proporción mínima de tokens reconocidos como acorde para que una línea se
+# trate como línea de acordes (y no de letra).
+CHORD_LINE_RATIO = 0.6
+
+
+def chord_token_ratio(atoms: List[Atom]) -> Optional[float]:
+    """Proporción de tokens de la línea que son acordes (None si está vacía)."""
+    tokens = re.findall(r"\S+", line_atoms_text(atoms))
     if not tokens:
+        return None
+    return sum(1 for tok in tokens if is_chord_token(tok)) / len(tokens)
+
+
+def classify_line(atoms: List[Atom], ratio: Optional[float] = None) -> str:
+    """Devuelve 'chord' | 'lyric' | 'empty'. `ratio` por defecto CHORD_LINE_RATIO."""
+    r = chord_token_ratio(atoms)
+    if r is None:
         return "empty"
-    recognized = sum(1 for tok in tokens if is_chord_token(tok))
-    return "chord" if recognized / len(tokens) >= 0.6 else "lyric"
+    return "chord" if r >= (CHORD_LINE_RATIO if ratio is None else ratio) else "lyric"
 
 
 # ─────────── Inyección de acordes ─────────── #
@@ -466,10 +467,12 @@ def _is_vow(ch: str) -> bool:
     return ch.lower() in _SP_VOW
 
 
-def syllable_starts_in_word(word: str) -> List[int]:
-    """Índices (relativos al inicio de la palabra) donde empieza cada sílaba."""
+@lru_cache(maxsize=8192)
+def syllable_starts_in_word(word: str) -> Tuple[int, ...]:
+    """Índices (relativos al inicio de la palabra) donde empieza cada sílaba.
+    Cacheado: los estribillos repiten las mismas palabras una y otra vez."""
     if not word:
-        return [0]
+        return (0,)
     w = word.lower()
     starts = [0]
     i = 0
@@ -498,7 +501,7 @@ def syllable_starts_in_word(word: str) -> List[int]:
             next_syl = i - 2 if last2 in _SP_INSEP else i - 1
         if next_syl > starts[-1]:
             starts.append(next_syl)
-    return starts
+    return tuple(starts)
 
 
 def syllable_anchor_indices(lyric: str) -> List[int]:
@@ -552,8 +555,62 @@ CHORD_STACK_THRESHOLD_PX = 30.0
 WORD_PREFERENCE_PX = 10.0
 
 
+class LineAnchors(NamedTuple):
+    """Anclas de una letra (índices, ordenados) y su x en píxeles, que también
+    queda ordenada porque las posiciones de los caracteres no decrecen."""
+    word: Tuple[int, ...]
+    syl: Tuple[int, ...]
+    word_px: Tuple[float, ...]
+    syl_px: Tuple[float, ...]
+
+
+@lru_cache(maxsize=4096)
+def _text_anchors(lyric_text: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    word = tuple(sorted(set(word_start_indices(lyric_text) + [0, len(lyric_text)])))
+    return word, tuple(syllable_anchor_indices(lyric_text))
+
+
+def line_anchors(lyric_text: str, char_positions: Sequence[float]) -> LineAnchors:
+    """Anclas de inicio de palabra y de sílaba de una letra, con su x."""
+    word, syl = _text_anchors(lyric_text)
+    return LineAnchors(word, syl, tuple(char_positions[c] for c in word),
+                       tuple(char_positions[c] for c in syl))
+
+
+def nearest_anchor(anchors: Sequence[int], px: Sequence[float], x: float,
+                   forbidden=()) -> int:
+    """Ancla cuya x (`px`, ordenada) queda más cerca de `x`, saltando las de
+    `forbidden` (si lo están todas, vale cualquiera). Búsqueda binaria; en
+    empate gana la de menor índice, igual que un `min()` lineal."""
+    n = len(anchors)
+    k = bisect.bisect_left(px, x)
+    lo, hi = k - 1, k                       # px[lo] < x <= px[hi]
+    if forbidden:
+        while lo >= 0 and anchors[lo] in forbidden:
+            lo -= 1
+        while hi < n and anchors[hi] in forbidden:
+            hi += 1
+        if lo < 0 and hi >= n:
+            return nearest_anchor(anchors, px, x)
+    if lo > 0:
+        # Misma x más a la izquierda (caracteres de ancho 0): la primera libre
+        j = lo - 1
+        while j >= 0 and px[j] == px[lo]:
+            if anchors[j] not in forbidden:
+                lo = j
+            j -= 1
+    if hi >= n:
+        return anchors[lo]
+    if lo < 0 or px[hi] - x < x - px[lo]:
+        return anchors[hi]
+    return anchors[lo]
+
+
 def inject_chords(lyric_text: str, char_positions: List[float],
-                  chord_positions: List[Tuple[float, str]]) -> str:
+                  chord_positions: List[Tuple[float, str]],
+                  anchors: Optional[LineAnchors] = None,
+                  stack_px: Optional[float] = None,
+                  word_pref_px: Optional[float] = None) -> str:
     """Inserta los acordes traducidos en la letra. Conserva el texto tal cual.
 
     Política:
@@ -567,6 +624,11 @@ def inject_chords(lyric_text: str, char_positions: List[float],
         se apilan en la misma ancla; si están más separados se reparten en
         sílabas contiguas para no perder información.
       - Los acordes de un token con guiones ("DO-mim-lam") se apilan siempre.
+
+    Las anclas van a `nearest_anchor` (búsqueda binaria por píxeles); con
+    `anchors` (de `line_anchors`) ni siquiera se calculan;
+    `stack_px` / `word_pref_px` sustituyen a CHORD_STACK_THRESHOLD_PX /
+    WORD_PREFERENCE_PX (los usa el barrido de parámetros, docx_sweep.py).
     """
     if not chord_positions:
         return lyric_text
@@ -577,23 +639,21 @@ def inject_chords(lyric_text: str, char_positions: List[float],
             chunks.append("".join(f"[{c}]" for c in chords))
         return " ".join(chunks)
 
-    word_anchors = sorted(set(word_start_indices(lyric_text) + [0, len(lyric_text)]))
-    syl_anchors = syllable_anchor_indices(lyric_text)
+    if stack_px is None:
+        stack_px = CHORD_STACK_THRESHOLD_PX
+    if word_pref_px is None:
+        word_pref_px = WORD_PREFERENCE_PX
+    word, syl, word_px, syl_px = anchors or line_anchors(lyric_text, char_positions)
 
-    def pick_anchor(x: float, forbidden: set) -> int:
+    def pick_anchor(x: float, forbidden=()) -> int:
         """Elige la mejor ancla para un acorde en pixel x, evitando 'forbidden'."""
-        def best_in(candidates):
-            avail = [c for c in candidates if c not in forbidden]
-            if not avail:
-                avail = candidates
-            return min(avail, key=lambda c: abs(char_positions[c] - x))
-        w_best = best_in(word_anchors)
-        s_best = best_in(syl_anchors)
+        w_best = nearest_anchor(word, word_px, x, forbidden)
+        s_best = nearest_anchor(syl, syl_px, x, forbidden)
         w_dist = abs(char_positions[w_best] - x)
         s_dist = abs(char_positions[s_best] - x)
         # Si la palabra está dentro de WORD_PREFERENCE_PX de tan buena
         # como la sílaba, gana la palabra (output más limpio).
-        if w_dist <= s_dist + WORD_PREFERENCE_PX:
+        if w_dist <= s_dist + word_pref_px:
             return w_best
         return s_best
 
@@ -601,13 +661,13 @@ def inject_chords(lyric_text: str, char_positions: List[float],
     claimed_x: Dict[int, float] = {}  # ancla → x del primer acorde que la ocupó
     for x, tok in sorted(chord_positions, key=lambda p: p[0]):
         chords = translate_chord_token(tok) or [tok]
-        idx = pick_anchor(x, forbidden=set())
+        idx = pick_anchor(x)
         if idx in claimed_x:
             # Ya ocupada: apilar si están juntos, si no, repartir
-            if abs(x - claimed_x[idx]) < CHORD_STACK_THRESHOLD_PX:
+            if abs(x - claimed_x[idx]) < stack_px:
                 pass  # apilar — usamos el mismo idx
             else:
-                idx = pick_anchor(x, forbidden=set(claimed_x.keys()))
+                idx = pick_anchor(x, forbidden=claimed_x)
         claimed_x.setdefault(idx, x)
         insertions.setdefault(idx, []).extend(f"[{c}]" for c in chords)
 
@@ -771,43 +831,111 @@ def next_song_number(folder: Path) -> int:
 # ─────────── Conversión de una canción ─────────── #
 
 
-def convert_song(song: dict) -> dict:
-    """Devuelve {title, capo, key, section, body, slug, warnings, n_chord_lines}."""
-    title_clean, capo = parse_title(song["title_raw"])
-    section = song["section"]
-    warnings: List[str] = []
-    first_chord_en: Optional[str] = None
-
-    # 1. Aplanar todos los párrafos en una lista de "logical lines" con metadata.
-    #    Si el Heading2 contiene más de una línea lógica, las extras forman parte del cuerpo.
-    lines: List[dict] = []  # {kind, atoms, start_x, tab_stops, bold, text}
+class LineGeometry:
+    """Una línea lógica del docx con todo lo que NO depende de los parámetros
+    de colocación: texto, proporción de acordes y, calculadas una sola vez
+    bajo demanda, las posiciones en píxeles (de acordes, por indentado de la
+    letra de debajo, y de letra) y las anclas de palabra/sílaba."""
+
+    __slots__ = ("atoms", "start_x", "tab_stops", "text", "chord_ratio", "_chords", "_lyric")
+
+    def __init__(self, atoms: List[Atom], start_x: float, tab_stops: List[float]):
+        self.atoms = atoms
+        self.start_x = start_x
+        self.tab_stops = tab_stops
+        self.text = line_atoms_text(atoms)
+        self.chord_ratio = chord_token_ratio(atoms)
+        self._chords: Dict[float, List[Tuple[float, str]]] = {}
+        self._lyric: Optional[Tuple[str, List[float], LineAnchors]] = None
+
+    def kind(self, ratio: Optional[float] = None) -> str:
+        """Como `classify_line`, sin volver a tokenizar."""
+        if self.chord_ratio is None:
+            return "empty"
+        return "chord" if self.chord_ratio >= (CHORD_LINE_RATIO if ratio is None else ratio) else "lyric"
+
+    def chord_positions(self, start_x: Optional[float] = None) -> List[Tuple[float, str]]:
+        """`parse_chord_line` con el indentado `start_x` (por defecto el propio)."""
+        if start_x is None:
+            start_x = self.start_x
+        if start_x not in self._chords:
+            self._chords[start_x] = parse_chord_line(self.atoms, start_x, self.tab_stops)
+        return self._chords[start_x]
+
+    def lyric(self) -> Tuple[str, List[float], LineAnchors]:
+        """(texto, posiciones por carácter, anclas) de `parse_lyric_line`."""
+        if self._lyric is None:
+            text, positions = parse_lyric_line(self.atoms, self.start_x, self.tab_stops)
+            self._lyric = (text, positions, line_anchors(text, positions))
+        return self._lyric
+
+    def warm(self, next_start_x: Optional[float]) -> None:
+        """Calcula de antemano todo lo que puede pedir `assemble_song` con
+        cualquier umbral de clasificación (una línea de acordes se mide con el
+        indentado de la línea siguiente), para no volver a medir texto."""
+        if self.chord_ratio is None:
+            return
+        self.lyric()
+        self.chord_positions()
+        if next_start_x is not None:
+            self.chord_positions(next_start_x)
+
+
+class SongGeometry(NamedTuple):
+    title_raw: str
+    section: Optional[str]
+    lines: List[LineGeometry]
+
+
+def song_geometry(song: dict) -> SongGeometry:
+    """Aplana los párrafos de la canción en líneas lógicas. Si el Heading2
+    contiene más de una línea lógica, las extras forman parte del cuerpo."""
+    lines: List[LineGeometry] = []
 
     def add_lines_from(p: ET.Element, skip_first: bool = False):
         start_x = paragraph_indent_dxa(p)
         tab_stops = paragraph_tab_stops_dxa(p)
-        all_logical = paragraph_logical_lines(p)
-        for k, atoms in enumerate(all_logical):
+        for k, atoms in enumerate(paragraph_logical_lines(p)):
             if skip_first and k == 0:
                 continue
-            text = line_atoms_text(atoms)
-            lines.append({
-                "kind": classify_line(atoms),
-                "atoms": atoms,
-                "start_x": start_x,
-                "tab_stops": tab_stops,
-                "bold": line_is_bold(atoms),
-                "text": text,
-            })
+            lines.append(LineGeometry(atoms, start_x, tab_stops))
 
     if song.get("title_para") is not None:
         add_lines_from(song["title_para"], skip_first=True)
     for p in song["paragraphs"]:
         add_lines_from(p)
+    return SongGeometry(song["title_raw"], song["section"], lines)
+
+
+def warm_geometry(geom: SongGeometry) -> SongGeometry:
+    """Deja ya medidas todas las líneas (ver `LineGeometry.warm`): el resultado
+    se puede enviar a otro proceso y ensamblar allí sin Pillow."""
+    for k, ln in enumerate(geom.lines):
+        ln.warm(geom.lines[k + 1].start_x if k + 1 < len(geom.lines) else None)
+    return geom
+
+
+def convert_song(song: dict) -> dict:
+    """Devuelve {title, capo, key, section, body, slug, warnings, n_chord_lines}."""
+    return assemble_song(song_geometry(song))
 
-    # 2. Emparejar líneas de acordes con su letra y emitir.
+
+def assemble_song(geom: SongGeometry, stack_px: Optional[float] = None,
+                  word_pref_px: Optional[float] = None,
+                  chord_ratio: Optional[float] = None) -> dict:
+    """Empareja líneas de acordes con su letra y emite el cuerpo ChordPro.
+    Los parámetros sustituyen a CHORD_STACK_THRESHOLD_PX, WORD_PREFERENCE_PX
+    y CHORD_LINE_RATIO (None = los del módulo)."""
+    title_clean, capo = parse_title(geom.title_raw)
+    section = geom.section
+    warnings: List[str] = []
+    first_chord_en: Optional[str] = None
+    lines = geom.lines
+
+    # Emparejar líneas de acordes con su letra y emitir.
     out_lines: List[str] = []
     in_chorus = False
-    pending_chord: Optional[dict] = None
+    pending_chord: Optional[LineGeometry] = None
     last_was_blank = True
 
     def emit(line: str):
@@ -837,12 +965,11 @@ def convert_song(song: dict) -> dict:
 
     n_chord_lines = 0
     for ln in lines:
-        if ln["kind"] == "empty":
+        kind = ln.kind(chord_ratio)
+        if kind == "empty":
             if pending_chord is not None:
                 # acordes huérfanos sin letra debajo
-                chord_pos = parse_chord_line(pending_chord["atoms"],
-                                             pending_chord["start_x"],
-                                             pending_chord["tab_stops"])
+                chord_pos = pending_chord.chord_positions()
                 if chord_pos and first_chord_en is None:
                     tr = translate_chord_token(chord_pos[0][1])
                     if tr:
@@ -854,12 +981,10 @@ def convert_song(song: dict) -> dict:
                 emit("")
             continue
 
-        if ln["kind"] == "chord":
+        if kind == "chord":
             if pending_chord is not None:
                 # 2 líneas de acordes seguidas → emitir la anterior sola
-                chord_pos = parse_chord_line(pending_chord["atoms"],
-                                             pending_chord["start_x"],
-                                             pending_chord["tab_stops"])
+                chord_pos = pending_chord.chord_positions()
                 if chord_pos and first_chord_en is None:
                     tr = translate_chord_token(chord_pos[0][1])
                     if tr:
@@ -869,22 +994,21 @@ def convert_song(song: dict) -> dict:
             pending_chord = ln
             continue
 
-        # ln["kind"] == "lyric"
+        # kind == "lyric"
         chord_pos: List[Tuple[float, str]] = []
         if pending_chord is not None:
             # IMPORTANTE: usamos el indentado de la LETRA (no del de los acordes), porque
             # el cantoral a veces aplica un indent extra al primer párrafo de acordes
             # que rompe la alineación. Los tab stops del párrafo de acordes sí se respetan.
-            chord_pos = parse_chord_line(pending_chord["atoms"],
-                                         ln["start_x"],
-                                         pending_chord["tab_stops"])
+            chord_pos = pending_chord.chord_positions(ln.start_x)
             n_chord_lines += 1
             if chord_pos and first_chord_en is None:
                 tr = translate_chord_token(chord_pos[0][1])
                 if tr:
                     first_chord_en = tr[0]
-        lyric_text, char_positions = parse_lyric_line(ln["atoms"], ln["start_x"], ln["tab_stops"])
-        line_out = inject_chords(lyric_text, char_positions, chord_pos).rstrip()
+        lyric_text, char_positions, anchors = ln.lyric()
+        line_out = inject_chords(lyric_text, char_positions, chord_pos, anchors=anchors,
+                                 stack_px=stack_px, word_pref_px=word_pref_px).rstrip()
 
         # Detección de estribillo por mayúsculas (más fiable que negrita en este cantoral).
         is_chorus_line = line_is_uppercase(lyric_text)
@@ -897,13 +1021,10 @@ def convert_song(song: dict) -> dict:
         pending_chord = None
 
     if pending_chord is not None:
-        chord_pos = parse_chord_line(pending_chord["atoms"],
-                                     pending_chord["start_x"],
-                                     pending_chord["tab_stops"])
-        emit(inject_chords("", [], chord_pos))
+        emit(inject_chords("", [], pending_chord.chord_positions()))
     close_chorus()
 
-    # 3. Limpiar líneas en blanco múltiples al final
+    # Limpiar líneas en blanco múltiples al final
     while out_lines and out_lines[-1] == "":
         out_lines.pop()
 
@@ -1084,57 +1205,78 @@ def cmd_extract(args, songs: List[dict]):
 
 
 def cmd_compare(args, songs: List[dict]):
-    existing = index_existing_cho()
-    targets: List[Tuple[int, dict]]
     if args.all:
-        targets = list(enumerate(songs))
-    else:
-        targets = [select_song(songs, args.id)]
+        return cmd_compare_all(args, songs)
+    existing = index_existing_cho()
+    i, s = select_song(songs, args.id)
+    conv = convert_song(s)
+    existing_path = find_existing_cho(conv, existing)
+    if existing_path is None:
+        print(yellow(f"No existe .cho equivalente para '{conv['title']}'"))
+        return
+    original = existing_path.read_text(encoding="utf-8")
+    generated = render_cho(conv)
+    print(magenta(f"# {i}  {conv['title']}  vs  {existing_path.relative_to(REPO_DIR)}"))
+    diff = difflib.unified_diff(
+        original.splitlines(keepends=False),
+        generated.splitlines(keepends=False),
+        fromfile=f"existing/{existing_path.name}",
+        tofile=f"generated/{existing_path.name}",
+        lineterm="",
+    )
+    shown = False
+    for line in diff:
+        shown = True
+        if line.startswith("+++") or line.startswith("---"):
+            print(magenta(line))
+        elif line.startswith("@@"):
+            print(cyan(line))
+        elif line.startswith("+"):
+            print(green(line))
+        elif line.startswith("-"):
+            print(red(line))
+        else:
+            print(line)
+    if not shown:
+        print(green("  (idéntico)"))
 
-    n_compared = n_missing = 0
-    for i, s in targets:
+
+def cmd_compare_all(args, songs: List[dict]):
+    """Todas las que tienen .cho equivalente, con `cho_compare`: similitud por
+    líneas (con descarte temprano por debajo de --reject), letra y acordes,
+    en paralelo con --workers y con informe JSON/CSV opcional (--report)."""
+    existing = index_existing_cho()
+    rows: List[dict] = []
+    pairs: List[Tuple[str, str]] = []
+    for i, s in enumerate(songs):
         conv = convert_song(s)
         existing_path = find_existing_cho(conv, existing)
-        if existing_path is None:
-            if not args.all:
-                print(yellow(f"No existe .cho equivalente para '{conv['title']}'"))
+        row = {"index": i, "section": conv["section_letter"], "title": conv["title"],
+               "path": str(existing_path.relative_to(REPO_DIR)) if existing_path else None,
+               "status": "compared" if existing_path else "missing"}
+        rows.append(row)
+        if existing_path is not None:
+            pairs.append((existing_path.read_text(encoding="utf-8"), render_cho(conv)))
+
+    results = iter(cc.compare_many(pairs, reject=args.reject, workers=args.workers))
+    n_compared = n_missing = 0
+    for row in rows:
+        if row["status"] == "missing":
             n_missing += 1
             continue
         n_compared += 1
-        original = existing_path.read_text(encoding="utf-8")
-        generated = render_cho(conv)
-        if args.all:
-            ratio = difflib.SequenceMatcher(None, original, generated).ratio()
-            tag = green("OK") if ratio > 0.85 else (yellow("~~") if ratio > 0.6 else red("XX"))
-            print(f"  {tag} {ratio:5.1%}  {i:3d}  [{conv['section_letter']}] {conv['title']}"
-                  f"  -> {existing_path.relative_to(REPO_DIR)}")
-        else:
-            print(magenta(f"# {i}  {conv['title']}  vs  {existing_path.relative_to(REPO_DIR)}"))
-            diff = difflib.unified_diff(
-                original.splitlines(keepends=False),
-                generated.splitlines(keepends=False),
-                fromfile=f"existing/{existing_path.name}",
-                tofile=f"generated/{existing_path.name}",
-                lineterm="",
-            )
-            shown = False
-            for line in diff:
-                shown = True
-                if line.startswith("+++") or line.startswith("---"):
-                    print(magenta(line))
-                elif line.startswith("@@"):
-                    print(cyan(line))
-                elif line.startswith("+"):
-                    print(green(line))
-                elif line.startswith("-"):
-                    print(red(line))
-                else:
-                    print(line)
-            if not shown:
-                print(green("  (idéntico)"))
-    if args.all:
-        print()
-        print(green(f"Comparadas: {n_compared}.  Sin equivalente .cho: {n_missing}."))
+        row.update(next(results))
+        ratio = row["similarity"]
+        tag = green("OK") if ratio > 0.85 else (yellow("~~") if ratio > 0.6 else red("XX"))
+        bound = "≤" if row["bounded"] else " "
+        chords = "" if row["bounded"] else dim(f"  letra {row['lyricSimilarity']:.0%} acordes {row['chordPlacement']:.0%}")
+        print(f"  {tag} {bound}{ratio:5.1%}  {row['index']:3d}  [{row['section']}] {row['title']}"
+              f"  -> {row['path']}{chords}")
+    print()
+    print(green(f"Comparadas: {n_compared}.  Sin equivalente .cho: {n_missing}."))
+    if args.report:
+        cc.write_report(rows, args.report)
+        print(dim(f"Informe: {args.report}"))
 
 
 # ─────────── Main ─────────── #
@@ -1164,6 +1306,12 @@ def main():
     g2 = p_cmp.add_mutually_exclusive_group()
     g2.add_argument("id", nargs="?", help="Índice o trozo del título")
     g2.add_argument("--all", action="store_true", help="Compara todas las que tengan equivalente")
+    p_cmp.add_argument("--workers", type=int, default=0,
+                       help="con --all: procesos para comparar en paralelo (0 = en serie)")
+    p_cmp.add_argument("--reject", type=float, default=0.6,
+                       help="con --all: por debajo de esta similitud se da solo la cota (0 = siempre exacto)")
+    p_cmp.add_argument("--report", metavar="PATH",
+                       help="con --all: escribe un informe por canción en PATH (.json o .csv)")
 
     args = parser.parse_args()
 
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Barrido de los parámetros de colocación de acordes de docx2chordpro.
+
+`inject_chords` depende de CHORD_STACK_THRESHOLD_PX y WORD_PREFERENCE_PX, y
+la clasificación de líneas de CHORD_LINE_RATIO. Este script prueba una
+rejilla de valores y puntúa cada combinación con `chord_eval` contra los
+.cho revisados de /songs.
+
+Lo caro (leer el docx y medir el texto con Pillow) se hace UNA vez: por cada
+canción con .cho equivalente se guarda su `SongGeometry` ya medida (átomos,
+posiciones en píxeles y anclas). Cada combinación solo repite el ensamblado
+(`assemble_song`) y la evaluación, en paralelo con --workers; los procesos
+reciben la geometría ya medida y no necesitan el docx ni Pillow.
+
+Uso:
+  python scripts/docx_sweep.py                                   # rejilla por defecto
+  python scripts/docx_sweep.py --stack 10:60:5 --word-pref 0:20:2.5 --ratio 0.5,0.6,0.7
+  python scripts/docx_sweep.py --workers 4 --top 15 --report barrido.csv
+
+Valores: lista separada por comas o rango inclusivo inicio:fin:paso.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cho_compare as cc
+import chord_eval as ce
+import docx2chordpro as d2c
+
+Setting = Tuple[float, float, float]   # (stack_px, word_pref_px, chord_ratio)
+Corpus = List[Tuple[d2c.SongGeometry, str]]   # (geometría medida, ruta del .cho revisado)
+
+DEFAULT_STACK = (15.0, 20.0, 25.0, 30.0, 35.0, 40.0, 50.0)
+DEFAULT_WORD_PREF = (0.0, 5.0, 10.0, 15.0, 20.0)
+DEFAULT_RATIO = (0.5, 0.6, 0.7)
+
+CSV_FIELDS = ("stackPx", "wordPrefPx", "chordRatio", "songs", "chordsCurated", "chordsGenerated",
+              "matched", "renamed", "missing", "extra", "exact", "near", "exactRate",
+              "meanAbsError", "medianAbsError", "p90AbsError")
+
+
+def parse_values(spec: str) -> Tuple[float, ...]:
+    """"10,20,30" o "10:30:10" (inclusivo) → (10.0, 20.0, 30.0)."""
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"paso no positivo en {spec!r}")
+        n = int(round((stop - start) / step))
+        return tuple(round(start + k * step, 6) for k in range(n + 1))
+    return tuple(float(x) for x in spec.split(",") if x.strip())
+
+
+def grid(stack: Sequence[float], word_pref: Sequence[float], ratio: Sequence[float]) -> List[Setting]:
+    return [(s, w, r) for s in stack for w in word_pref for r in ratio]
+
+
+def current_setting() -> Setting:
+    return (d2c.CHORD_STACK_THRESHOLD_PX, d2c.WORD_PREFERENCE_PX, d2c.CHORD_LINE_RATIO)
+
+
+def load_corpus(docx_path: Optional[Path] = None,
+                index: Optional[ce.CuratedIndex] = None) -> Corpus:
+    """Geometría medida de las canciones del docx que tienen .cho revisado."""
+    index = index or ce.CuratedIndex()
+    songs = d2c.split_into_songs(d2c.load_paragraphs(docx_path or d2c.find_docx()))
+    corpus: Corpus = []
+    for song in songs:
+        geom = d2c.song_geometry(song)
+        path = index.find(d2c.assemble_song(geom)["title"])
+        if path is None:
+            continue
+        corpus.append((d2c.warm_geometry(geom), str(path)))
+    return corpus
+
+
+# ─────────── Puntuación ─────────── #
+
+@lru_cache(maxsize=16384)
+def _evaluate(path: str, mtime_ns: int, text: str) -> Dict[str, object]:
+    """Muchas combinaciones dejan una canción igual: se evalúa una vez (por
+    versión del .cho revisado)."""
+    return ce.evaluate_path(Path(path), text)
+
+
+def score(corpus: Corpus, setting: Setting) -> Dict[str, object]:
+    """Resumen de `chord_eval` de todo el corpus ensamblado con `setting`."""
+    stack_px, word_pref_px, chord_ratio = setting
+    rows = []
+    for geom, path in corpus:
+        conv = d2c.assemble_song(geom, stack_px=stack_px, word_pref_px=word_pref_px,
+                                 chord_ratio=chord_ratio)
+        rows.append({"importer": "docx", "status": "evaluated",
+                     **_evaluate(path, os.stat(path).st_mtime_ns, d2c.render_cho(conv))})
+    stats = ce.summarize(rows).get("docx", {})
+    return {"stackPx": stack_px, "wordPrefPx": word_pref_px, "chordRatio": chord_ratio, **stats}
+
+
+_worker_corpus: Corpus = []
+
+
+def _init_worker(corpus: Corpus) -> None:
+    global _worker_corpus
+    _worker_corpus = corpus
+
+
+def _score_in_worker(setting: Setting) -> Dict[str, object]:
+    return score(_worker_corpus, setting)
+
+
+def sweep(corpus: Corpus, settings: Sequence[Setting], workers: int = 0) -> List[Dict[str, object]]:
+    """`score` de cada combinación, en orden. Con `workers > 1` en procesos
+    aparte (la geometría se les pasa una vez, al arrancar)."""
+    if workers and workers > 1 and len(settings) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(corpus,)) as pool:
+            return list(pool.map(_score_in_worker, settings,
+                                 chunksize=max(1, len(settings) // (workers * 4))))
+    return [score(corpus, s) for s in settings]
+
+
+def rank_key(row: Dict[str, object]) -> Tuple[float, int, float]:
+    """Mejor primero: más acordes exactos, más cerca, menos error medio."""
+    mean = row.get("meanAbsError")
+    return (-float(row.get("exactRate") or 0.0), -int(row.get("near") or 0),
+            float(mean) if mean is not None else float("inf"))
+
+
+# ─────────── CLI ─────────── #
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de colocación de acordes (docx)")
+    parser.add_argument("--stack", type=parse_values, default=DEFAULT_STACK,
+                        help="valores de CHORD_STACK_THRESHOLD_PX")
+    parser.add_argument("--word-pref", type=parse_values, default=DEFAULT_WORD_PREF,
+                        help="valores de WORD_PREFERENCE_PX")
+    parser.add_argument("--ratio", type=parse_values, default=DEFAULT_RATIO,
+                        help="valores de CHORD_LINE_RATIO")
+    parser.add_argument("--workers", type=int, default=0, help="procesos (0 = en serie)")
+    parser.add_argument("--top", type=int, default=10, help="combinaciones a listar")
+    parser.add_argument("--report", metavar="PATH", help="todas las combinaciones en PATH (.json o .csv)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    corpus = load_corpus()
+    t1 = time.perf_counter()
+    if not corpus:
+        print("Ninguna canción del docx tiene .cho revisado en songs/: nada que barrer.")
+        return 1
+    settings = grid(args.stack, args.word_pref, args.ratio)
+    current = current_setting()
+    if current not in settings:
+        settings.append(current)
+    rows = sweep(corpus, settings, workers=args.workers)
+    t2 = time.perf_counter()
+    print(f"{len(corpus)} canciones con .cho revisado (geometría en {t1 - t0:.1f} s); "
+          f"{len(settings)} combinaciones en {t2 - t1:.1f} s")
+
+    ranked = sorted(rows, key=rank_key)
+    print(f"   {'stack':>6} {'palabra':>7} {'ratio':>5}  {'exactos':>7}  {'≤' + str(ce.NEAR_CHARS):>5}  "
+          f"{'faltan':>6} {'sobran':>6}  {'|err| media':>11}")
+    shown = ranked[:args.top]
+    cur_row = next(r for r in rows if (r["stackPx"], r["wordPrefPx"], r["chordRatio"]) == current)
+    if cur_row not in shown:
+        shown.append(cur_row)
+    for row in shown:
+        mark = "*" if row is cur_row else " "
+        print(f" {mark} {row['stackPx']:6g} {row['wordPrefPx']:7g} {row['chordRatio']:5g}  "
+              f"{row['exactRate']:7.1%}  {row['near']:5d}  {row['missing']:6d} {row['extra']:6d}  "
+              f"{row['meanAbsError']:11}")
+    print(" * = valores actuales del módulo")
+    if args.report:
+        cc.write_report(ranked, args.report, fields=CSV_FIELDS)
+        print(f"Informe: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Cliente REST de Firebase Realtime Database, común a todos los scripts.
+
+Lo usan:
+  - songs_payload.FirebaseWriter   (crear_songs_json --upload, update_firebase)
+  - sincronizaCambiosDeFirebase.py (leer/borrar songs/ediciones)
+  - admin/server.py                (peticiones: songs/solicitudes, songs/fallitos)
+
+Solo stdlib (http.client), para que ni el admin ni el CI de generación
+necesiten instalar nada:
+  - Conexiones persistentes (keep-alive) reutilizadas desde un pool pequeño;
+    seguro entre hilos (el admin es multihilo).
+  - Respuestas con gzip (Accept-Encoding) descomprimidas al vuelo.
+  - Reintentos con espera exponencial ante fallos de red y 429/5xx; un cuerpo
+    que es un fichero se rebobina antes de reenviarlo.
+  - Autenticación igual que hasta ahora (ver `auth_headers_and_params`), con
+    el Bearer de service account cacheado hasta que caduca.
+  - Lecturas `shallow` (solo claves) y paginadas por clave (`iter_children`).
+
+    fb = FirebaseClient.from_env()          # FIREBASE_URL / FIREBASE_TOKEN (+ .env)
+    fb.get("songs/contentHash")
+    for key, value in fb.iter_children("songs/ediciones", page_size=200): ...
+    fb.delete_many("songs/ediciones", ["-Nabc", "-Nabd"])
+"""
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Estados tras los que merece la pena reintentar
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+SERVICE_ACCOUNT_SCOPES = (
+    "https://www.googleapis.com/auth/firebase.database",
+    "https://www.googleapis.com/auth/userinfo.email",
+)
+
+
+class FirebaseError(RuntimeError):
+    """Respuesta HTTP no 2xx de la Realtime Database."""
+
+    def __init__(self, status: int, path: str, body: str = "") -> None:
+        super().__init__(f"Firebase respondió {status} en {path}: {body[:200]}".rstrip(": "))
+        self.status = status
+        self.path = path
+        self.body = body
+
+
+# ─────────── .env ─────────── #
+
+def load_env(path: str) -> None:
+    """Carga un .env (CLAVE=valor) sin depender de python-dotenv. No pisa
+    variables ya presentes en el entorno."""
+    if not os.path.exists(path):
+        return
+    try:
+        with open(path, encoding="utf-8") as f:
+            for raw in f:
+                line = raw.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, _, val = line.partition("=")
+                key = key.strip()
+                val = val.strip().strip('"').strip("'")
+                if key and key not in os.environ:
+                    os.environ[key] = val
+    except Exception:
+        pass
+
+
+# ─────────── Autenticación ─────────── #
+
+class ServiceAccountToken:
+    """Bearer desde GOOGLE_APPLICATION_CREDENTIALS (google-auth, opcional).
+    Se pide una vez y se reutiliza hasta que caduca."""
+
+    def __init__(self, sa_path: Optional[str] = None) -> None:
+        self.sa_path = sa_path or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
+        self._creds = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Optional[str]:
+        if not self.sa_path or not os.path.exists(self.sa_path):
+            return None
+        with self._lock:
+            try:
+                if self._creds is None:
+                    # Import aquí para no romper si no está instalado
+                    from google.oauth2 import service_account  # pip install google-auth
+                    self._creds = service_account.Credentials.from_service_account_file(
+                        self.sa_path, scopes=list(SERVICE_ACCOUNT_SCOPES))
+                if not self._creds.valid:  # sin token o caducado
+                    from google.auth.transport.requests import Request
+                    self._creds.refresh(Request())
+                return f"Bearer {self._creds.token}"
+            except Exception:
+                return None
+
+
+def auth_headers_and_params(token: str,
+                            bearer: Optional[Callable[[], Optional[str]]] = None) -> Tuple[dict, dict]:
+    """
+    Prioridad:
+      1) token que empieza por 'Bearer ' → cabecera Authorization
+      2) sin token pero con service account → Bearer automático (`bearer()`)
+      3) token normal → ?auth=TOKEN
+    Una API key 'AIza…' NO sirve como token de la DB → se ignora.
+    """
+    token = (token or "").strip()
+    if token.startswith("AIza"):
+        token = ""
+    if token.startswith("Bearer "):
+        return {"Authorization": token}, {}
+    if not token:
+        b = bearer() if bearer else None
+        return ({"Authorization": b}, {}) if b else ({}, {})
+    return {}, {"auth": token}
+
+
+# ─────────── Cliente ─────────── #
+
+def _key_order(key: str) -> tuple:
+    """Orden de `orderBy="$key"` en la RTDB: primero las claves que son enteros
+    de 32 bits (numéricamente), luego el resto como texto."""
+    try:
+        n = int(key)
+        if -2**31 <= n < 2**31 and str(n) == key:
+            return (0, n, "")
+    except ValueError:
+        pass
+    return (1, 0, key)
+
+
+def _as_dict(value) -> dict:
+    """La RTDB devuelve listas si las claves son 0..n: las pasa a dict."""
+    if isinstance(value, list):
+        return {str(i): v for i, v in enumerate(value) if v is not None}
+    return value if isinstance(value, dict) else {}
+
+
+class FirebaseClient:
+    """Acceso REST a la RTDB con conexiones reutilizadas y reintentos.
+
+    `token` sigue las reglas de `auth_headers_and_params`. `retries` es el
+    número de reintentos (no de intentos) y `backoff` la espera base en
+    segundos (se dobla en cada reintento).
+    """
+
+    def __init__(self, base_url: str, token: str = "", timeout: float = 25,
+                 retries: int = 3, backoff: float = 0.5, pool_size: int = 4,
+                 bearer: Optional[Callable[[], Optional[str]]] = None) -> None:
+        parts = urllib.parse.urlsplit(base_url.strip().rstrip("/"))
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError(f"FIREBASE_URL no válida: {base_url!r}")
+        self.base_url = base_url.strip().rstrip("/")
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._prefix = parts.path
+        self.token = token or ""
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._bearer = bearer or ServiceAccountToken()
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, env_file: Optional[str] = None, **kwargs) -> "FirebaseClient":
+        """Desde FIREBASE_URL / FIREBASE_TOKEN (cargando antes `env_file` si
+        se da, sin pisar el entorno)."""
+        if env_file:
+            load_env(env_file)
+        base = (os.environ.get("FIREBASE_URL") or "").strip()
+        if not base:
+            raise RuntimeError("Falta FIREBASE_URL (entorno o .env)")
+        return cls(base, os.environ.get("FIREBASE_TOKEN") or "", **kwargs)
+
+    # ── pool de conexiones ──
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """(conexión, reutilizada?)."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        return cls(self._netloc, timeout=self.timeout, blocksize=1 << 16), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # ── petición base ──
+    def _target(self, path: str, query: Optional[Dict[str, object]]) -> Tuple[dict, str]:
+        """(cabeceras de auth, ruta sin host de `path`.json con la query)."""
+        headers, params = auth_headers_and_params(self.token, self._bearer)
+        params = {**params, **(query or {})}
+        target = f"{self._prefix}/{path.strip('/')}.json"
+        return headers, target + ("?" + urllib.parse.urlencode(params) if params else "")
+
+    def request(self, method: str, path: str, body=None, length: Optional[int] = None,
+                query: Optional[Dict[str, object]] = None) -> bytes:
+        """Cuerpo de la respuesta (ya sin gzip). `body` puede ser bytes o un
+        fichero binario (se envía por bloques con `length`)."""
+        headers, target = self._target(path, query)
+        headers["Accept-Encoding"] = "gzip"
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            headers["Content-Length"] = str(len(body) if length is None else length)
+        start = body.tell() if hasattr(body, "seek") else None
+
+        attempt = 0
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                # Una conexión del pool puede haberla cerrado el servidor mientras
+                # estaba ociosa: se reintenta enseguida con otra, sin contar.
+                if not reused:
+                    attempt += 1
+                    if attempt > self.retries:
+                        raise
+                    self._sleep(attempt)
+                if start is not None:
+                    body.seek(start)
+                continue
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if resp.getheader("Content-Encoding", "").lower() == "gzip":
+                data = gzip.decompress(data)
+            if 200 <= resp.status < 300:
+                return data
+            attempt += 1
+            if resp.status not in RETRY_STATUSES or attempt > self.retries:
+                raise FirebaseError(resp.status, path, data.decode("utf-8", "replace"))
+            self._sleep(attempt)
+            if start is not None:
+                body.seek(start)
+
+    def _sleep(self, attempt: int) -> None:
+        time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() / 4))
+
+    # ── lecturas ──
+    def get(self, path: str, shallow: bool = False, **query):
+        """Valor JSON de `path`. `shallow=True` → solo claves del primer nivel
+        (los hijos llegan como `true`). `query` se pasa tal cual (orderBy…)."""
+        if shallow:
+            query["shallow"] = "true"
+        return json.loads(self.request("GET", path, query=query) or b"null")
+
+    def keys(self, path: str) -> List[str]:
+        """Claves hijas de `path` sin descargar su contenido."""
+        return sorted(_as_dict(self.get(path, shallow=True)), key=_key_order)
+
+    def iter_children(self, path: str, page_size: int = 500) -> Iterator[Tuple[str, object]]:
+        """(clave, valor) de los hijos de `path` en orden de clave, pidiéndolos
+        en páginas de `page_size` (orderBy="$key" + startAt + limitToFirst):
+        un nodo enorme no llega en una sola respuesta."""
+        last = None
+        while True:
+            query = {"orderBy": '"$key"', "limitToFirst": page_size}
+            if last is not None:
+                query["startAt"] = json.dumps(last)
+                query["limitToFirst"] = page_size + 1  # startAt incluye `last`
+            page = _as_dict(self.get(path, **query))
+            keys = sorted(page, key=_key_order)
+            if last is not None and keys and keys[0] == last:
+                keys = keys[1:]
+            for k in keys:
+                yield k, page[k]
+            if not keys or len(page) < query["limitToFirst"]:
+                return
+            last = keys[-1]
+
+    def get_children(self, path: str, page_size: int = 500) -> dict:
+        return dict(self.iter_children(path, page_size))
+
+    # ── escrituras ──
+    def put(self, path: str, value) -> None:
+        self.put_raw(path, json.dumps(value, ensure_ascii=False,
+                                      separators=(",", ":")).encode("utf-8"))
+
+    def put_raw(self, path: str, body, length: Optional[int] = None) -> None:
+        """PUT de un JSON ya serializado (bytes o fichero binario)."""
+        self.request("PUT", path, body=body, length=length)
+
+    def put_file(self, path: str, file_path: str) -> int:
+        """Sube un fichero JSON por bloques, sin cargarlo. Devuelve los bytes."""
+        size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            self.put_raw(path, f, length=size)
+        return size
+
+    def patch(self, path: str, values: dict) -> None:
+        """Actualización multi-ruta: cada clave de `values` es una subruta
+        (un valor None la borra)."""
+        self.request("PATCH", path, body=json.dumps(values, ensure_ascii=False,
+                                                   separators=(",", ":")).encode("utf-8"))
+
+    def delete(self, path: str) -> None:
+        self.request("DELETE", path)
+
+    def delete_many(self, path: str, keys, chunk: int = 500) -> None:
+        """Borra varios hijos de `path` con un PATCH ({clave: null, ...}) por
+        bloque de `chunk` claves en vez de una petición por nodo."""
+        keys = list(keys)
+        for i in range(0, len(keys), chunk):
+            self.patch(path, {k: None for k in keys[i:i + chunk]})
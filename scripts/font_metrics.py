@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Métrica de texto (ancho en píxeles) de fuente.ttf para los importadores.
+
+docx2chordpro y tab2chordpro_integrado colocan los acordes midiendo la letra
+en píxeles con la Calibri del cantoral. En vez de cargar la fuente con
+Pillow en cada proceso, se mide con una tabla precalculada
+(fuente_metrics.json): avance de cada carácter y pares de kerning, en
+1/64 de píxel (la unidad de FreeType), para los tamaños habituales. Da
+exactamente lo mismo que `ImageFont.getlength` y no necesita Pillow.
+
+Backends (interfaz común: `getlength(text) -> float`, como ImageFont):
+  - TableMetrics   la tabla. Es el de por defecto.
+  - PillowMetrics  ImageFont de Pillow. Se usa para tamaños o fuentes que no
+                   estén en la tabla, si Pillow está instalado.
+  Si no hay tabla ni Pillow, el tamaño más cercano de la tabla se escala
+  (aproximado, con aviso).
+  FONT_METRICS_BACKEND=pillow fuerza Pillow.
+
+Regenerar la tabla (necesita Pillow), p. ej. si cambia fuente.ttf:
+  python scripts/font_metrics.py --regenerate
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+FONT_PATH = SCRIPT_DIR / "fuente.ttf"      # Calibri Regular (verificado)
+TABLE_PATH = SCRIPT_DIR / "fuente_metrics.json"
+FORMAT_VERSION = 1
+
+# Tamaños en píxeles: los que aparecen en el docx (12 pt → 16 px, …) y los que
+# se le dan a mano a tab2chordpro_integrado (14 por defecto). El resto, Pillow.
+TABLE_SIZES = tuple(range(8, 25)) + (27, 29, 32, 64)
+# ASCII + Latin-1 + Latin Extended-A + tipografía habitual del cantoral
+TABLE_CHARS = ("".join(chr(c) for c in range(0x20, 0x7F))
+               + "".join(chr(c) for c in range(0xA0, 0x180))
+               + "–—‘’‚“”„…•€™ﬁﬂ")
+# Carácter sin glifo en Calibri: su avance es el de .notdef
+_MISSING_PROBE = "\ue000"  # uso privado
+
+
+class TableMetrics:
+    """Ancho a partir de la tabla de un tamaño: avances + kerning por pares.
+    Los caracteres que no están en la tabla miden como .notdef (igual que en
+    Pillow si la fuente no tiene el glifo)."""
+
+    def __init__(self, size: int, advances: Dict[str, int], kerning: Dict[str, int],
+                 missing: int, scale: float = 1.0):
+        self.size = size
+        self._adv = advances
+        self._kern = kerning
+        self._missing = missing
+        self._scale = scale / 64.0
+
+    def getlength(self, text: str) -> float:
+        if not text:
+            return 0.0
+        adv, kern, missing = self._adv, self._kern, self._missing
+        total = 0
+        prev = ""
+        for ch in text:
+            total += adv.get(ch, missing)
+            if kern and prev:
+                total += kern.get(prev + ch, 0)
+            prev = ch
+        return total * self._scale
+
+
+class PillowMetrics:
+    """`ImageFont.truetype` de Pillow (o su fuente por defecto si no carga)."""
+
+    def __init__(self, size: int, font_path: Path = FONT_PATH):
+        from PIL import ImageFont   # solo aquí: el resto funciona sin Pillow
+        self.size = size
+        try:
+            self._font = ImageFont.truetype(str(font_path), size)
+        except Exception:
+            self._font = ImageFont.load_default()
+
+    def getlength(self, text: str) -> float:
+        if not text:
+            return 0.0
+        return float(self._font.getlength(text))
+
+
+# ─────────── Tabla ─────────── #
+
+_table: Optional[dict] = None
+_metrics: Dict[Tuple[int, str], object] = {}
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL.ImageFont  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_table(path: Path = TABLE_PATH) -> Optional[dict]:
+    """La tabla de fuente_metrics.json, o None si no existe o no corresponde a
+    fuente.ttf (se compara el tamaño del fichero)."""
+    global _table
+    if _table is not None and path == TABLE_PATH:
+        return _table
+    try:
+        table = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if table.get("version") != FORMAT_VERSION:
+        return None
+    try:
+        if FONT_PATH.stat().st_size != table.get("fontSize"):
+            return None
+    except OSError:
+        pass   # sin fuente.ttf la tabla es lo único que hay
+    if path == TABLE_PATH:
+        _table = table
+    return table
+
+
+def _from_table(table: dict, size: int) -> Optional[TableMetrics]:
+    entry = table["sizes"].get(str(size))
+    if entry is None:
+        return None
+    chars = table["chars"]
+    return TableMetrics(size, dict(zip(chars, entry["advance"])), entry["kerning"],
+                        entry["missing"])
+
+
+def _scaled_from_table(table: dict, size: int) -> TableMetrics:
+    nearest = min((int(s) for s in table["sizes"]), key=lambda s: (abs(s - size), -s))
+    base = _from_table(table, nearest)
+    print(f"Aviso: sin Pillow ni tabla para {size} px; uso {nearest} px escalado "
+          f"(posiciones aproximadas)", file=sys.stderr)
+    return TableMetrics(size, base._adv, base._kern, base._missing, scale=size / nearest)
+
+
+def get_metrics(size: int):
+    """Métrica de fuente.ttf a `size` px (cacheada por proceso). Tabla si la
+    hay; si no, Pillow; si tampoco, la tabla escalada."""
+    backend = os.environ.get("FONT_METRICS_BACKEND", "table").lower()
+    key = (size, backend)
+    if key not in _metrics:
+        metrics = None
+        table = load_table() if backend != "pillow" else None
+        if table is not None:
+            metrics = _from_table(table, size)
+        if metrics is None and (backend == "pillow" or pillow_available()):
+            metrics = PillowMetrics(size)
+        if metrics is None:
+            table = table or load_table()
+            if table is None:
+                raise RuntimeError("No hay tabla de métricas (fuente_metrics.json) ni Pillow. "
+                                   "Instala Pillow:  pip install pillow")
+            metrics = _scaled_from_table(table, size)
+        _metrics[key] = metrics
+    return _metrics[key]
+
+
+def generate_table(font_path: Path = FONT_PATH, sizes: Iterable[int] = TABLE_SIZES,
+                   chars: str = TABLE_CHARS) -> dict:
+    """Mide con Pillow avances y kerning de `chars` a cada tamaño."""
+    from PIL import ImageFont
+
+    chars = "".join(dict.fromkeys(chars))
+    out: Dict[str, dict] = {}
+    for size in sizes:
+        font = ImageFont.truetype(str(font_path), size)
+        units = lambda s: int(round(font.getlength(s) * 64))  # noqa: E731
+        adv = [units(ch) for ch in chars]
+        by_char = dict(zip(chars, adv))
+        kerning = {}
+        for a in chars:
+            for b in chars:
+                k = units(a + b) - by_char[a] - by_char[b]
+                if k:
+                    kerning[a + b] = k
+        out[str(size)] = {"advance": adv, "kerning": kerning, "missing": units(_MISSING_PROBE)}
+    return {"version": FORMAT_VERSION, "font": font_path.name,
+            "fontSize": font_path.stat().st_size, "chars": chars, "sizes": out}
+
+
+def write_table(table: dict, path: Path = TABLE_PATH) -> None:
+    """Un tamaño por línea: el fichero se lee y se diffea bien."""
+    head = {k: v for k, v in table.items() if k != "sizes"}
+    lines: List[str] = [json.dumps(head, ensure_ascii=False)[:-1] + ', "sizes": {']
+    items = list(table["sizes"].items())
+    for i, (size, entry) in enumerate(items):
+        sep = "," if i < len(items) - 1 else ""
+        lines.append(f"  {json.dumps(size)}: {json.dumps(entry, ensure_ascii=False, separators=(',', ':'))}{sep}")
+    lines.append("}}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Tabla de métricas de fuente.ttf")
+    parser.add_argument("--regenerate", action="store_true",
+                        help=f"mide fuente.ttf con Pillow y reescribe {TABLE_PATH.name}")
+    args = parser.parse_args(argv)
+    if args.regenerate:
+        table = generate_table()
+        write_table(table)
+        print(f"{TABLE_PATH.name}: {len(table['sizes'])} tamaños, {len(table['chars'])} caracteres")
+        return 0
+    table = load_table()
+    if table is None:
+        print(f"{TABLE_PATH.name} no existe o no corresponde a {FONT_PATH.name}: usa --regenerate")
+        return 1
+    print(f"{TABLE_PATH.name}: {len(table['sizes'])} tamaños, {len(table['chars'])} caracteres; "
+          f"Pillow {'disponible' if pillow_available() else 'no instalado'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
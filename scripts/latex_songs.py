@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Lexer del subconjunto del paquete LaTeX `songs` que usan los .tex de
+scripts/input, y su conversión a ChordPro en una sola pasada.
+
+Sustituye a la cadena de `re.sub` de `tab2chordpro.latex_to_chordpro` (que
+reescaneaba la canción entera en cada paso y se liaba con llaves anidadas,
+comentarios a media línea o `\\echo{… \\rep{2}}`). Aquí el texto se recorre
+una vez: `Lexer` corta tokens (texto, macro, acorde `\\[…]`, `{`, `}`, `^`,
+salto de línea; los comentarios `%` se descartan como en LaTeX) y `convert`
+los va traduciendo con una pila de grupos y el estado de memorize/replay.
+
+Soportado:
+  \\beginsong{…}[…] \\endsong       cabecera y fin (m={…} → música)
+  \\beginverse[*] \\endverse        estrofa (párrafo)
+  \\beginchorus \\endchorus         {soc} / {eoc}
+  \\[G (G7)]                       [G] ([G7]); `translate` traduce cada acorde
+  \\memorize[…] ^ \\replay[…]       los ^ repiten los acordes memorizados
+  \\echo{…} \\rep{n}                (…) y (xn)
+  \\ifchorded … \\else … \\fi        solo la rama con acordes
+  \\transpose{n} \\capo{n}          metadatos
+  \\brk \\lrep \\rrep \\nolyrics      se quitan
+  \\renewcommand \\newcommand \\newchords   se ignoran (con sus argumentos)
+Cualquier otra macro se deja tal cual en la letra y se devuelve en
+`unknown_macros` [(línea, nombre)] para revisarla.
+"""
+from __future__ import annotations
+
+import re
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# Tipos de token
+TEXT, MACRO, CHORD, BGROUP, EGROUP, REPLAY, NEWLINE, EOF = (
+    "text", "macro", "chord", "bgroup", "egroup", "replay", "newline", "eof")
+
+_TOKEN_RE = re.compile(r"""
+    \\\[(?P<chord>[^\]\n]*)\]               # \[G (G7)]
+  | \\(?P<word>[A-Za-z]+)(?P<space>[ \t]*)  # \macro (se come los espacios, como TeX)
+  | \\(?P<symbol>[^\n])                     # \\ \% \& …
+  | (?P<bgroup>\{)
+  | (?P<egroup>\})
+  | (?P<replay>\^)
+  | %[^\n]*\n?                              # comentario (con su salto de línea)
+  | (?P<newline>\r?\n)
+  | (?P<text>[^\\{}%^\n]+|\\)
+""", re.X)
+
+# \% \& … se escriben como el carácter
+_ESCAPED = set("%&#_${}")
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    line: int
+    space: str = ""      # espacios que se comió una macro (para devolverlos si no se conoce)
+
+
+class LatexSong(NamedTuple):
+    body: str
+    transpose: str
+    capo: str
+    musica: str
+    unknown_macros: Tuple[Tuple[int, str], ...]
+
+
+class Lexer:
+    """Tokens de `text` bajo demanda. `read_arg`/`read_optional` leen un
+    argumento en crudo (llaves/corchetes equilibrados) desde la posición
+    actual, para las macros cuyo argumento no es letra."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.line = 1
+
+    def next(self) -> Token:
+        text = self.text
+        if self.pos >= len(text):
+            return Token(EOF, "", self.line)
+        m = _TOKEN_RE.match(text, self.pos)
+        self.pos = m.end()
+        line = self.line
+        kind = m.lastgroup
+        if kind == "space":
+            kind = "word"
+        if kind is None:                       # comentario
+            if m.group().endswith("\n"):
+                self.line += 1
+            return self.next()
+        if kind == "newline":
+            self.line += 1
+            return Token(NEWLINE, "\n", line)
+        if kind == "chord":
+            return Token(CHORD, m.group("chord"), line)
+        if kind == "word":
+            return Token(MACRO, m.group("word"), line, m.group("space") or "")
+        if kind == "symbol":
+            sym = m.group("symbol")
+            if sym in _ESCAPED:
+                return Token(TEXT, sym, line)
+            return Token(MACRO, sym, line)
+        if kind == "bgroup":
+            return Token(BGROUP, "{", line)
+        if kind == "egroup":
+            return Token(EGROUP, "}", line)
+        if kind == "replay":
+            return Token(REPLAY, "^", line)
+        return Token(TEXT, m.group(), line)
+
+    def __iter__(self):
+        while True:
+            tok = self.next()
+            if tok.kind == EOF:
+                return
+            yield tok
+
+    def peek_char(self) -> str:
+        return self.text[self.pos:self.pos + 1]
+
+    def skip_newline(self) -> None:
+        if self.text.startswith("\n", self.pos):
+            self.pos += 1
+            self.line += 1
+        elif self.text.startswith("\r\n", self.pos):
+            self.pos += 2
+            self.line += 1
+
+    def _read_balanced(self, open_ch: str) -> str:
+        """Desde `open_ch` ({ o [, en la posición actual) hasta su cierre; un
+        `]` dentro de llaves no cierra (`[by={…}]`)."""
+        text = self.text
+        start = i = self.pos + 1
+        depth = 1 if open_ch == "{" else 0
+        while i < len(text):
+            ch = text[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "\n":
+                self.line += 1
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+                if depth == 0 and open_ch == "{":
+                    self.pos = i + 1
+                    return text[start:i]
+            elif ch == "]" and depth == 0 and open_ch == "[":
+                self.pos = i + 1
+                return text[start:i]
+            i += 1
+        self.pos = len(text)
+        return text[start:]
+
+    def read_arg(self) -> Optional[str]:
+        """`{…}` en crudo (saltando espacios antes), o None si no hay."""
+        while self.peek_char() in (" ", "\t"):
+            self.pos += 1
+        if self.peek_char() != "{":
+            return None
+        return self._read_balanced("{")
+
+    def read_optional(self) -> Optional[str]:
+        """`[…]` en crudo justo en la posición actual, o None."""
+        if self.peek_char() != "[":
+            return None
+        return self._read_balanced("[")
+
+
+# ─────────── Salida ─────────── #
+
+class _Output:
+    """Líneas de ChordPro. Las directivas ({soc}/{eoc}) y los cambios de
+    párrafo van en su propia línea; el salto de línea del fuente que les
+    sigue no añade una línea vacía."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.cur: List[str] = []
+        self.fresh = False
+
+    def text(self, s: str) -> None:
+        self.cur.append(s)
+        if self.fresh and s.strip():
+            self.fresh = False
+
+    def newline(self) -> None:
+        if self.fresh:
+            self.fresh = False
+            self.cur = []
+            return
+        self.lines.append("".join(self.cur))
+        self.cur = []
+
+    def _end_line(self) -> None:
+        line = "".join(self.cur)
+        if line.strip():
+            self.lines.append(line)
+        self.cur = []
+
+    def paragraph(self) -> None:
+        self._end_line()
+        self.lines.append("")
+        self.fresh = True
+
+    def directive(self, d: str) -> None:
+        self._end_line()
+        self.lines.append(d)
+        self.fresh = True
+
+    def finish(self) -> str:
+        self._end_line()
+        clean: List[str] = []
+        for line in self.lines:
+            line = line.strip()
+            if line == "" and (not clean or clean[-1] == ""):
+                continue
+            clean.append(line)
+        return "\n".join(clean).strip()
+
+
+# ─────────── Conversión ─────────── #
+
+_MUSICA_RE = re.compile(r"m=\{([^}]+)\}")
+# Macros que no producen nada
+_DROP = {"brk", "lrep", "rrep", "nolyrics", "endsong", "replay"}
+# Macros que se ignoran junto con sus argumentos {…}
+_SKIP_ARGS = {"renewcommand", "newcommand", "newchords"}
+
+
+def _clean_chord(tok: str) -> str:
+    return tok.replace("(", "").replace(")", "")
+
+
+def _identity(tok: str, line_no: int) -> str:
+    return tok
+
+
+def convert(content: str, translate: Optional[Callable[[str, int], str]] = None) -> LatexSong:
+    """ChordPro de un .tex (cuerpo + transpose, capo, música y macros
+    desconocidas). `translate(acorde, línea)` traduce cada acorde (p. ej.
+    español → inglés); por defecto se dejan tal cual."""
+    translate = translate or _identity
+    lex = Lexer(content)
+    out = _Output()
+    unknown: List[Tuple[int, str]] = []
+    transpose = capo = musica = ""
+    closers: List[str] = []          # qué escribir al cerrar cada grupo {…}
+    open_ifs = 0                     # \ifchorded sin cerrar
+    memorized: List[str] = []
+    line_chords: List[str] = []      # acordes ya escritos en la línea actual
+    memorizing = False
+    pointer = 0
+
+    # Camino caliente: se recorren las coincidencias de _TOKEN_RE sin crear
+    # Token (Lexer.next hace lo mismo para quien quiera los tokens).
+    match = _TOKEN_RE.match
+    text, end = content, len(content)
+    emit, newline = out.text, out.newline
+    while lex.pos < end:
+        m = match(text, lex.pos)
+        lex.pos = m.end()
+        kind = m.lastgroup
+        if kind == "text":
+            emit(m.group())
+        elif kind == "newline":
+            lex.line += 1
+            newline()
+            if line_chords:
+                line_chords = []
+        elif kind == "chord":
+            res = []
+            for ch in m.group("chord").split():
+                tr = translate(_clean_chord(ch), lex.line)
+                line_chords.append(tr)
+                if memorizing:
+                    memorized.append(tr)
+                res.append(f"([{tr}])" if ch.startswith("(") and ch.endswith(")") else f"[{tr}]")
+            out.text(" ".join(res))
+        elif kind == "replay":
+            if pointer < len(memorized):
+                out.text(f"[{memorized[pointer]}]")
+                pointer += 1
+        elif kind == "bgroup":
+            closers.append("")
+        elif kind == "egroup":
+            if closers:
+                out.text(closers.pop())
+        elif kind is None:                      # comentario
+            if text[lex.pos - 1] == "\n":
+                lex.line += 1
+        elif kind == "symbol" and m.group("symbol") in _ESCAPED:
+            out.text(m.group("symbol"))
+        else:  # macro: \palabra o \símbolo
+            name = m.group("word") or m.group("symbol")
+            line = lex.line
+            if name in ("beginverse", "beginchorus"):
+                pointer = 0
+                if name == "beginverse":
+                    if lex.peek_char() == "*":
+                        lex.pos += 1
+                    out.paragraph()
+                else:
+                    out.directive("{soc}")
+            elif name in ("endverse", "endchorus"):
+                memorizing = False
+                if name == "endverse":
+                    out.paragraph()
+                else:
+                    out.directive("{eoc}")
+            elif name == "memorize":
+                # Cuenta desde el principio de su línea: en los .tex hay
+                # `… dor, \memorize` al final de la línea que se repite.
+                lex.read_optional()
+                memorized = list(line_chords)
+                memorizing = True
+            elif name == "beginsong":
+                lex.read_arg()
+                opts = lex.read_optional()
+                mus = _MUSICA_RE.search(opts or "")
+                if mus and not musica:
+                    musica = mus.group(1)
+                lex.skip_newline()
+            elif name in ("transpose", "capo"):
+                value = lex.read_arg() or ""
+                if name == "transpose" and not transpose:
+                    transpose = value
+                elif name == "capo" and not capo:
+                    capo = value
+                lex.skip_newline()
+            elif name in ("echo", "rep") and lex.peek_char() == "{":
+                lex.pos += 1
+                out.text("(" if name == "echo" else "(x")
+                closers.append(")")
+            elif name == "ifchorded":
+                open_ifs += 1
+            elif name == "else" and open_ifs:
+                _skip_to_fi(lex)
+                open_ifs -= 1
+            elif name == "fi" and open_ifs:
+                open_ifs -= 1
+            elif name in _DROP:
+                if name == "replay":
+                    lex.read_optional()
+                if name == "endsong":
+                    lex.skip_newline()
+            elif name in _SKIP_ARGS:
+                lex.read_arg()
+                if name != "newchords":
+                    lex.read_optional()
+                    lex.read_arg()
+            else:
+                # Se deja tal cual (con su argumento {…}, si lo tiene) para revisarla
+                unknown.append((line, name))
+                if lex.peek_char() == "{":
+                    lex.pos += 1
+                    out.text("\\" + name + "{")
+                    closers.append("}")
+                else:
+                    out.text("\\" + name + (m.group("space") or ""))
+
+    return LatexSong(out.finish(), transpose, capo, musica, tuple(unknown))
+
+
+def _skip_to_fi(lex: Lexer) -> None:
+    """Salta la rama \\else hasta su \\fi (respetando \\if… anidados)."""
+    depth = 0
+    for tok in lex:
+        if tok.kind != MACRO:
+            continue
+        if tok.value.startswith("if"):
+            depth += 1
+        elif tok.value == "fi":
+            if depth == 0:
+                return
+            depth -= 1
@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Índice de búsqueda full-text sobre los .cho del cantoral.
+
+Indexa, por canción:
+  - title / artist            → campos de cabecera ({title:}, {artist:}/{author:})
+  - meta                      → resto de directivas con valor ({ritmo:}, {tiempo:},
+                                {album:}, {comentario:}, etiquetas de youtube/audio…)
+  - lyrics                    → letra sin acordes ni directivas
+  - chords                    → secuencia de acordes tal cual aparece ([G] [D] [Em]…)
+
+Los tokens se pliegan (minúsculas y sin tildes: «Señor» → «senor»), así que
+buscar «cancion» encuentra «Canción». El índice se actualiza por fichero
+(`update` / `remove`), de modo que el admin solo re-indexa lo que escribe.
+
+Sintaxis de consulta (`search`):
+  - palabras sueltas                → todas deben aparecer (en cualquier campo);
+                                      la última admite prefijo («pesc» → «pescador»)
+  - campo:palabra                   → restringe a un campo (title, artist, meta,
+                                      lyrics, chords; alias: titulo, autor, letra,
+                                      acordes, tiempo…)
+  - [G][D][Em]                      → secuencia de acordes CONSECUTIVOS
+
+El formato serializado (`to_dict` / `from_dict`) es JSON plano y no depende de
+este módulo para leerse: la app puede reutilizarlo offline.
+
+Además, `build_app_index` genera el índice compacto que `crear_songs_json.py`
+publica junto a cada `songs-vX.json` (`songs-vX.search.json`), para que la app
+busque sin indexar al arrancar.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import chordpro as cp  # módulo común: mapeo campos ↔ directivas + parseo
+
+FORMAT_VERSION = 1
+
+FIELDS = ("title", "artist", "meta", "lyrics", "chords")
+
+# Peso de cada campo en el ranking (un acierto en el título vale más que en la letra).
+FIELD_WEIGHTS: Dict[str, float] = {
+    "title": 5.0,
+    "artist": 3.0,
+    "meta": 2.0,
+    "lyrics": 1.0,
+    "chords": 0.5,
+}
+
+# Alias en español para el prefijo campo:palabra
+FIELD_ALIASES: Dict[str, str] = {
+    "title": "title", "titulo": "title", "t": "title",
+    "artist": "artist", "autor": "artist", "author": "artist", "a": "artist",
+    "meta": "meta", "tiempo": "meta", "ritmo": "meta", "album": "meta", "fuente": "meta",
+    "lyrics": "lyrics", "letra": "lyrics",
+    "chords": "chords", "acordes": "chords", "acorde": "chords",
+}
+
+# BM25 (valores estándar)
+_K1 = 1.2
+_B = 0.75
+
+_DIRECTIVE_RX = re.compile(r"^\s*\{\s*([A-Za-z_]+)\s*(?::\s*(.*?))?\s*\}\s*$")
+_CHORD_RX = re.compile(r"\[([^\]]*)\]")
+_TOKEN_RX = re.compile(r"[a-z0-9]+")
+_QUERY_CHORDS_RX = re.compile(r"(?:\[[^\]]+\]\s*)+")
+_QUERY_FIELD_RX = re.compile(r"^([a-z]+):(.+)$")
+
+# Directivas que no aportan nada a la búsqueda (marcadores de estructura)
+_SKIP_DIRECTIVES = {"soc", "eoc", "sov", "eov", "start_of_chorus", "end_of_chorus",
+                    "start_of_verse", "end_of_verse", "capo", "key", "transpose"}
+
+
+# ─────────── Normalización ─────────── #
+
+def fold(s: str) -> str:
+    """Minúsculas y sin diacríticos («Canción» → «cancion»)."""
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.lower()
+
+
+def tokenize(s: str) -> List[str]:
+    """Texto → tokens plegados (alfanuméricos)."""
+    return _TOKEN_RX.findall(fold(s))
+
+
+def norm_chord(ch: str) -> str:
+    """Normaliza un acorde para comparar secuencias: sin espacios ni paréntesis."""
+    return ch.strip().strip("()").replace(" ", "")
+
+
+# ─────────── Extracción de campos de un .cho ─────────── #
+
+def extract_fields(text: str) -> Tuple[Dict[str, List[str]], List[str], List[str], Dict[str, str]]:
+    """Devuelve ({campo: tokens}, secuencia_de_acordes, líneas_de_letra,
+    {"title", "author"}); lo último, para no volver a leer la cabecera."""
+    meta = {
+        "title": cp.get_directive(text, "title"),
+        "author": cp.get_directive(text, "artist") or cp.get_directive(text, "author"),
+    }
+    fields: Dict[str, List[str]] = {f: [] for f in FIELDS}
+    fields["title"] = tokenize(meta["title"])
+    fields["artist"] = tokenize(meta["author"])
+    chords: List[str] = []
+    lyric_lines: List[str] = []
+    for ln in text.split("\n"):
+        m = _DIRECTIVE_RX.match(ln)
+        if m:
+            name = m.group(1).lower()
+            value = m.group(2) or ""
+            if name in ("title", "artist", "author") or name in _SKIP_DIRECTIVES or not value:
+                continue
+            if name in ("youtube", "audio", "video"):
+                value = cp.parse_label_url(value)["label"]  # la URL no se indexa
+            fields["meta"].extend(tokenize(value))
+            continue
+        for c in _CHORD_RX.findall(ln):
+            c = norm_chord(c)
+            if c:
+                chords.append(c)
+        lyric = _CHORD_RX.sub("", ln).strip()
+        if lyric:
+            lyric_lines.append(lyric)
+            fields["lyrics"].extend(tokenize(lyric))
+    fields["chords"] = [fold(c) for c in chords]
+    return fields, chords, lyric_lines, meta
+
+
+# ─────────── Índice ─────────── #
+
+class SearchIndex:
+    """Índice invertido en memoria: postings[campo][token] = {doc_id: tf}."""
+
+    def __init__(self) -> None:
+        self.docs: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, Dict[str, int]]] = {f: {} for f in FIELDS}
+        self._total_len: Dict[str, int] = {f: 0 for f in FIELDS}
+        self._vocab: Optional[List[str]] = None  # vocabulario ordenado (para prefijos)
+
+    # ── Mantenimiento ──
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.docs
+
+    def update(self, doc_id: str, text: str, extra: Optional[dict] = None,
+               stamp: Optional[Tuple[float, int]] = None) -> None:
+        """(Re)indexa un documento. `extra` se guarda tal cual y se devuelve en
+        los resultados; `stamp` = (mtime, size) para `sync_dir`."""
+        self.remove(doc_id)
+        fields, chords, lyric_lines, meta = extract_fields(text)
+        terms: Dict[str, Dict[str, int]] = {}
+        lens: Dict[str, int] = {}
+        for f in FIELDS:
+            counts = Counter(fields[f])
+            terms[f] = dict(counts)
+            lens[f] = len(fields[f])
+            self._total_len[f] += lens[f]
+            plist = self.postings[f]
+            for tok, tf in counts.items():
+                plist.setdefault(tok, {})[doc_id] = tf
+        self.docs[doc_id] = {
+            "title": meta["title"],
+            "artist": meta["author"],
+            "len": lens,
+            "chords": chords,
+            "extra": extra or {},
+            "_terms": terms,
+            "_lines": lyric_lines,
+            "_stamp": stamp,
+        }
+        self._vocab = None
+
+    def remove(self, doc_id: str) -> bool:
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        for f, counts in doc["_terms"].items():
+            self._total_len[f] -= doc["len"].get(f, 0)
+            plist = self.postings[f]
+            for tok in counts:
+                docs = plist.get(tok)
+                if docs is None:
+                    continue
+                docs.pop(doc_id, None)
+                if not docs:
+                    del plist[tok]
+        self._vocab = None
+        return True
+
+    def update_file(self, path: Path, root: Path, extra: Optional[dict] = None) -> str:
+        """Indexa un fichero; el doc_id es su ruta relativa a `root` (con '/')."""
+        doc_id = path.relative_to(root).as_posix()
+        st = path.stat()
+        text = path.read_text(encoding="utf-8", errors="replace")
+        self.update(doc_id, text, extra=extra, stamp=(st.st_mtime, st.st_size))
+        return doc_id
+
+    def sync_dir(self, songs_dir: Path, root: Path, pattern: str = "*/*.cho") -> Dict[str, int]:
+        """Pone el índice al día con el disco: indexa lo nuevo/cambiado (por
+        mtime+tamaño) y quita lo que ya no existe. Devuelve contadores."""
+        seen = set()
+        updated = 0
+        for path in sorted(songs_dir.glob(pattern)):
+            doc_id = path.relative_to(root).as_posix()
+            seen.add(doc_id)
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            doc = self.docs.get(doc_id)
+            if doc is not None and doc["_stamp"] == (st.st_mtime, st.st_size):
+                continue
+            self.update_file(path, root, extra={"category_folder": path.parent.name})
+            updated += 1
+        removed = 0
+        for doc_id in [d for d in self.docs if d not in seen]:
+            self.remove(doc_id)
+            removed += 1
+        return {"updated": updated, "removed": removed, "total": len(self.docs)}
+
+    # ── Consulta ──
+
+    def _vocabulary(self) -> List[str]:
+        if self._vocab is None:
+            vocab = set()
+            for f in FIELDS:
+                if f != "chords":
+                    vocab.update(self.postings[f])
+            self._vocab = sorted(vocab)
+        return self._vocab
+
+    def _expand_prefix(self, prefix: str, limit: int = 50) -> List[str]:
+        vocab = self._vocabulary()
+        i = bisect.bisect_left(vocab, prefix)
+        out: List[str] = []
+        while i < len(vocab) and vocab[i].startswith(prefix) and len(out) < limit:
+            out.append(vocab[i])
+            i += 1
+        return out
+
+    def _idf(self, field: str, token: str) -> float:
+        n = len(self.docs)
+        df = len(self.postings[field].get(token, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _term_scores(self, token: str, fields: Iterable[str]) -> Dict[str, float]:
+        """BM25 por campo (ponderado) de un token → {doc_id: score}."""
+        scores: Dict[str, float] = {}
+        n = max(len(self.docs), 1)
+        for f in fields:
+            docs = self.postings[f].get(token)
+            if not docs:
+                continue
+            idf = self._idf(f, token)
+            avg = (self._total_len[f] / n) or 1.0
+            w = FIELD_WEIGHTS[f]
+            for doc_id, tf in docs.items():
+                dl = self.docs[doc_id]["len"][f]
+                s = idf * tf * (_K1 + 1) / (tf + _K1 * (1 - _B + _B * dl / avg))
+                scores[doc_id] = scores.get(doc_id, 0.0) + w * s
+        return scores
+
+    @staticmethod
+    def parse_query(query: str) -> Tuple[List[Tuple[Optional[str], str]], List[List[str]]]:
+        """Separa la consulta en ([(campo|None, token)], [secuencias de acordes])."""
+        sequences: List[List[str]] = []
+
+        def grab(m: re.Match) -> str:
+            seq = [norm_chord(c) for c in _CHORD_RX.findall(m.group(0))]
+            seq = [c for c in seq if c]
+            if seq:
+                sequences.append(seq)
+            return " "
+
+        rest = _QUERY_CHORDS_RX.sub(grab, query or "")
+        terms: List[Tuple[Optional[str], str]] = []
+        for raw in rest.split():
+            field = None
+            m = _QUERY_FIELD_RX.match(raw.lower())
+            if m and m.group(1) in FIELD_ALIASES:
+                field = FIELD_ALIASES[m.group(1)]
+                raw = raw.split(":", 1)[1]
+            if field == "chords":
+                seq = [norm_chord(c) for c in re.split(r"[-,]", raw) if norm_chord(c)]
+                if seq:
+                    sequences.append(seq)
+                continue
+            for tok in tokenize(raw):
+                terms.append((field, tok))
+        return terms, sequences
+
+    @staticmethod
+    def _has_sequence(chords: List[str], seq: List[str]) -> bool:
+        folded = [fold(c) for c in chords]
+        target = [fold(c) for c in seq]
+        n = len(target)
+        return any(folded[i:i + n] == target for i in range(len(folded) - n + 1))
+
+    def _snippet(self, doc_id: str, tokens: List[str]) -> str:
+        lines = self.docs[doc_id]["_lines"]
+        wanted = set(tokens)
+        for ln in lines:
+            if wanted & set(tokenize(ln)):
+                return ln
+        return lines[0] if lines else ""
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[dict]:
+        """Busca y devuelve [{id, title, artist, score, snippet, ...extra}] por score."""
+        terms, sequences = self.parse_query(query)
+        if not terms and not sequences:
+            return []
+        text_fields = [f for f in FIELDS if f != "chords"]
+        candidate: Optional[Dict[str, float]] = None
+        matched_tokens: List[str] = []
+        for k, (field, tok) in enumerate(terms):
+            fields = [field] if field else text_fields
+            scores = self._term_scores(tok, fields)
+            is_last = k == len(terms) - 1
+            if prefix and is_last and field != "chords":
+                for exp in self._expand_prefix(tok):
+                    if exp == tok:
+                        continue
+                    matched_tokens.append(exp)
+                    for doc_id, s in self._term_scores(exp, fields).items():
+                        # un prefijo puntúa algo menos que la palabra exacta
+                        scores[doc_id] = max(scores.get(doc_id, 0.0), 0.8 * s)
+            matched_tokens.append(tok)
+            if candidate is None:
+                candidate = scores
+            else:
+                candidate = {d: candidate[d] + s for d, s in scores.items() if d in candidate}
+            if not candidate:
+                return []
+        for seq in sequences:
+            # Prefiltro con los postings: el doc debe tener TODOS los acordes
+            with_all: Optional[set] = None
+            for c in seq:
+                docs = set(self.postings["chords"].get(fold(c), ()))
+                with_all = docs if with_all is None else with_all & docs
+            if candidate is None:
+                candidate = {d: 0.0 for d in with_all or ()}
+            bonus = FIELD_WEIGHTS["chords"] * len(seq)
+            candidate = {d: s + bonus for d, s in candidate.items()
+                         if d in (with_all or ())
+                         and self._has_sequence(self.docs[d]["chords"], seq)}
+        ranked = sorted(candidate.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        out = []
+        for doc_id, score in ranked:
+            doc = self.docs[doc_id]
+            out.append({
+                "id": doc_id,
+                "title": doc["title"],
+                "artist": doc["artist"],
+                "score": round(score, 3),
+                "snippet": self._snippet(doc_id, matched_tokens),
+                **doc["extra"],
+            })
+        return out
+
+    # ── Serialización ──
+
+    def to_dict(self) -> dict:
+        """Formato portable: {version, fields, weights, docs, postings}.
+
+        `postings[campo][token]` es una lista plana [idx, tf, idx, tf, …] donde
+        idx es la posición del documento en `docs` (más compacto que un dict)."""
+        ids = sorted(self.docs)
+        pos = {d: i for i, d in enumerate(ids)}
+        docs = []
+        for d in ids:
+            doc = self.docs[d]
+            docs.append({"id": d, "title": doc["title"], "artist": doc["artist"],
+                         "len": doc["len"], "chords": doc["chords"], **doc["extra"]})
+        postings: Dict[str, Dict[str, List[int]]] = {}
+        for f in FIELDS:
+            postings[f] = {}
+            for tok in sorted(self.postings[f]):
+                flat: List[int] = []
+                for d, tf in sorted(self.postings[f][tok].items(), key=lambda kv: pos[kv[0]]):
+                    flat.extend((pos[d], tf))
+                postings[f][tok] = flat
+        return {"version": FORMAT_VERSION, "fields": list(FIELDS),
+                "weights": FIELD_WEIGHTS, "docs": docs, "postings": postings}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SearchIndex":
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {data.get('version')!r}")
+        idx = cls()
+        ids = []
+        for doc in data["docs"]:
+            doc = dict(doc)
+            doc_id = doc.pop("id")
+            ids.append(doc_id)
+            idx.docs[doc_id] = {
+                "title": doc.pop("title", ""),
+                "artist": doc.pop("artist", ""),
+                "len": doc.pop("len"),
+                "chords": doc.pop("chords", []),
+                "extra": doc,
+                "_terms": {f: {} for f in FIELDS},
+                "_lines": [],
+                "_stamp": None,
+            }
+        for f in FIELDS:
+            for tok, flat in data["postings"].get(f, {}).items():
+                docs = {}
+                for i in range(0, len(flat), 2):
+                    doc_id = ids[flat[i]]
+                    docs[doc_id] = flat[i + 1]
+                    idx.docs[doc_id]["_terms"][f][tok] = flat[i + 1]
+                idx.postings[f][tok] = docs
+        for f in FIELDS:
+            idx._total_len[f] = sum(d["len"].get(f, 0) for d in idx.docs.values())
+        return idx
+
+
+def build_index(songs_dir: Path, root: Optional[Path] = None) -> SearchIndex:
+    """Construye el índice de todos los .cho de `songs_dir` (ids relativos a `root`)."""
+    idx = SearchIndex()
+    idx.sync_dir(songs_dir, root or songs_dir.parent)
+    return idx
+
+
+# ─────────── Índice precalculado para la app ─────────── #
+
+# Versión del formato `songs-vX.search.json` (distinta de FORMAT_VERSION: este
+# lo lee la app, no el admin).
+APP_FORMAT_VERSION = 1
+
+# Campos del índice de la app, en el orden en que van en `lengths`.
+APP_FIELDS = ("title", "author", "lyrics", "liturgicalTime")
+
+
+def app_doc_tokens(entry: dict) -> Dict[str, List[str]]:
+    """Tokens por campo de una entrada de `songs-vX.json` (title ya lleva el código)."""
+    fields = extract_fields(entry.get("content", ""))[0]
+    return {
+        "title": tokenize(entry.get("title", "")),
+        "author": tokenize(entry.get("author", "")),
+        "lyrics": fields["lyrics"],
+        "liturgicalTime": tokenize(entry.get("liturgicalTime", "")),
+    }
+
+
+class AppIndexBuilder:
+    """Construye el índice de la app categoría a categoría, según se van
+    parseando (no necesita tener todo songs-vX.json en memoria)."""
+
+    def __init__(self) -> None:
+        self.docs: List[list] = []
+        self.lengths: List[List[int]] = []
+        self.postings: Dict[str, Dict[str, List[int]]] = {f: {} for f in APP_FIELDS}
+
+    def add_category(self, cat_key: str, songs: List[dict]) -> None:
+        for pos, entry in enumerate(songs):
+            i = len(self.docs)
+            self.docs.append([cat_key, pos])
+            toks = app_doc_tokens(entry)
+            self.lengths.append([len(toks[f]) for f in APP_FIELDS])
+            for f in APP_FIELDS:
+                for tok, tf in Counter(toks[f]).items():
+                    self.postings[f].setdefault(tok, []).extend((i, tf))
+
+    def result(self, songs_file: str = "") -> dict:
+        return {
+            "format": APP_FORMAT_VERSION,
+            "songs": songs_file,
+            "fields": list(APP_FIELDS),
+            "weights": [FIELD_WEIGHTS["title"], FIELD_WEIGHTS["artist"],
+                        FIELD_WEIGHTS["lyrics"], FIELD_WEIGHTS["meta"]],
+            "docs": self.docs,
+            "lengths": self.lengths,
+            "postings": {f: dict(sorted(self.postings[f].items())) for f in APP_FIELDS},
+        }
+
+
+def build_app_index(songs_json: dict, songs_file: str = "") -> dict:
+    """Índice compacto que acompaña a `songs-vX.json` (ver docs/CAMPOS_CANCIONES.md).
+
+    `docs[i]` = [categoría, posición en su lista `songs`] → la app llega a la
+    canción sin buscar. `postings[campo][token]` = lista plana [i, tf, i, tf…]
+    con i creciente; `lengths[i]` = nº de tokens de cada campo (para BM25).
+    Los tokens son [a-z0-9]+, válidos como clave de Firebase."""
+    builder = AppIndexBuilder()
+    for cat_key, cat in songs_json.items():
+        builder.add_category(cat_key, cat.get("songs", []))
+    return builder.result(songs_file)
+
+
+def app_index_filename(songs_file: str) -> str:
+    """«songs-v1.2.json» → «songs-v1.2.search.json» (misma versión, mismo commit)."""
+    base, ext = os.path.splitext(songs_file)
+    return f"{base}.search{ext}"
+
+
+# ─────────── CLI: exportar / probar ─────────── #
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import json
+    import time
+
+    repo_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Índice de búsqueda del cantoral")
+    parser.add_argument("query", nargs="?", help="Consulta (si no, solo construye)")
+    parser.add_argument("--export", metavar="PATH", help="Guarda el índice en JSON")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    idx = build_index(repo_dir / "songs", repo_dir)
+    print(f"🔎 {len(idx)} canciones indexadas en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    if args.export:
+        with open(args.export, "w", encoding="utf-8") as f:
+            json.dump(idx.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        print(f"💾 Índice guardado en {args.export} ({os.path.getsize(args.export)} bytes)")
+    if args.query:
+        t0 = time.perf_counter()
+        hits = idx.search(args.query, limit=args.limit)
+        ms = (time.perf_counter() - t0) * 1000
+        for h in hits:
+            print(f"  {h['score']:7.2f}  {h['id']}  — {h['snippet'][:60]}")
+        print(f"({len(hits)} resultados en {ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
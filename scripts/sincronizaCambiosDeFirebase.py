@@ -6,18 +6,22 @@ Sync ediciones de Firebase RTDB -> ficheros .cho locales.
 Reglas:
 - Si hay contentNew != contentOld -> reescribe TODO el .cho con contentNew.
 - Después SIEMPRE revisa/actualiza tags {title,artist,key,capo,info} con valores *New.
+- Las ediciones se agrupan por .cho y se aplican en orden (timestamp / pushId)
+  en memoria: un backup y una escritura por fichero.
 - Backups en ./songs-backup-edits/<timestamp>/<Carpeta>/<archivo>.bak
-- Al terminar cada edición aplicada, elimina el nodo en Firebase (si no --dry-run).
+- Al terminar cada fichero, elimina sus nodos en Firebase de una vez (si no --dry-run).
 - Output bonito con Rich (si está instalado).
 
-Reqs recomendadas: requests, python-dotenv, rich, google-auth
+Reqs recomendadas: python-dotenv, rich, google-auth (service account)
 """
 
-import os, re, json, argparse
+import os, re, json, argparse, hashlib
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
 
 import chordpro as cp  # módulo común: mapeo campos ↔ directivas + parseo
+import songs_payload as sp  # hash por canción (mismo que `hash` en songs/data)
 
 # ── Opcional: .env ─────────────────────────────────────────────────────────────
 try:
@@ -39,8 +43,8 @@ except Exception:
         def print(self, *a, **k): print(*a)
     console = _C()
 
-# ── HTTP ───────────────────────────────────────────────────────────────────────
-import requests
+# ── HTTP (cliente común, solo stdlib) ───────────────────────────────────────────
+import firebase_client as fbc
 
 # ── Utilidades texto/ChordPro ─────────────────────────────────────────────────
 TAG_MAP = {
@@ -173,81 +177,119 @@ def _norm_body(text: str) -> str:
         lines.pop()
     return "\n".join(lines)
 
-def content_conflict(edition: dict, original_text: str) -> bool:
+@lru_cache(maxsize=256)
+def body_hash(text: str) -> str:
+    """SHA-256 (hex) del cuerpo normalizado (`_norm_body`, en UTF-8). Es lo que
+    la app puede mandar como `contentOldHash`. Cacheado: varias ediciones de la
+    misma canción suelen traer el mismo contentOld."""
+    return hashlib.sha256(_norm_body(text).encode("utf-8")).hexdigest()
+
+class TextHashes:
+    """Hashes de UN texto de .cho, calculados la primera vez que se piden.
+    Se guardan con el texto (en `ChoCache` y durante `merge_editions`), así
+    un fichero tocado por muchas ediciones se normaliza una sola vez."""
+    def __init__(self, text: str):
+        self.text = text
+        self._body = None
+        self._entries = {}
+
+    @property
+    def body(self) -> str:
+        if self._body is None:
+            self._body = body_hash(self.text)
+        return self._body
+
+    def entry(self, filename: str) -> str:
+        """`hash` de la entrada de songs/data para este texto (parseo + JSON
+        canónico + SHA-256: caro, así que una vez por fichero y texto)."""
+        if filename not in self._entries:
+            self._entries[filename] = sp.song_entry(filename, self.text)["hash"]
+        return self._entries[filename]
+
+class ChoCache:
+    """Texto de cada .cho durante un sync: se lee de disco una sola vez y se
+    actualiza al escribirlo, así las ediciones que tocan el mismo fichero no lo
+    releen ni lo vuelven a normalizar (`hashes`)."""
+    def __init__(self):
+        self._texts = {}
+        self._hashes = {}
+
+    def read(self, path: Path) -> str:
+        if path not in self._texts:
+            self._texts[path] = path.read_text(encoding="utf-8")
+        return self._texts[path]
+
+    def write(self, path: Path, text: str) -> None:
+        path.write_text(text, encoding="utf-8")
+        self._texts[path] = text
+        self._hashes.pop(path, None)
+
+    def hashes(self, path: Path) -> TextHashes:
+        """Hashes del texto actual de `path` (se rehacen solo si se reescribe)."""
+        if path not in self._hashes:
+            self._hashes[path] = TextHashes(self.read(path))
+        return self._hashes[path]
+
+def content_conflict(edition: dict, original_text: str, hashes: TextHashes | None = None) -> bool:
     """
     Detecta si el .cho del repo cambió desde que la app leyó la canción.
     Compara el cuerpo que la app vio (contentOld) con el cuerpo actual del .cho.
     Si difieren, aplicar contentNew machacaría un cambio ajeno -> conflicto.
     Solo aplica cuando la edición trae cambio de contenido y un contentOld fiable.
+
+    Todo se compara por hash del cuerpo normalizado (`body_hash`); `hashes`
+    son los de `original_text` si ya se tienen (de `ChoCache`/`merge_editions`).
+    - `contentOldHash` (si la app lo manda) se usa tal cual, sin normalizar nada.
+    - `hashOld` (el `hash` de la entrada que leyó de songs/data): si coincide
+      con el del .cho actual, nada cambió -> sin conflicto. Si no coincide
+      puede ser solo metadato, así que se comparan los cuerpos.
     """
-    old = edition.get("contentOld")
-    if old is None:
-        return False  # sin referencia: no podemos detectar, no bloqueamos
-    return _norm_body(old) != _norm_body(original_text)
+    if hashes is None:
+        hashes = TextHashes(original_text)
+    old_hash = edition.get("contentOldHash")
+    if not old_hash:
+        hash_old = edition.get("hashOld")
+        filename = str(edition.get("filename", "")).strip()
+        if hash_old and filename:
+            if hashes.entry(filename) == hash_old:
+                return False
+        old = edition.get("contentOld")
+        if old is None:
+            return False  # sin referencia: no podemos detectar, no bloqueamos
+        old_hash = body_hash(old)
+    return old_hash != hashes.body
 
 # ── Tiempo ISO ────────────────────────────────────────────────────────────────
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
-# ── Auth helpers (token o service account) ─────────────────────────────────────
-def _get_bearer_from_service_account() -> str | None:
-    """
-    Intenta generar un Bearer automático desde GOOGLE_APPLICATION_CREDENTIALS.
-    Devuelve 'Bearer <token>' o None si no está disponible.
-    """
-    try:
-        sa_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
-        if not sa_path or not os.path.exists(sa_path):
-            return None
-        # Import aquí para no romper si no está instalado
-        from google.oauth2 import service_account  # pip install google-auth
-        from google.auth.transport.requests import Request
-        scopes = [
-            "https://www.googleapis.com/auth/firebase.database",
-            "https://www.googleapis.com/auth/userinfo.email",
-        ]
-        creds = service_account.Credentials.from_service_account_file(sa_path, scopes=scopes)
-        creds.refresh(Request())
-        return f"Bearer {creds.token}"
-    except Exception:
-        return None
+# ── Firebase REST ─────────────────────────────────────────────────────────────
+# Auth (token, Bearer o service account con el token cacheado), pool de
+# conexiones, reintentos y gzip: todo en `firebase_client`. Un cliente por URL.
+_CLIENTS: dict = {}
 
-def _auth_headers_and_params() -> tuple[dict, dict]:
-    """
-    Prioridad:
-      1) FIREBASE_TOKEN que empieza por 'Bearer ' -> Authorization
-      2) Si no hay FIREBASE_TOKEN pero hay service account -> Bearer automático
-      3) FIREBASE_TOKEN normal -> ?auth=TOKEN
-    Además: si el token empieza por 'AIza' (API key), avisa y no usa nada.
-    """
+def fb_client(base_url: str) -> fbc.FirebaseClient:
     token = (os.environ.get("FIREBASE_TOKEN") or "").strip()
-    if token.startswith("AIza"):
-        console.print("❌ Has puesto una API key como FIREBASE_TOKEN. Eso NO vale. Usa idToken o Service Account.")
-        token = ""
+    key = (base_url.rstrip("/"), token)
+    if key not in _CLIENTS:
+        if token.startswith("AIza"):
+            console.print("❌ Has puesto una API key como FIREBASE_TOKEN. Eso NO vale. Usa idToken o Service Account.")
+        _CLIENTS[key] = fbc.FirebaseClient(base_url, token)
+    return _CLIENTS[key]
 
-    if token.startswith("Bearer "):
-        return {"Authorization": token}, {}
-
-    if not token:
-        bearer = _get_bearer_from_service_account()
-        if bearer:
-            return {"Authorization": bearer}, {}
-
-    return {}, ({"auth": token} if token else {})
-
-# ── Firebase REST ─────────────────────────────────────────────────────────────
 def fb_get(base_url: str, path: str):
-    headers, params = _auth_headers_and_params()
-    url = f"{base_url.rstrip('/')}/{path}.json"
-    r = requests.get(url, headers=headers, params=params, timeout=25)
-    r.raise_for_status()
-    return r.json()
+    return fb_client(base_url).get(path)
 
 def fb_delete(base_url: str, path: str):
-    headers, params = _auth_headers_and_params()
-    url = f"{base_url.rstrip('/')}/{path}.json"
-    r = requests.delete(url, headers=headers, params=params, timeout=25)
-    r.raise_for_status()
+    fb_client(base_url).delete(path)
+    return True
+
+def fb_delete_many(base_url: str, path: str, ids: list, chunk: int = 500):
+    """
+    Borra varios hijos de `path` con un PATCH multi-ruta ({id: null, ...}): una
+    petición por bloque de `chunk` IDs en vez de una por nodo.
+    """
+    fb_client(base_url).delete_many(path, ids, chunk=chunk)
     return True
 
 # ── Category ↔ carpeta ────────────────────────────────────────────────────────
@@ -272,6 +314,93 @@ def find_category_folder(songs_dir: Path, letter: str) -> Path | None:
             return p
     return None
 
+# ── Agrupar ediciones por fichero ─────────────────────────────────────────────
+def edition_order(ed_id: str, ed: dict) -> tuple:
+    """
+    Clave de orden de aplicación: `timestamp` (o `createdAt`) si la app lo manda
+    y, si no o a igualdad, el pushId (los pushId de Firebase ya son cronológicos).
+    """
+    ts = ed.get("timestamp", ed.get("createdAt"))
+    try:
+        ts = float(ts)
+    except (TypeError, ValueError):
+        ts = 0.0
+    return (ts, ed_id)
+
+def resolve_target(ed: dict, songs_dir: Path, cat_letter: dict) -> tuple[Path | None, str | None]:
+    """(ruta del .cho, None) o (None, motivo) si la edición no apunta a un fichero."""
+    category_raw = str(ed.get("category","")).strip()
+    filename = str(ed.get("filename","")).strip()
+    letter = cat_letter.get(category_raw.lower()) or (category_raw[:1].upper() if category_raw else None)
+    if not letter:
+        return None, f"Categoría no mapeada: '{category_raw}'"
+    cat_folder = find_category_folder(songs_dir, letter)
+    if not cat_folder:
+        return None, f"No encuentro carpeta para letra '{letter}'"
+    cho_path = cat_folder / filename
+    if not cho_path.exists():
+        return None, f"No existe {filename} en {cat_folder.name}"
+    return cho_path, None
+
+def group_by_file(to_process: list, songs_dir: Path, cat_letter: dict) -> tuple[dict, list]:
+    """
+    Agrupa las ediciones por .cho destino, cada grupo en orden de aplicación
+    (`edition_order`). Devuelve ({ruta: [(ed_id, ed), ...]}, [(ed_id, motivo)])
+    con las que no se pudieron resolver.
+    """
+    groups, skipped = {}, []
+    for ed_id, ed in sorted(to_process, key=lambda it: edition_order(*it)):
+        cho_path, err = resolve_target(ed, songs_dir, cat_letter)
+        if err:
+            skipped.append((ed_id, err))
+        else:
+            groups.setdefault(cho_path, []).append((ed_id, ed))
+    return groups, skipped
+
+def apply_edition(ed: dict, text: str) -> str:
+    """Texto del .cho tras aplicar una edición (cuerpo, multimedia y tags)."""
+    new_text = text
+    content_changed = (ed.get("contentNew") is not None
+                       and ed.get("contentNew") != ed.get("contentOld"))
+    # 1) Cuerpo: contentNew manda si difiere. El cuerpo viaja SIN multimedia,
+    #    así que partimos de un cuerpo sin esas directivas y las reinyectamos
+    #    luego (conservando las del .cho original si la edición no las toca).
+    if content_changed or media_changed(ed):
+        base = _nl(ed["contentNew"]) if content_changed else text
+        base_body = cp.strip_media(base)
+        media = resolve_media(ed, text)
+        new_text = inject_media(base_body, media)
+    # 2) SIEMPRE revisar tags de cabecera después
+    return apply_tag_updates(new_text, ed)
+
+def merge_editions(eds: list, text: str, hashes: TextHashes | None = None) -> tuple[str, list]:
+    """
+    Aplica en memoria, en orden, todas las ediciones de un mismo fichero.
+    Cada una ve el resultado de las anteriores (igual que aplicarlas de una en
+    una escribiendo a disco). Devuelve (texto final, [(ed_id, estado)]) con
+    estado "conflict" (no aplicada, el nodo se conserva), "changed" o "noop".
+    `hashes` son los de `text` (p.ej. `ChoCache.hashes`); solo se recalculan
+    cuando una edición cambia el texto.
+    """
+    if hashes is None:
+        hashes = TextHashes(text)
+    outcomes = []
+    for ed_id, ed in eds:
+        content_changed = (ed.get("contentNew") is not None
+                           and ed.get("contentNew") != ed.get("contentOld"))
+        # 0) Conflicto: si el cuerpo cambió desde que la app leyó la canción,
+        #    NO machacamos. Dejamos el nodo intacto para revisarlo a mano (el
+        #    plan B de "tirar de git" necesita que te enteres; esto es el chivato).
+        if content_changed and content_conflict(ed, text, hashes):
+            outcomes.append((ed_id, "conflict"))
+            continue
+        new_text = apply_edition(ed, text)
+        changed = new_text != text
+        outcomes.append((ed_id, "changed" if changed else "noop"))
+        if changed:
+            text, hashes = new_text, TextHashes(new_text)
+    return text, outcomes
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 def main():
     parser = argparse.ArgumentParser(description="Sync Firebase ediciones -> .cho (con backups y borrado de nodo)")
@@ -306,12 +435,11 @@ def main():
             console.print("ℹ️ Lista de borrados vacía. Nada que borrar.")
             return
         console.print(f"🗑️  Borrando {len(ids)} nodo(s) ya sincronizado(s) en Firebase…")
-        for ed_id in ids:
-            try:
-                fb_delete(base_url, f"songs/ediciones/{ed_id}")
-                console.print(f"   ✅ Borrado nodo {ed_id}")
-            except Exception as e:
-                console.print(f"   💥 No pude borrar {ed_id}: {e}")
+        try:
+            fb_delete_many(base_url, "songs/ediciones", ids)
+            console.print(f"   ✅ Borrados {len(ids)} nodo(s)")
+        except Exception as e:
+            console.print(f"   💥 No pude borrar los nodos: {e}")
         console.print("🏁 Borrado de nodos confirmados completado.")
         return
 
@@ -328,7 +456,8 @@ def main():
 
     console.print(f"🔌 Probando conexión a Firebase… [bold]{base_url}[/]")
     try:
-        ediciones = fb_get(base_url, "songs/ediciones") or {}
+        # Por páginas: tras un evento con muchas ediciones el nodo puede ser grande
+        ediciones = fb_client(base_url).get_children("songs/ediciones")
     except Exception as e:
         console.print(f"🚨 Error conectando/leyendo RTDB: {e}")
         return
@@ -374,95 +503,68 @@ def main():
         progress = None
 
     results = []
+    files = ChoCache()  # cada .cho se lee (y normaliza) una vez por sync
     deferred_deletes = []  # IDs aplicados a ficheros; se borran en Firebase tras confirmar el push
     if not args.dry_run:
         backup_dir.mkdir(parents=True, exist_ok=True)
 
-    for ed_id, ed in to_process:
+    # Un grupo por .cho: se lee una vez, se fusionan todas sus ediciones en
+    # memoria y se escribe (con un solo backup) una vez; sus nodos se borran
+    # en un único PATCH.
+    groups, skipped = group_by_file(to_process, songs_dir, cat_letter)
+    for ed_id, err in skipped:
+        results.append((ed_id,"⚠️",err))
+        if progress: progress.advance(task)
+
+    for cho_path, eds in groups.items():
+        filename = cho_path.name
+        group_results = []
         try:
-            category_raw = str(ed.get("category","")).strip()
-            filename = str(ed.get("filename","")).strip()
-
-            letter = cat_letter.get(category_raw.lower()) or (category_raw[:1].upper() if category_raw else None)
-            if not letter:
-                results.append((ed_id,"⚠️",f"Categoría no mapeada: '{category_raw}'"))
-                if progress: progress.advance(task); continue
-
-            cat_folder = find_category_folder(songs_dir, letter)
-            if not cat_folder:
-                results.append((ed_id,"⚠️",f"No encuentro carpeta para letra '{letter}'"))
-                if progress: progress.advance(task); continue
-
-            cho_path = cat_folder / filename
-            if not cho_path.exists():
-                results.append((ed_id,"⚠️",f"No existe {filename} en {cat_folder.name}"))
-                if progress: progress.advance(task); continue
-
-            original = cho_path.read_text(encoding="utf-8")
-            new_text = original
-
-            content_changed = (ed.get("contentNew") is not None
-                               and ed.get("contentNew") != ed.get("contentOld"))
-            media_edit = media_changed(ed)
-
-            # 0) Conflicto: si el cuerpo del .cho cambió en el repo desde que la
-            #    app leyó la canción, NO machacamos. Dejamos el nodo intacto para
-            #    revisarlo a mano (el plan B de "tirar de git" necesita que te
-            #    enteres; esto es el chivato).
-            if content_changed and content_conflict(ed, original):
-                results.append((ed_id,"⚠️",
-                    f"CONFLICTO: {filename} cambió en el repo desde la edición. "
-                    f"No aplicado; nodo conservado para revisión manual."))
-                if progress: progress.advance(task); continue
-
-            # 1) Cuerpo: contentNew manda si difiere. El cuerpo viaja SIN multimedia,
-            #    así que partimos de un cuerpo sin esas directivas y las reinyectamos
-            #    luego (conservando las del .cho original si la edición no las toca).
-            if content_changed or media_edit:
-                base = _nl(ed["contentNew"]) if content_changed else original
-                base_body = cp.strip_media(base)
-                media = resolve_media(ed, original)
-                new_text = inject_media(base_body, media)
-
-            # 2) SIEMPRE revisar tags de cabecera después
-            new_text = apply_tag_updates(new_text, ed)
-
-            if new_text == original:
-                # No produce cambios (ya estaba aplicado o es redundante): consumimos
-                # el nodo igualmente para no reprocesarlo en cada ejecución.
-                if args.dry_run:
-                    results.append((ed_id,"😴",f"Sin cambios → {filename} (se borraría el nodo)"))
-                elif args.defer_deletes:
-                    deferred_deletes.append(ed_id)
-                    results.append((ed_id,"😴",f"Sin cambios → {filename} (nodo a borrar)"))
-                else:
-                    fb_delete(base_url, f"songs/ediciones/{ed_id}")
-                    results.append((ed_id,"😴",f"Sin cambios → {filename} (nodo eliminado)"))
-                if progress: progress.advance(task); continue
+            original = files.read(cho_path)
+            merged, outcomes = merge_editions(eds, original, files.hashes(cho_path))
+            consumed = [ed_id for ed_id, st in outcomes if st != "conflict"]
+            for ed_id, st in outcomes:
+                if st == "conflict":
+                    group_results.append((ed_id,"⚠️",
+                        f"CONFLICTO: {filename} cambió en el repo desde la edición. "
+                        f"No aplicado; nodo conservado para revisión manual."))
 
             if args.dry_run:
-                results.append((ed_id,"📝",f"[dry-run] Cambiaría {filename} (backup en {backup_dir})"))
-            else:
-                # Backup espejo: ./songs-backup-edits/<ts>/<Carpeta>/<archivo>
-                dest_folder = backup_dir / cat_folder.name
-                dest_folder.mkdir(parents=True, exist_ok=True)
-                (dest_folder / (filename)).write_text(original, encoding="utf-8")
-
-                cho_path.write_text(new_text, encoding="utf-8")
-
+                for ed_id, st in outcomes:
+                    if st == "changed":
+                        group_results.append((ed_id,"📝",f"[dry-run] Cambiaría {filename} (backup en {backup_dir})"))
+                    elif st == "noop":
+                        group_results.append((ed_id,"😴",f"Sin cambios → {filename} (se borraría el nodo)"))
+            elif consumed:
+                if merged != original:
+                    # Backup espejo: ./songs-backup-edits/<ts>/<Carpeta>/<archivo>
+                    dest_folder = backup_dir / cho_path.parent.name
+                    dest_folder.mkdir(parents=True, exist_ok=True)
+                    (dest_folder / filename).write_text(original, encoding="utf-8")
+                    files.write(cho_path, merged)
+
+                # Las ediciones sin cambios (ya aplicadas o redundantes) también se
+                # consumen, para no reprocesarlas en cada ejecución.
                 if args.defer_deletes:
-                    # No borramos aún: el nodo se borra después, solo si el push tiene éxito.
-                    deferred_deletes.append(ed_id)
-                    results.append((ed_id,"✨",f"Actualizado {filename} (borrado de nodo diferido)"))
+                    # No borramos aún: se borran después, solo si el push tiene éxito.
+                    deferred_deletes.extend(consumed)
+                    done = {"changed": "Actualizado {f} (borrado de nodo diferido)",
+                            "noop": "Sin cambios → {f} (nodo a borrar)"}
                 else:
-                    # Borrar nodo procesado
-                    fb_delete(base_url, f"songs/ediciones/{ed_id}")
-                    results.append((ed_id,"✨",f"Actualizado {filename} + nodo Firebase eliminado"))
+                    fb_delete_many(base_url, "songs/ediciones", consumed)
+                    done = {"changed": "Actualizado {f} + nodo Firebase eliminado",
+                            "noop": "Sin cambios → {f} (nodo eliminado)"}
+                for ed_id, st in outcomes:
+                    if st != "conflict":
+                        group_results.append((ed_id, "✨" if st == "changed" else "😴",
+                                              done[st].format(f=filename)))
 
         except Exception as e:
-            results.append((ed_id,"💥",f"Error: {e}"))
+            reported = {r[0] for r in group_results}
+            group_results += [(ed_id,"💥",f"Error: {e}") for ed_id, _ in eds if ed_id not in reported]
         finally:
-            if progress: progress.advance(task)
+            results.extend(group_results)
+            if progress: progress.advance(task, len(eds))
 
     if progress: progress.stop()
 
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Construcción del payload de canciones (songs-vX.json) como librería.
+
+Lo usan:
+  - crear_songs_json.py  (CLI: escribe songs-vX.json + .search.json)
+  - update_firebase.py   (sube la última versión a Firebase)
+  - admin/server.py      (build-json en proceso)
+  - benchmark.py / tests
+
+Separación:
+  - `song_entry` / `parse_category`: .cho → entradas del JSON (funciones puras).
+  - `build_songs`: recorre songs/ según indice.json y devuelve el dict final.
+    Con `workers > 1` parsea las categorías en paralelo (procesos), con el
+    mismo resultado y en el mismo orden que en serie.
+  - `iter_categories`: lo mismo pero categoría a categoría, para escribir
+    según se parsea (`PayloadStream` serializa igual que json.dump indent=2).
+  - Escritores (`FileWriter`, `MemoryWriter`, `FirebaseWriter`): reciben el
+    nombre de versión, cada categoría y al final el índice de búsqueda.
+    `build()` calcula la versión, parsea una sola vez y se lo pasa a todos.
+    Ya no se guarda en memoria el dict completo del payload ni una segunda
+    copia codificada; sí crecen con el catálogo el índice de búsqueda, los
+    resúmenes por categoría del manifiesto y, claro, `MemoryWriter`.
+  - Manifiesto (`songs/songs-manifest.json`): última versión y hash SHA-256
+    de su contenido. Si una build da el mismo hash, no se escribe nada (ni
+    versión nueva ni subida a Firebase); el uploader compara además con
+    `songs/contentHash` en Firebase antes de subir.
+  - Hashes por canción y por categoría (`hash` en cada entrada y categoría):
+    estables, dependen solo del contenido. Van también resumidos en el
+    manifiesto y en el nodo `songs/manifest` para que la app descargue solo
+    lo que cambió.
+
+La librería no imprime nada salvo que se le pase `log` (el CLI pasa `print`).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import chordpro as cp  # mapeo campos ↔ directivas + parseo
+import firebase_client as fbc  # REST de la RTDB (pool, reintentos, gzip)
+import search_index as si  # índice de búsqueda precalculado para la app
+import transpose as tp  # {transpose: N} se aplica al generar
+
+VERSION_RX = re.compile(r'^songs-v(\d+)(?:\.(\d+))?\.json$')
+MANIFEST_NAME = 'songs-manifest.json'
+CATEGORY_FOLDER_RX = re.compile(r'^[A-Z]\.')
+
+# Campos opcionales: solo se emiten si tienen valor (evita inflar el JSON)
+OPTIONAL_FIELDS = ('rhythm', 'album', 'liturgicalTime', 'source', 'videoEmbed',
+                   'youtubeLinks', 'audioLinks', 'comment')
+
+Log = Optional[Callable[[str], None]]
+
+
+class BuildCancelled(Exception):
+    """La generación se canceló (desde el admin) antes de escribir nada."""
+
+
+# ─────────── Versiones songs-vX.json ─────────── #
+
+def find_latest_version(songs_dir: str) -> Tuple[int, int]:
+    """Última versión existente (major, minor), o (0, 0) si no hay ninguna."""
+    versions = []
+    for fname in os.listdir(songs_dir):
+        m = VERSION_RX.match(fname)
+        if m:
+            versions.append((int(m.group(1)), int(m.group(2)) if m.group(2) else 0))
+    return max(versions) if versions else (0, 0)
+
+
+def bump_version(major: int, minor: int) -> Tuple[int, int]:
+    """De .0 a .1 hasta .9, luego salta a la siguiente major."""
+    if minor < 9:
+        return major, minor + 1
+    return major + 1, 0
+
+
+def format_version(major: int, minor: int) -> str:
+    """"1" o "1.2"."""
+    return f"{major}" if minor == 0 else f"{major}.{minor}"
+
+
+def version_filename(major: int, minor: int) -> str:
+    return f"songs-v{format_version(major, minor)}.json"
+
+
+def load_manifest(songs_dir: str) -> dict:
+    """{file, version: [major, minor], contentHash, searchIndex, builtAt} o {}."""
+    path = os.path.join(songs_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(songs_dir: str, manifest: dict) -> None:
+    path = os.path.join(songs_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(path + '.tmp', path)
+
+
+def latest_version(songs_dir: str) -> Tuple[int, int]:
+    """Última versión según el manifiesto; sin manifiesto (repos antiguos),
+    escaneando los nombres de fichero."""
+    version = load_manifest(songs_dir).get('version')
+    if version:
+        return int(version[0]), int(version[1])
+    return find_latest_version(songs_dir)
+
+
+def latest_version_file(songs_dir: str) -> str:
+    """Nombre del último songs-vX.json (error si no hay ninguno)."""
+    name = load_manifest(songs_dir).get('file') or version_filename(*find_latest_version(songs_dir))
+    if not os.path.exists(os.path.join(songs_dir, name)):
+        raise RuntimeError('No songs versions found')
+    return name
+
+
+# Longitud (en hex) de los hashes por canción/categoría: 64 bits bastan para
+# detectar cambios y no inflan el JSON
+ENTRY_HASH_LEN = 16
+
+
+def entry_hash(entry: dict) -> str:
+    """Hash estable de una entrada del JSON (sin su propio campo `hash`):
+    SHA-256 del JSON canónico (claves ordenadas, sin espacios)."""
+    canon = json.dumps({k: v for k, v in entry.items() if k != 'hash'},
+                       ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canon.encode('utf-8')).hexdigest()[:ENTRY_HASH_LEN]
+
+
+def category_hash(title: str, song_hashes: Iterable[str]) -> str:
+    """Hash de una categoría: su título y los hashes de sus canciones en orden
+    (cambia si se edita, añade, quita o reordena cualquier canción)."""
+    h = hashlib.sha256(title.encode('utf-8'))
+    for sh in song_hashes:
+        h.update(b'\0' + sh.encode('ascii'))
+    return h.hexdigest()[:ENTRY_HASH_LEN]
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 de un fichero, leído por bloques. Para un songs-vX.json es el
+    mismo `contentHash` que calcula `build()`."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ─────────── Parseo ─────────── #
+
+def song_entry(fname: str, text: str) -> dict:
+    """Entrada del JSON para un .cho (`fname` da el prefijo «01. »)."""
+    meta = cp.parse_basic_meta(text)  # title/author/key/capo
+    extra = cp.parse_media(text)      # multimedia + meta extra
+    clean_content = cp.strip_media(text)
+    # {transpose: N}: la app recibe los acordes (y el tono) ya transpuestos
+    clean_content, semis = tp.apply_transpose_directive(clean_content)
+    if semis:
+        new_key = tp.transposed_key(meta['key'], semis)
+        if new_key:
+            meta['key'] = new_key[0]
+
+    m = re.match(r'^(\d+)', fname)
+    code = f"{m.group(1)}. " if m else ''
+    entry = {
+        'title':    f"{code}{meta['title']}".strip(),  # "01. Título"
+        'filename': fname,
+        'author':   meta['author'],
+        'key':      meta['key'],
+        'capo':     meta['capo'],
+        'info':     '',
+        'content':  clean_content,  # cuerpo sin directivas multimedia
+    }
+    for field in OPTIONAL_FIELDS:
+        if extra[field]:
+            entry[field] = extra[field]
+    entry['hash'] = entry_hash(entry)
+    return entry
+
+
+def cho_files(cat_path: str) -> List[str]:
+    return sorted(f for f in os.listdir(cat_path) if f.lower().endswith('.cho'))
+
+
+def parse_category(cat_path: str) -> List[dict]:
+    """Todas las canciones (.cho, por nombre) de una carpeta de categoría."""
+    songs = []
+    for fname in cho_files(cat_path):
+        with open(os.path.join(cat_path, fname), encoding='utf-8') as f:
+            songs.append(song_entry(fname, f.read()))
+    return songs
+
+
+def load_indice(songs_dir: str) -> Dict[str, dict]:
+    with open(os.path.join(songs_dir, 'indice.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def category_plan(songs_dir: str,
+                  indice: Dict[str, dict]) -> List[Tuple[str, dict, Optional[str], Optional[str]]]:
+    """(cat_key, info, carpeta, aviso) por cada categoría de indice.json, en
+    su orden. Si la categoría se salta (sin carpeta o sin .cho), carpeta es
+    None y `aviso` explica por qué."""
+    folders = [d for d in os.listdir(songs_dir)
+               if os.path.isdir(os.path.join(songs_dir, d)) and CATEGORY_FOLDER_RX.match(d)]
+    prefix_map = {f.split('.')[0]: f for f in folders}
+    plan = []
+    for cat_key, cat_info in indice.items():
+        title = cat_info.get('categoryTitle', '')
+        folder = prefix_map.get(title.split('.')[0].strip())  # "A" de "A. Entrada"
+        if not folder:
+            plan.append((cat_key, cat_info, None,
+                         f"⚠️ No hay carpeta para '{cat_key}' ({title}), la salto."))
+        elif not cho_files(os.path.join(songs_dir, folder)):
+            plan.append((cat_key, cat_info, None,
+                         f"⚠️ Carpeta '{folder}' sin archivos .cho, omitiendo categoría '{cat_key}'."))
+        else:
+            plan.append((cat_key, cat_info, folder, None))
+    return plan
+
+
+def iter_categories(songs_dir: str, indice: Optional[Dict[str, dict]] = None,
+                    log: Log = None,
+                    on_category: Optional[Callable[[int, int, str], None]] = None,
+                    cancelled: Optional[Callable[[], bool]] = None,
+                    workers: int = 0) -> Iterator[Tuple[str, dict]]:
+    """(cat_key, {categoryTitle, hash, songs}) en el orden de indice.json, según se
+    parsea cada categoría: quien consume puede escribirla y soltarla.
+
+    `on_category(i, total, cat_key)` avisa al empezar cada categoría;
+    `cancelled()` → True aborta con BuildCancelled. Con `workers > 1` las
+    categorías se parsean en paralelo en procesos aparte (mismo orden).
+    """
+    if indice is None:
+        indice = load_indice(songs_dir)
+    if log:
+        log(f"📂 Buscando carpetas en: {songs_dir}")
+    plan = category_plan(songs_dir, indice)
+    paths = [os.path.join(songs_dir, folder) for _, _, folder, _ in plan if folder]
+
+    pool = None
+    if workers and workers > 1 and len(paths) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        parsed = pool.map(parse_category, paths)   # perezoso y en orden
+    else:
+        parsed = (parse_category(p) for p in paths)
+    try:
+        for i, (cat_key, cat_info, folder, skip) in enumerate(plan):
+            if cancelled and cancelled():
+                raise BuildCancelled(f"Cancelado antes de '{cat_key}'")
+            if on_category:
+                on_category(i, len(plan), cat_key)
+            if folder is None:
+                if log:
+                    log(skip)
+                continue
+            songs = next(parsed)
+            if log:
+                log(f"🎯 Procesando '{cat_key}' en '{folder}' con {len(songs)} archivos")
+                for entry in songs:
+                    log(f"   🎵 {entry['filename']} -> {entry['title']} "
+                        f"(Key={entry['key']}, Capo={entry['capo']})")
+            title = cat_info['categoryTitle']
+            yield cat_key, {'categoryTitle': title,
+                            'hash': category_hash(title, (e['hash'] for e in songs)),
+                            'songs': songs}
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def category_summary(category: dict) -> dict:
+    """{hash, songs: [[filename, hash], ...]} de una categoría: lo que va en
+    el manifiesto. Listas y no dict porque Firebase no admite '.' en claves."""
+    return {'hash': category['hash'],
+            'songs': [[e['filename'], e['hash']] for e in category['songs']]}
+
+
+def build_songs(songs_dir: str, indice: Optional[Dict[str, dict]] = None,
+                log: Log = None,
+                on_category: Optional[Callable[[int, int, str], None]] = None,
+                cancelled: Optional[Callable[[], bool]] = None,
+                workers: int = 0) -> Dict[str, dict]:
+    """Payload completo {cat_key: {categoryTitle, hash, songs}} en un dict (ver
+    `iter_categories` para los parámetros)."""
+    return dict(iter_categories(songs_dir, indice, log=log, on_category=on_category,
+                                cancelled=cancelled, workers=workers))
+
+
+# ─────────── Serialización en streaming ─────────── #
+
+def dumps_payload(payload: Dict[str, dict]) -> str:
+    """Formato canónico de songs-vX.json (el que se versiona en el repo)."""
+    return json.dumps(payload, ensure_ascii=False, indent=2)
+
+
+def dumps_search(search: dict) -> str:
+    return json.dumps(search, ensure_ascii=False, separators=(',', ':'))
+
+
+_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+class PayloadStream:
+    """Escribe songs-vX.json categoría a categoría, byte a byte igual que
+    `dumps_payload` del dict completo. `write` es cualquier función que
+    acepte str (p. ej. `f.write` de un fichero de texto)."""
+
+    def __init__(self, write: Callable[[str], object]) -> None:
+        self._write = write
+        self._count = 0
+
+    def add(self, cat_key: str, category: dict) -> None:
+        self._write(("{\n  " if self._count == 0 else ",\n  ")
+                    + json.dumps(cat_key, ensure_ascii=False) + ": ")
+        # Un nivel más de sangría: en JSON los \n reales solo separan
+        # elementos (dentro de las cadenas van escapados).
+        for chunk in _ENCODER.iterencode(category):
+            self._write(chunk.replace("\n", "\n  "))
+        self._count += 1
+
+    def close(self) -> None:
+        self._write("\n}" if self._count else "{}")
+
+
+# ─────────── Escritores ─────────── #
+#
+# Protocolo: begin(name) → add(cat_key, categoría)* → finish(search, hash,
+# categories). `categories` es {cat_key: category_summary(...)}: los hashes
+# por categoría y canción que acaban en el manifiesto / songs/manifest.
+# Si la build se cancela, falla a medias o sale idéntica a la anterior se
+# llama a abort() y no queda nada publicado. `write(name, payload, search)`
+# hace las tres cosas de golpe.
+
+class Writer(ABC):
+    @abstractmethod
+    def begin(self, name: str) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, cat_key: str, category: dict) -> None:
+        ...
+
+    @abstractmethod
+    def finish(self, search: Optional[dict], content_hash: Optional[str] = None,
+               categories: Optional[Dict[str, dict]] = None) -> str:
+        ...
+
+    def abort(self) -> None:
+        pass
+
+    def write(self, name: str, payload: Dict[str, dict], search: Optional[dict],
+              content_hash: Optional[str] = None) -> str:
+        self.begin(name)
+        for cat_key, category in payload.items():
+            self.add(cat_key, category)
+        categories = {k: category_summary(c) for k, c in payload.items() if 'hash' in c}
+        return self.finish(search, content_hash, categories)
+
+
+class FileWriter(Writer):
+    """songs-vX.json + songs-vX.search.json en la carpeta songs/. El JSON se
+    escribe en un .tmp según llegan las categorías y se renombra al final;
+    después se actualiza el manifiesto."""
+
+    def __init__(self, songs_dir: str, log: Log = None) -> None:
+        self.songs_dir = songs_dir
+        self.log = log
+        self._f = None
+        self._stream: Optional[PayloadStream] = None
+
+    def begin(self, name: str) -> None:
+        self.name = name
+        self.path = os.path.join(self.songs_dir, name)
+        self._f = open(self.path + '.tmp', 'w', encoding='utf-8')
+        self._stream = PayloadStream(self._f.write)
+
+    def add(self, cat_key: str, category: dict) -> None:
+        self._stream.add(cat_key, category)
+
+    def finish(self, search: Optional[dict], content_hash: Optional[str] = None,
+               categories: Optional[Dict[str, dict]] = None) -> str:
+        self._stream.close()
+        self._f.close()
+        os.replace(self.path + '.tmp', self.path)
+        if search is not None:
+            index_name = si.app_index_filename(self.name)
+            index_path = os.path.join(self.songs_dir, index_name)
+            with open(index_path, 'w', encoding='utf-8') as f:
+                f.write(dumps_search(search))
+            if self.log:
+                self.log(f"🔎 Índice de búsqueda: {index_name} ({os.path.getsize(index_path)} bytes)")
+        m = VERSION_RX.match(self.name)
+        save_manifest(self.songs_dir, {
+            'file': self.name,
+            'version': [int(m.group(1)), int(m.group(2) or 0)] if m else None,
+            'contentHash': content_hash or file_hash(self.path),
+            'searchIndex': si.app_index_filename(self.name) if search is not None else None,
+            'builtAt': int(time.time()),
+            'categories': categories or {},
+        })
+        return self.path
+
+    def abort(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            if os.path.exists(self.path + '.tmp'):
+                os.remove(self.path + '.tmp')
+
+
+class MemoryWriter(Writer):
+    """Guarda lo que se escribiría, para tests y para reutilizar el parseo."""
+
+    def __init__(self) -> None:
+        self.files: Dict[str, str] = {}
+        self.payload: Optional[Dict[str, dict]] = None
+        self.search: Optional[dict] = None
+
+    def begin(self, name: str) -> None:
+        self.name = name
+        self._payload: Dict[str, dict] = {}
+
+    def add(self, cat_key: str, category: dict) -> None:
+        self._payload[cat_key] = category
+
+    def finish(self, search: Optional[dict], content_hash: Optional[str] = None,
+               categories: Optional[Dict[str, dict]] = None) -> str:
+        self.payload, self.search = self._payload, search
+        self.content_hash = content_hash
+        self.categories = categories
+        self.files[self.name] = dumps_payload(self.payload)
+        if search is not None:
+            self.files[si.app_index_filename(self.name)] = dumps_search(search)
+        return self.name
+
+
+# Tamaño hasta el que el cuerpo a subir se queda en RAM antes de pasar a disco
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+class FirebaseWriter(Writer):
+    """Sube songs/data, songs/searchIndex, songs/manifest, songs/contentHash y
+    songs/updatedAt a la Realtime DB.
+
+    El JSON se serializa por categorías a un fichero temporal (en RAM hasta
+    SPOOL_MAX_BYTES) y se sube leyéndolo por bloques: nunca hay dos copias
+    del catálogo en memoria. `put_file` sube un songs-vX.json ya escrito sin
+    cargarlo. Si `songs/contentHash` en Firebase ya coincide con el hash de
+    lo que se iba a subir, no se sube nada."""
+
+    def __init__(self, firebase_url: str, token: str, log: Log = None,
+                 client: Optional[fbc.FirebaseClient] = None) -> None:
+        self.client = client or fbc.FirebaseClient(firebase_url, token)
+        self.log = log
+        self._spool = None
+
+    def put(self, node: str, body, length: Optional[int] = None) -> None:
+        """PUT de `body` (bytes o fichero binario; este se envía por bloques)."""
+        if length is None:
+            length = len(body)
+        self.client.put_raw(node, body, length=length)
+        if self.log:
+            self.log(f"☁️  {node} ({length} bytes)")
+
+    def get(self, node: str):
+        return self.client.get(node)
+
+    def remote_hash(self) -> Optional[str]:
+        return self.get('songs/contentHash')
+
+    def up_to_date(self, content_hash: Optional[str]) -> bool:
+        if content_hash and self.remote_hash() == content_hash:
+            if self.log:
+                self.log(f"☁️  Firebase ya tiene este contenido ({content_hash[:12]}), no subo nada")
+            return True
+        return False
+
+    def put_hash(self, content_hash: str) -> None:
+        self.put('songs/contentHash', json.dumps(content_hash).encode('utf-8'))
+
+    def put_manifest(self, content_hash: str, categories: Dict[str, dict]) -> None:
+        """songs/manifest: {contentHash, categories: {cat_key: {hash, songs}}}.
+        La app lo lee (es pequeño) y solo pide las categorías cuyo hash cambió."""
+        body = {'contentHash': content_hash, 'categories': categories}
+        self.put('songs/manifest', json.dumps(body, ensure_ascii=False,
+                                              separators=(',', ':')).encode('utf-8'))
+
+    def put_file(self, node: str, path: str) -> None:
+        with open(path, 'rb') as f:
+            self.put(node, f, length=os.path.getsize(path))
+
+    def put_updated_at(self, timestamp: Optional[int] = None) -> None:
+        # updatedAt el último: la app solo descarga cuando cambia
+        self.put('songs/updatedAt', str(timestamp or int(time.time())).encode('utf-8'))
+
+    def begin(self, name: str) -> None:
+        self.name = name
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+        self._stream = PayloadStream(lambda s: self._spool.write(s.encode('utf-8')))
+
+    def add(self, cat_key: str, category: dict) -> None:
+        self._stream.add(cat_key, category)
+
+    def finish(self, search: Optional[dict], content_hash: Optional[str] = None,
+               categories: Optional[Dict[str, dict]] = None) -> str:
+        self._stream.close()
+        try:
+            if self.up_to_date(content_hash):
+                return self.name
+            length = self._spool.tell()
+            self._spool.seek(0)
+            self.put('songs/data', self._spool, length=length)
+        finally:
+            self._spool.close()
+        if search is not None:
+            self.put('songs/searchIndex', dumps_search(search).encode('utf-8'))
+        if content_hash and categories is not None:
+            self.put_manifest(content_hash, categories)
+        if content_hash:
+            self.put_hash(content_hash)
+        self.put_updated_at()
+        return self.name
+
+    def abort(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+
+
+# ─────────── Todo junto ─────────── #
+
+class BuildResult(NamedTuple):
+    name: str                 # songs-vX.json (el nuevo, o el vigente si no cambió nada)
+    search: Optional[dict]    # índice de búsqueda (None si no cambió nada)
+    content_hash: str         # SHA-256 de songs-vX.json
+    changed: bool             # False → build idéntica a la anterior, no se escribió nada
+
+
+def build(songs_dir: str, writers: Iterable[Writer], log: Log = None,
+          on_category: Optional[Callable[[int, int, str], None]] = None,
+          cancelled: Optional[Callable[[], bool]] = None,
+          workers: int = 0, force: bool = False) -> BuildResult:
+    """Calcula la siguiente versión y parsea songs/ una sola vez: cada
+    categoría pasa a todos los escritores (y al índice de búsqueda y al hash)
+    según se parsea, sin acumular el catálogo entero.
+
+    Si el hash coincide con el del manifiesto (y su fichero existe) la build
+    es un no-op: se descarta todo y se devuelve la versión vigente con
+    `changed=False`. `force=True` genera versión nueva igualmente."""
+    if log:
+        log(f"🔍 Leyendo índice base desde: {os.path.join(songs_dir, 'indice.json')}")
+    indice = load_indice(songs_dir)
+    manifest = load_manifest(songs_dir)
+    name = version_filename(*bump_version(*latest_version(songs_dir)))
+    if log:
+        log(f"🚀 Generando nueva versión: {name}")
+    writers = list(writers)
+    index = si.AppIndexBuilder()
+    categories: Dict[str, dict] = {}
+    hasher = hashlib.sha256()
+    hashed = PayloadStream(lambda chunk: hasher.update(chunk.encode('utf-8')))
+    for w in writers:
+        w.begin(name)
+    try:
+        for cat_key, category in iter_categories(songs_dir, indice, log=log,
+                                                 on_category=on_category,
+                                                 cancelled=cancelled, workers=workers):
+            index.add_category(cat_key, category['songs'])
+            categories[cat_key] = category_summary(category)
+            hashed.add(cat_key, category)
+            for w in writers:
+                w.add(cat_key, category)
+        if cancelled and cancelled():
+            raise BuildCancelled("Cancelado antes de escribir")
+    except BaseException:
+        for w in writers:
+            w.abort()
+        raise
+    hashed.close()
+    content_hash = hasher.hexdigest()
+
+    current = manifest.get('file')
+    if (not force and manifest.get('contentHash') == content_hash
+            and current and os.path.exists(os.path.join(songs_dir, current))):
+        for w in writers:
+            w.abort()
+        if log:
+            log(f"✅ Sin cambios: {current} ya tiene este contenido ({content_hash[:12]})")
+        return BuildResult(current, None, content_hash, False)
+
+    search = index.result(name)
+    for w in writers:
+        w.finish(search, content_hash, categories)
+    return BuildResult(name, search, content_hash, True)
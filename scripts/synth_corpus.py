@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Generador de corpus sintéticos para probar la escala de las herramientas.
+
+Produce, de forma determinista (semilla), un árbol con la misma forma que el
+repo pero N veces más grande:
+
+  <out>/songs/indice.json + <out>/songs/<X. Categoría>/NN.titulo.cho
+      .cho realistas: title/artist/key/capo, {ritmo:}/{tiempo:}/{album:},
+      enlaces {youtube:}/{audio:}, estrofas y estribillos {soc}/{eoc} con
+      acordes coherentes con el tono.
+  <out>/Cantoral sintético.docx
+      Heading1 = sección («A. Entrada»), Heading2 = título (con «C/2» para la
+      cejilla), líneas de acordes en español (DO, lam…) alineadas con espacios
+      sobre la letra y estribillos en negrita, como el cantoral de Castellón.
+  <out>/input/<categoría>/*.tex
+      Formato songs de LaTeX (\\beginsong, \\beginverse/\\beginchorus, \\[G]).
+
+Las categorías salen de songs/indice.json del repo. `--scale 10` genera 10×
+el tamaño actual del repo (108 .cho, 225 canciones en el docx, 63 .tex).
+
+Uso:
+  python scripts/synth_corpus.py /tmp/corpus --scale 10
+  python scripts/synth_corpus.py /tmp/corpus --songs 10000 --docx-songs 0 --tex 0
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_DIR = SCRIPTS_DIR.parent
+INDICE_JSON = REPO_DIR / "songs" / "indice.json"
+
+# Tamaño del repo hoy (base para --scale)
+BASE_SONGS = 108
+BASE_DOCX_SONGS = 225
+BASE_TEX = 63
+
+DOCX_NAME = "Cantoral sintético.docx"
+
+# Carpetas de scripts/input (ver latex_import.LATEX_CATEGORY_MAP)
+TEX_FOLDERS = ("entrada", "gloria", "aleluya", "ofertorio", "santo", "padrenuestro",
+               "paz", "comunion", "salida", "navidad", "pascua", "adoracion",
+               "estribillos", "gracias")
+
+# ─────────── Vocabulario ─────────── #
+
+WORDS = (
+    "señor", "dios", "amor", "paz", "luz", "vida", "camino", "pan", "vino",
+    "gloria", "cielo", "tierra", "pueblo", "madre", "hermano", "corazón",
+    "esperanza", "alegría", "fe", "canto", "voz", "mesa", "fuego", "agua",
+    "cruz", "reino", "padre", "espíritu", "mundo", "noche", "día", "sol",
+)
+FILLERS = ("a", "de", "en", "tu", "mi", "el", "la", "con", "por", "que", "y", "nos")
+VERBS = ("ven", "canta", "alaba", "busca", "sigue", "escucha", "llama", "vive",
+         "camina", "celebra", "bendice", "espera")
+ARTISTS = ("Alborada", "Kairoi", "Cesáreo Gabaráin", "Brotes de Olivo", "Hakuna",
+           "Ixcís", "Migueli", "Jésed", "Ain Karem", "Popular")
+RHYTHMS = ("4x4", "balada 6/8", "parones + rasgueo", "arpegio", "vals 3/4")
+TIEMPOS = ("Entrada", "Adviento", "Navidad", "Cuaresma", "Pascua", "Pentecostés",
+           "Tiempo Ordinario", "Comunión", "María")
+
+# Tonos y sus acordes diatónicos (I, ii, iii, IV, V, vi)
+KEYS: Dict[str, Tuple[str, ...]] = {
+    "C": ("C", "Dm", "Em", "F", "G", "Am"),
+    "D": ("D", "Em", "F#m", "G", "A", "Bm"),
+    "E": ("E", "F#m", "G#m", "A", "B", "C#m"),
+    "F": ("F", "Gm", "Am", "Bb", "C", "Dm"),
+    "G": ("G", "Am", "Bm", "C", "D", "Em"),
+    "A": ("A", "Bm", "C#m", "D", "E", "F#m"),
+    "Am": ("Am", "Bdim", "C", "Dm", "E7", "F"),
+    "Em": ("Em", "F#dim", "G", "Am", "B7", "C"),
+}
+# Progresiones típicas (grados, base 0 = I)
+PROGRESSIONS = ((0, 4, 5, 3), (0, 3, 4, 0), (5, 3, 0, 4), (0, 5, 1, 4), (0, 2, 3, 4))
+
+EN_TO_ES = {"C": "DO", "D": "RE", "E": "MI", "F": "FA", "G": "SOL", "A": "LA", "B": "SI"}
+
+# Línea de canción: lista de (acorde o None, fragmento de letra)
+Line = List[Tuple[Optional[str], str]]
+
+
+def es_chord(chord: str) -> str:
+    """Acorde EN → notación del docx («Am» → «lam», «C» → «DO», «F#m» → «fa#m»)."""
+    m = re.match(r"^([A-G])([#b]?)(.*)$", chord)
+    if not m:
+        return chord
+    root, acc, suf = m.groups()
+    es = EN_TO_ES[root]
+    if suf.startswith("m") and not suf.startswith("maj"):
+        return es.lower() + acc + suf
+    return es + acc + suf
+
+
+# ─────────── Canción sintética ─────────── #
+
+def _title(rng: random.Random) -> str:
+    pattern = rng.randint(0, 2)
+    if pattern == 0:
+        return f"{rng.choice(VERBS)} {rng.choice(FILLERS)} {rng.choice(WORDS)}".capitalize()
+    if pattern == 1:
+        return f"{rng.choice(WORDS)} {rng.choice(FILLERS)} {rng.choice(WORDS)}".capitalize()
+    return f"{rng.choice(WORDS)}".capitalize()
+
+
+def _lyric_line(rng: random.Random, chords: List[str]) -> Line:
+    """Verso de 6–10 palabras con 2–4 acordes repartidos al inicio de palabra."""
+    words = [rng.choice(WORDS + FILLERS + VERBS) for _ in range(rng.randint(6, 10))]
+    n_chords = min(len(chords), rng.randint(2, 4))
+    anchors = sorted(rng.sample(range(1, len(words)), n_chords - 1)) if n_chords > 1 else []
+    anchors = [0] + anchors
+    line: Line = []
+    for k, start in enumerate(anchors):
+        end = anchors[k + 1] if k + 1 < len(anchors) else len(words)
+        frag = " ".join(words[start:end]) + (" " if end < len(words) else "")
+        line.append((chords[k % len(chords)], frag))
+    return line
+
+
+def generate_song(rng: random.Random, serial: int) -> dict:
+    """Canción con metadatos, 2–3 estrofas y estribillo (estructura neutra)."""
+    key = rng.choice(list(KEYS))
+    degrees = KEYS[key]
+    sections = []
+    chorus_prog = [degrees[d] for d in rng.choice(PROGRESSIONS)]
+    for v in range(rng.randint(2, 3)):
+        prog = [degrees[d] for d in rng.choice(PROGRESSIONS)]
+        sections.append(("verse", [_lyric_line(rng, prog) for _ in range(4)]))
+        if v == 0 or rng.random() < 0.5:
+            sections.append(("chorus", [_lyric_line(rng, chorus_prog) for _ in range(rng.randint(2, 4))]))
+    song = {
+        "title": f"{_title(rng)} {serial}",
+        "artist": rng.choice(ARTISTS),
+        "key": key,
+        "capo": rng.choice((0, 0, 0, 1, 2, 3)),
+        "sections": sections,
+        "media": {},
+    }
+    if rng.random() < 0.6:
+        song["media"]["rhythm"] = rng.choice(RHYTHMS)
+    if rng.random() < 0.5:
+        song["media"]["liturgicalTime"] = " | ".join(rng.sample(TIEMPOS, rng.randint(1, 2)))
+    if rng.random() < 0.3:
+        song["media"]["album"] = f"Álbum {rng.randint(1, 40)}"
+    if rng.random() < 0.5:
+        song["media"]["youtube"] = [("Oficial", f"https://www.youtube.com/watch?v=syn{serial:06d}")]
+    if rng.random() < 0.2:
+        song["media"]["audio"] = [("Ensayo", f"https://drive.google.com/file/d/syn{serial:06d}")]
+    return song
+
+
+def render_cho(song: dict) -> str:
+    out = [f"{{title: {song['title']}}}", f"{{artist: {song['artist']}}}",
+           f"{{key: {song['key']}}}"]
+    if song["capo"]:
+        out.append(f"{{capo: {song['capo']}}}")
+    media = song["media"]
+    if media.get("rhythm"):
+        out.append(f"{{ritmo: {media['rhythm']}}}")
+    if media.get("album"):
+        out.append(f"{{album: {media['album']}}}")
+    if media.get("liturgicalTime"):
+        out.append(f"{{tiempo: {media['liturgicalTime']}}}")
+    for label, url in media.get("youtube", []):
+        out.append(f"{{youtube: {label} | {url}}}")
+    for label, url in media.get("audio", []):
+        out.append(f"{{audio: {label} | {url}}}")
+    for kind, lines in song["sections"]:
+        out.append("")
+        if kind == "chorus":
+            out.append("{soc}")
+        for line in lines:
+            if kind == "chorus":  # estribillo en mayúsculas, como en el repo
+                line = [(c, frag.upper()) for c, frag in line]
+            out.append("".join(f"[{c}]{frag}" if c else frag for c, frag in line))
+        if kind == "chorus":
+            out.append("{eoc}")
+    return "\n".join(out) + "\n"
+
+
+def render_tex(song: dict) -> str:
+    out = [f"\\beginsong{{{song['title']}}}[by={{{song['artist']}}}]"]
+    if song["capo"]:
+        out.append(f"\\capo{{{song['capo']}}}")
+    for kind, lines in song["sections"]:
+        tag = "chorus" if kind == "chorus" else "verse"
+        out.append(f"\\begin{tag}")
+        for line in lines:
+            out.append("".join(f"\\[{c}]{frag}" if c else frag for c, frag in line))
+        out.append(f"\\end{tag}")
+    out.append("\\endsong")
+    return "\n".join(out) + "\n"
+
+
+# ─────────── docx ─────────── #
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _para(text: str, style: Optional[str] = None, bold: bool = False) -> str:
+    ppr = ""
+    if style:
+        ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>'
+    else:
+        ppr = '<w:pPr><w:ind w:left="397" w:firstLine="0"/></w:pPr>'
+    rpr = '<w:rPr><w:b w:val="1"/><w:sz w:val="24"/></w:rPr>' if bold else '<w:rPr><w:sz w:val="24"/></w:rPr>'
+    return (f'<w:p>{ppr}<w:r>{rpr}<w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>')
+
+
+def docx_song_paragraphs(song: dict) -> List[str]:
+    """Párrafos de una canción: título + (línea de acordes, línea de letra)…"""
+    title = song["title"].upper()
+    if song["capo"]:
+        title += f" C/{song['capo']}"
+    paras = [_para(title, style="Heading2")]
+    for kind, lines in song["sections"]:
+        for line in lines:
+            chord_row = ""
+            lyric = ""
+            for c, frag in line:
+                if c:
+                    chord_row += " " * max(len(lyric) - len(chord_row), 1 if chord_row else 0)
+                    chord_row += es_chord(c)
+                lyric += frag
+            if kind == "chorus":
+                lyric = lyric.upper()
+            paras.append(_para(chord_row))
+            paras.append(_para(lyric, bold=(kind == "chorus")))
+        paras.append(_para(""))
+    return paras
+
+
+def write_docx(path: Path, songs_by_section: List[Tuple[str, List[dict]]]) -> Path:
+    """Escribe un .docx mínimo (solo lo que leen docx2chordpro y Word)."""
+    body: List[str] = []
+    for section, songs in songs_by_section:
+        body.append(_para(section, style="Heading1"))
+        for song in songs:
+            body.extend(docx_song_paragraphs(song))
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document xmlns:w="{_W_NS}"><w:body>{"".join(body)}</w:body></w:document>')
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>')
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships/officeDocument" Target="word/document.xml"/></Relationships>')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", content_types)
+        z.writestr("_rels/.rels", rels)
+        z.writestr("word/document.xml", document)
+    return path
+
+
+# ─────────── Corpus completo ─────────── #
+
+def load_categories(indice_path: Path = INDICE_JSON) -> Tuple[dict, List[str]]:
+    """(indice.json, nombres de carpeta «X. Nombre») a partir del índice del repo."""
+    indice = json.loads(indice_path.read_text(encoding="utf-8"))
+    folders = []
+    for info in indice.values():
+        title = info.get("categoryTitle", "")
+        m = re.match(r"\s*([A-Z])\.\s*(.*)$", title)
+        if not m:
+            continue
+        name = re.sub(r"[^\w\s,-]", "", m.group(2)).strip()  # sin emojis
+        folders.append(f"{m.group(1)}. {name}")
+    return indice, folders
+
+
+def slugify(s: str) -> str:
+    s = s.lower()
+    for a, b in (("á", "a"), ("é", "e"), ("í", "i"), ("ó", "o"), ("ú", "u"), ("ñ", "n")):
+        s = s.replace(a, b)
+    return re.sub(r"[^a-z0-9]+", "_", s).strip("_")
+
+
+def write_cho_corpus(songs_dir: Path, n: int, seed: int = 0) -> List[Path]:
+    """`n` .cho repartidos por las categorías de indice.json (+ copia del índice)."""
+    rng = random.Random(seed)
+    indice, folders = load_categories()
+    songs_dir.mkdir(parents=True, exist_ok=True)
+    (songs_dir / "indice.json").write_text(
+        json.dumps(indice, ensure_ascii=False, indent=2), encoding="utf-8")
+    counters: Dict[str, int] = {}
+    paths: List[Path] = []
+    for i in range(n):
+        folder = folders[rng.randrange(len(folders))]
+        counters[folder] = counters.get(folder, 0) + 1
+        song = generate_song(rng, i)
+        (songs_dir / folder).mkdir(exist_ok=True)
+        p = songs_dir / folder / f"{counters[folder]:02d}.{slugify(song['title'])}.cho"
+        p.write_text(render_cho(song), encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def write_docx_corpus(path: Path, n: int, seed: int = 0) -> Path:
+    rng = random.Random(seed + 1)
+    _, folders = load_categories()
+    by_section: Dict[str, List[dict]] = {f: [] for f in folders}
+    for i in range(n):
+        by_section[folders[rng.randrange(len(folders))]].append(generate_song(rng, i))
+    return write_docx(path, [(s, songs) for s, songs in by_section.items() if songs])
+
+
+def write_tex_corpus(input_dir: Path, n: int, seed: int = 0) -> List[Path]:
+    rng = random.Random(seed + 2)
+    paths: List[Path] = []
+    for i in range(n):
+        folder = input_dir / TEX_FOLDERS[rng.randrange(len(TEX_FOLDERS))]
+        folder.mkdir(parents=True, exist_ok=True)
+        song = generate_song(rng, i)
+        p = folder / f"{slugify(song['title'])}.tex"
+        p.write_text(render_tex(song), encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def build_corpus(out: Path, songs: int = BASE_SONGS, docx_songs: int = BASE_DOCX_SONGS,
+                 tex: int = BASE_TEX, seed: int = 0) -> Dict[str, object]:
+    """Genera el árbol completo en `out` y devuelve sus rutas."""
+    result: Dict[str, object] = {"songs_dir": out / "songs", "docx": None, "input_dir": None}
+    write_cho_corpus(out / "songs", songs, seed)
+    if docx_songs:
+        result["docx"] = write_docx_corpus(out / DOCX_NAME, docx_songs, seed)
+    if tex:
+        write_tex_corpus(out / "input", tex, seed)
+        result["input_dir"] = out / "input"
+    return result
+
+
+# ─────────── CLI ─────────── #
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético del cantoral")
+    parser.add_argument("out", help="Carpeta de salida")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Múltiplo del tamaño actual del repo (10 = 10×)")
+    parser.add_argument("--songs", type=int, help="Nº de .cho (anula --scale)")
+    parser.add_argument("--docx-songs", type=int, help="Nº de canciones en el docx")
+    parser.add_argument("--tex", type=int, help="Nº de .tex")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    def size(explicit: Optional[int], base: int) -> int:
+        return explicit if explicit is not None else round(base * args.scale)
+
+    out = Path(args.out)
+    res = build_corpus(out, size(args.songs, BASE_SONGS), size(args.docx_songs, BASE_DOCX_SONGS),
+                       size(args.tex, BASE_TEX), args.seed)
+    n_cho = len(list(Path(res["songs_dir"]).glob("*/*.cho")))  # type: ignore[arg-type]
+    print(f"✅ Corpus en {out}: {n_cho} .cho"
+          + (f", docx {res['docx']}" if res["docx"] else "")
+          + (f", .tex en {res['input_dir']}" if res["input_dir"] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,9 @@ CLI mega-friendly para convertir tabs ES ➜ ChordPro
 
 import os, re, sys, random, subprocess, shutil
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import latex_songs  # lexer del paquete songs (LaTeX ➜ ChordPro)
 
 # ───────── Colores ANSI + emojis ───────── #
 RESET="\033[0m"; CYAN="\033[96m"; GREEN="\033[92m"; YELL="\033[93m"; MAG="\033[95m"
@@ -56,18 +58,41 @@ def is_known_chord(tok:str)->bool:
     t = clean_chord(tok)
     return (t in SP_EN or tok.lower() in SP_EN or CHORD_RE.match(t))
 
-def translate(tok:str,line_no:int)->str:
-    t = clean_chord(tok)
-    if t in USER_MAP: return USER_MAP[t]
-    if t in SP_EN:    return SP_EN[t]
-    if t.lower() in SP_EN: return SP_EN[t.lower()]
-    if CHORD_RE.match(t): return t
-
-    resp=input(c(
+class ChordTranslator:
+    """Traduce acordes ES ➜ EN durante UNA conversión (nada de estado global,
+    así dos conversiones a la vez no se pisan). Sin `ask`, un acorde que no
+    conoce se deja tal cual y se anota en `unknown`; con `ask(tok, line_no)`
+    se pregunta y la respuesta se recuerda en `user_map`."""
+
+    def __init__(self, user_map: Optional[Dict[str,str]] = None,
+                 ask: Optional[Callable[[str,int],str]] = None):
+        self.user_map = {} if user_map is None else user_map
+        self.ask = ask
+        self.unknown: List[str] = []
+
+    def __call__(self, tok: str, line_no: int = 0) -> str:
+        if not tok: return tok
+        t = clean_chord(tok)
+        if '/' in t:
+            left, right = t.split('/', 1)
+            return self(left, line_no) + '/' + self(right, line_no)
+        if t in self.user_map: return self.user_map[t]
+        if t in SP_EN:    return SP_EN[t]
+        if t.lower() in SP_EN: return SP_EN[t.lower()]
+        if CHORD_RE.match(t): return t
+        if self.ask is None:
+            self.unknown.append(tok)
+            return t
+        self.user_map[t] = self.ask(tok, line_no) or t
+        return self.user_map[t]
+
+def ask_chord(tok:str,line_no:int)->str:
+    return input(c(
         f"🤔  No conozco el acorde '{tok}' (línea {line_no}). "
         "¿Con qué lo sustituyo? (ENTER = dejar tal cual) ➜ ",YELL)).strip()
-    USER_MAP[t]=resp or t
-    return USER_MAP[t]
+
+# El CLI es interactivo y de un solo hilo: recuerda lo aprendido en USER_MAP
+translate = ChordTranslator(USER_MAP, ask_chord)
 
 def is_chord_line(line:str)->bool:
     tokens=re.findall(r"\S+",line.expandtabs(8))
@@ -144,83 +169,13 @@ def mark_chorus(text:str)->str:
     return "\n".join(marked)
 
 # ───────── Procesamiento LaTeX ───────── #
-def latex_to_chordpro(content: str) -> Tuple[str, str, str, str]:
-    body = content
-    
-    # Extraer metadatos
-    transpose_match = re.search(r'\\transpose{([^}]+)}', body)
-    transpose_val = transpose_match.group(1) if transpose_match else ""
-    body = re.sub(r'\\transpose{.*?}\n?', '', body)
-
-    capo_match = re.search(r'\\capo{([^}]+)}', body)
-    capo_val = capo_match.group(1) if capo_match else ""
-    body = re.sub(r'\\capo{.*?}\n?', '', body)
-
-    musica_match = re.search(r'm=\{([^}]+)\}', body)
-    musica_val = musica_match.group(1) if musica_match else ""
-
-    # \ifchorded ... \else ... \fi -> solo nos quedamos con el bloque chorded
-    body = re.sub(r'\\ifchorded(.*?)\\else.*?\\fi', r'\1', body, flags=re.DOTALL)
-    body = re.sub(r'\\ifchorded(.*?)\\fi', r'\1', body, flags=re.DOTALL)
-
-    # Limpieza inicial básica
-    body = re.sub(r'\\beginsong{.*?}(?:\[.*?\])?\n?', '', body)
-    body = re.sub(r'\\endsong\n?', '', body)
-    body = re.sub(r'(?m)^%.*$', '', body) # Comentarios
-    body = re.sub(r'\{\\nolyrics\s+(.*?)\}', r'\1', body)
-    body = body.replace('\\lrep', '').replace('\\rrep', '').replace('\\brk', '')
-    body = re.sub(r'\\replay(?:\[.*?\])?', '', body)
-    body = re.sub(r'\\renewcommand\{.*?\}(?:\[\d+\])?\{.*?\}', '', body)
-    body = re.sub(r'\{\^(.*?)\}', r'^\1', body)
-
-    # Acordes múltiples y opcionales: \[G (G7)] -> [G] ([G7])
-    def repl_chord(match):
-        raw_chords = match.group(1).split()
-        res = []
-        for ch in raw_chords:
-            ch_clean = clean_chord(ch)
-            tr = translate(ch_clean, 0)
-            if ch.startswith('(') and ch.endswith(')'): res.append(f"([{tr}])")
-            else: res.append(f"[{tr}]")
-        return " ".join(res)
-    body = re.sub(r'\\\[(.*?)\]', repl_chord, body)
-    
-    # Memoria de Acordes (^)
-    memorized_chords = []; mem_pointer = 0; current_memorizing = False
-    new_body = []
-    for line in body.splitlines():
-        if '\\beginverse' in line or '\\beginchorus' in line:
-            mem_pointer = 0
-        if '\\memorize' in line:
-            memorized_chords = []; current_memorizing = True
-            line = re.sub(r'\\memorize(?:\[.*?\])?', '', line)
-        if current_memorizing:
-            # Extraemos lo que hay entre [ ] para guardarlo en la secuencia
-            chords_in_line = re.findall(r'\[(.*?)\]', line)
-            memorized_chords.extend(chords_in_line)
-        if '\\endchorus' in line or '\\endverse' in line:
-            current_memorizing = False
-        while '^' in line:
-            if mem_pointer < len(memorized_chords):
-                chord = memorized_chords[mem_pointer]
-                line = line.replace('^', f'[{chord}]', 1)
-                mem_pointer += 1
-            else: line = line.replace('^', '', 1)
-        new_body.append(line)
-        
-    body = "\n".join(new_body)
-    body = body.replace('\\beginchorus', '{soc}').replace('\\endchorus', '{eoc}')
-    body = re.sub(r'\\beginverse\*?', '', body).replace('\\endverse', '')
-    body = re.sub(r'\\echo\{(.*?)\}', r'(\1)', body)
-    body = re.sub(r'\\rep\{(.*?)\}', r'(x\1)', body)
-    
-    lines = [line.strip() for line in body.splitlines()]
-    clean_lines = []
-    for line in lines:
-        if line == "" and (not clean_lines or clean_lines[-1] == ""): continue
-        clean_lines.append(line)
-        
-    return "\n".join(clean_lines).strip(), transpose_val, capo_val, musica_val
+def latex_to_chordpro(content: str, translator: Optional[ChordTranslator] = None
+                      ) -> Tuple[str, str, str, str]:
+    """(cuerpo, transpose, capo, música) de un .tex del paquete songs. El
+    lexer de una pasada vive en latex_songs.py; cada acorde pasa por
+    `translator` (por defecto, el interactivo de la sesión)."""
+    song = latex_songs.convert(content, translator or translate)
+    return song.body, song.transpose, song.capo, song.musica
 
 def procesar_archivo_latex(tex_file: Path, base: Path, processed_dir: Path):
     content = tex_file.read_text(encoding="utf-8")
@@ -273,9 +228,9 @@ def procesar_archivo_latex(tex_file: Path, base: Path, processed_dir: Path):
     except Exception: pass
 
 # ───────── Miscelánea ───────── #
-def normalize_key(k:str)->str:
+def normalize_key(k:str, translator:Optional[ChordTranslator]=None)->str:
     if not k.strip(): return ""
-    t=translate(k.strip(),0); return t[0].upper()+t[1:]
+    t=(translator or translate)(k.strip(),0); return t[0].upper()+t[1:]
 
 def next_song_number(folder:Path)->int:
     maxn=0
@@ -234,7 +234,8 @@ CLI mega-friendly para convertir tabs ES ➜ ChordPro
 import os, re, sys, random, subprocess
 from pathlib import Path
 from typing import List, Tuple, Dict
-from PIL import ImageFont
+
+import font_metrics as fm  # anchos de fuente.ttf sin cargar la fuente (Pillow opcional)
 
 # ---------- Métrica por píxeles (Calibri) ---------- #
 _PIX_FONT = None
@@ -255,13 +256,13 @@ def ___pix_get_font():
     except Exception:
         size = 14
     try:
-        _PIX_FONT = ImageFont.truetype("fuente.ttf", size)
+        _PIX_FONT = fm.get_metrics(size)
     except Exception as e:
         try:
-            warn(f"No pude cargar 'fuente.ttf' (tamaño {size}). Uso fuente por defecto. Detalle: {e}")
+            warn(f"No pude medir 'fuente.ttf' (tamaño {size}). Uso un ancho fijo. Detalle: {e}")
         except Exception:
-            print(f"Advertencia: no pude cargar 'fuente.ttf' (tamaño {size}). {e}", file=sys.stderr)
-        _PIX_FONT = ImageFont.load_default()
+            print(f"Advertencia: no pude medir 'fuente.ttf' (tamaño {size}). {e}", file=sys.stderr)
+        _PIX_FONT = object()  # sin getlength → _pix_get_length usa len*8
     return _PIX_FONT
 
 def _pix_get_length(font, text:str)->float:
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del arnés de benchmarks (benchmark.py): medición sobre corpus
+sintético y comparación con la línea base. No mide nada en serio (n pequeño, 1 repetición).
+
+Corre sin dependencias:  python scripts/test_benchmark.py
+(También vale con pytest:  pytest scripts/test_benchmark.py)
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import benchmark as bm  # noqa: E402
+
+
+def test_build_json_bench_on_synthetic_corpus():
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_dir = Path(tmp) / "build_json-20"
+        bench_dir.mkdir()
+        spec = bm.scaled_benches([20])["build_json@20"](bench_dir)
+        res = bm.measure(spec, repeat=1)
+        assert res["n"] == 20 and res["median_ms"] > 0 and res["peak_kb"] > 0
+        out = list((bench_dir / "songs").glob("songs-v*.json"))
+        songs = json.loads(next(p for p in out if ".search." not in p.name).read_text(encoding="utf-8"))
+        assert sum(len(c["songs"]) for c in songs.values()) == 20
+
+
+def test_compare_flags_regressions():
+    base = {"results": {"x": {"median_ms": 100.0, "peak_kb": 1000.0},
+                        "y": {"median_ms": 100.0, "peak_kb": 1000.0}}}
+    cur = {"results": {"x": {"median_ms": 110.0, "peak_kb": 1000.0},
+                       "y": {"median_ms": 100.0, "peak_kb": 1300.0},
+                       "nuevo": {"median_ms": 1.0, "peak_kb": 1.0}}}
+    rows = {r["name"]: r for r in bm.compare(cur, base, threshold=0.15)}
+    assert set(rows) == {"x", "y"}
+    assert not rows["x"]["regression"] and rows["x"]["time_delta"] == 0.1
+    assert rows["y"]["regression"]
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
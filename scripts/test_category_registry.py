@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del registro en memoria de categorías/slots (admin/category_registry.py).
+
+Corre sin dependencias:  python scripts/test_category_registry.py
+(También vale con pytest:  pytest scripts/test_category_registry.py)
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+import category_registry as cr  # noqa: E402
+
+
+def _tree(tmp: Path) -> Path:
+    songs = tmp / "songs"
+    for folder, names in {
+        "A. Entrada": ["01.ven.cho", "02.dios.cho", "04.hoy.cho", "04.hoy.docx"],
+        "I. Comunión": [],
+    }.items():
+        (songs / folder).mkdir(parents=True)
+        for n in names:
+            (songs / folder / n).write_text("x", encoding="utf-8")
+    (songs / "indice.json").write_text(json.dumps({
+        "entrada": {"categoryTitle": "A. Entrada", "order": 1},
+        "comunion": {"categoryTitle": "I. Comunión", "order": 0},
+    }), encoding="utf-8")
+    return songs
+
+
+def test_lowest_free():
+    assert cr.lowest_free(0) == 1
+    assert cr.lowest_free(0b10110) == 3
+    assert cr.lowest_free(0b11110) == 5
+    assert cr.lowest_free(0b10110, start=4) == 5
+
+
+def test_categories_and_slots():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        reg = cr.CategoryRegistry(songs, songs / "indice.json")
+        assert [c["letter"] for c in reg.categories()] == ["I", "A"]   # por order
+        assert reg.get("a")["indice_key"] == "entrada"
+        a = "A. Entrada"
+        assert reg.first_free(a) == 3
+        assert reg.next_number(a) == 5
+        assert reg.next_number("I. Comunión") == 1
+        assert reg.preferred(a, 7) == 7 and reg.preferred(a, 2) == 3
+
+
+def test_write_notifications():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        reg = cr.CategoryRegistry(songs, songs / "indice.json")
+        a = songs / "A. Entrada"
+        reg.file_written(a / "03.nueva.cho")
+        assert reg.first_free(a.name) == 5
+        reg.file_removed(a / "04.hoy.cho")          # queda 04.hoy.docx
+        assert not reg.is_free(a.name, 4)
+        reg.file_removed(a / "04.hoy.docx")
+        assert reg.is_free(a.name, 4)
+        assert reg.next_number(a.name) == 4
+
+
+def test_revalidate_detects_external_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        reg = cr.CategoryRegistry(songs, songs / "indice.json")
+        a = songs / "A. Entrada"
+        assert reg.revalidate() is False
+        (a / "03.fuera.cho").write_text("x", encoding="utf-8")
+        st = a.stat()
+        os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert reg.revalidate() is True
+        assert "03.fuera.cho" in reg.files(a.name)
+        (songs / "B. Perdón").mkdir()
+        st = songs.stat()
+        os.utime(songs, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        reg.revalidate()
+        assert reg.get("B")["folder"] == "B. Perdón"
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
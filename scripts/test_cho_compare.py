@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del motor de comparación de .cho (cho_compare.py).
+
+Corre sin dependencias:  python scripts/test_cho_compare.py
+(También vale con pytest:  pytest scripts/test_cho_compare.py)
+"""
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import cho_compare as cc  # noqa: E402
+
+SONG = (
+    "{title: Ven a Celebrar}\n"
+    "{key: G}\n"
+    "\n"
+    "{soc}\n"
+    "[G]Ven a cele[D]brar la [C]fiesta\n"
+    "[G]todos juntos [D]hoy\n"
+    "{eoc}\n"
+    "\n"
+    "[Em]Estrofa [C]primera\n"
+)
+
+
+def test_normalize_and_split():
+    song = cc.normalize("\r\n\n" + SONG.replace("\n", "  \r\n") + "{youtube: https://yt/x}\n\n\n")
+    assert song.text == cc.normalize(SONG).text
+    line = cc.split_line("[G]Ven a cele[D]brar")
+    assert line.lyric == "Ven a celebrar" and line.chords == ((0, "G"), (10, "D"))
+    assert cc.split_line("{soc}").directive
+
+
+def test_identical_and_chord_moved():
+    same = cc.compare(SONG, SONG)
+    assert same["similarity"] == 1.0 and same["chordPlacement"] == 1.0 and same["lyricDiff"] == []
+    moved = cc.compare(SONG, SONG.replace("cele[D]brar", "[D]celebrar"))
+    assert moved["lyricSimilarity"] == 1.0 and moved["lyricDiff"] == []
+    assert moved["chordsTotal"] == 7 and moved["chordsPlaced"] == 6
+    assert 0.9 < moved["similarity"] < 1.0
+
+
+def test_lyric_diff_and_reordered_lines():
+    other = SONG.replace("todos juntos", "todos unidos")
+    r = cc.compare(SONG, other)
+    assert r["lyricDiff"] == ["@@ -2 +2 @@", "-todos juntos hoy", "+todos unidos hoy"]
+    # Una línea de más al principio no descoloca el emparejamiento del resto
+    shifted = cc.compare(SONG, SONG.replace("{soc}\n", "{soc}\n[A]Intro nueva\n"))
+    assert shifted["chordsPlaced"] == 7 and shifted["lyricSimilarity"] > 0.85
+
+
+def test_reject_returns_bound():
+    r = cc.compare(SONG, "{title: Otra cosa}\n[C]nada que ver\n", reject=0.6)
+    assert r["bounded"] and r["similarity"] < 0.6 and r["lyricSimilarity"] is None
+    exact = cc.compare(SONG, "{title: Otra cosa}\n[C]nada que ver\n")
+    assert not exact["bounded"] and exact["similarity"] <= r["similarity"]
+
+
+def test_compare_many_parallel_and_report():
+    pairs = [(SONG, SONG), (SONG, SONG.replace("fiesta", "fiestas")), (SONG, "x")]
+    rows = cc.compare_many(pairs)
+    assert cc.compare_many(pairs, workers=2) == rows
+    rows = [{"index": i, "title": f"t{i}", "status": "compared", **r} for i, r in enumerate(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cc.write_report(rows, str(Path(tmp) / "r.json"))
+        cc.write_report(rows, str(Path(tmp) / "r.csv"))
+        assert json.loads((Path(tmp) / "r.json").read_text(encoding="utf-8"))[1]["lyricDiff"]
+        with open(Path(tmp) / "r.csv", encoding="utf-8", newline="") as f:
+            table = list(csv.DictReader(f))
+        assert [r["similarity"] for r in table][0] == "1.0"
+        assert table[1]["lyricDiffLines"] == "3"
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
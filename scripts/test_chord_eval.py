@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la evaluación de colocación de acordes (chord_eval.py).
+
+Corre sin dependencias:  python scripts/test_chord_eval.py
+(También vale con pytest:  pytest scripts/test_chord_eval.py)
+"""
+import csv
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import cho_compare as cc  # noqa: E402
+import chord_eval as ce  # noqa: E402
+
+CURATED = (
+    "{title: Herederos}\n"
+    "{key: C}\n"
+    "\n"
+    "{soc}\n"
+    "VE[C]NID BEN[F]DITOS DE MI [C]PADRE\n"
+    "HERE[Am]DAD EL REINO DE SU A[G]MOR\n"
+    "{eoc}\n"
+)
+
+
+def test_identical_is_exact():
+    r = ce.evaluate(CURATED, CURATED)
+    assert r["chordsCurated"] == r["matched"] == r["exact"] == 5
+    assert r["exactRate"] == 1.0 and r["maxAbsError"] == 0 and r["missing"] == r["extra"] == 0
+    tuples = ce.chord_tuples(cc.normalize(CURATED))
+    assert tuples[0] == ("VENID BENDITOS DE MI PADRE", "C", 2)
+
+
+def test_offsets_missing_extra_and_renamed():
+    gen = (
+        "{comment: TO DO}\n{title: Herederos}\n\n"
+        "[C]Venid ben[F]ditos de mi [C]padre [G]\n"     # C dos a la izq., G de más
+        "HERE[A]DAD EL REINO DE SU\n"                   # Am → A, G falta
+    )
+    r = ce.evaluate(CURATED, gen)
+    assert r["offsetErrors"] == [-2, 0, 0, 0]
+    assert (r["renamed"], r["missing"], r["extra"]) == (1, 1, 1)
+    assert r["exact"] == 3 and r["near"] == 4 and r["exactRate"] == round(3 / 6, 4)
+    # La posición generada se lleva a la letra revisada aunque cambie el texto
+    line = ce.match_line(cc.split_line("Ve[C]nid ben[F]ditos"),
+                         cc.split_line("Ve[C]nid, oh ben[F]ditos"))
+    assert line == ([0, 0], 0, 0, 0)
+
+
+def test_curated_parse_cache_and_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = Path(tmp) / "songs"
+        (songs / "A. Entrada").mkdir(parents=True)
+        path = songs / "A. Entrada" / "03.herederos.cho"
+        path.write_text(CURATED, encoding="utf-8")
+        first = ce.curated_song(path)
+        assert ce.curated_song(path) is first                      # cacheado
+        path.write_text(CURATED.replace("PADRE", "PADRE!"), encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert ce.curated_song(path) is not first                  # editado → se relee
+        index = ce.CuratedIndex(songs)
+        assert index.find("Herederos") == path
+        assert index.find("Los Herederos del Reino") == path      # substring
+        assert index.find("Otra") is None
+
+
+def test_run_summary_and_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = Path(tmp) / "songs"
+        (songs / "A. Entrada").mkdir(parents=True)
+        (songs / "A. Entrada" / "03.herederos.cho").write_text(CURATED, encoding="utf-8")
+        samples = [
+            ce.Sample("latex", "a.tex", "Herederos", CURATED),
+            ce.Sample("docx", "0", "Herederos", CURATED.replace("VE[C]NID", "[C]VENID")),
+            ce.Sample("docx", "1", "Sin revisar", "{title: Sin revisar}\n[C]la\n"),
+        ]
+        index = ce.CuratedIndex(songs)
+        rows = ce.run(samples, index)
+        assert ce.run(samples, index, workers=2) == rows
+        assert [r["status"] for r in rows] == ["evaluated", "evaluated", "missing"]
+        summary = ce.summarize(rows)
+        assert summary["latex"]["exactRate"] == 1.0
+        assert summary["docx"]["songs"] == 1 and summary["docx"]["histogram"]["2"] == 1
+        report = Path(tmp) / "r.csv"
+        cc.write_report(rows, str(report), fields=ce.CSV_FIELDS)
+        with open(report, encoding="utf-8", newline="") as f:
+            table = list(csv.DictReader(f))
+        assert table[1]["maxAbsError"] == "2" and "offsetErrors" not in table[0]
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
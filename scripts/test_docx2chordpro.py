@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la colocación de acordes de docx2chordpro.py (anclas y
+búsqueda binaria por píxeles).
+
+Corre sin dependencias:  python scripts/test_docx2chordpro.py
+(También vale con pytest:  pytest scripts/test_docx2chordpro.py)
+"""
+import random
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import docx2chordpro as d2c  # noqa: E402
+
+
+def _linear(anchors, px, x, forbidden=()):
+    """La búsqueda de antes: min() sobre las anclas libres."""
+    avail = [k for k, c in enumerate(anchors) if c not in forbidden] or range(len(anchors))
+    return anchors[min(avail, key=lambda k: abs(px[k] - x))]
+
+
+def test_nearest_anchor_matches_linear_min():
+    rng = random.Random(7)
+    for _ in range(3000):
+        n = rng.randint(1, 12)
+        anchors = sorted(rng.sample(range(40), n))
+        px, cur = [], 0.0
+        for _ in anchors:
+            cur += rng.choice([0.0, 0.0, 4.0, 6.5])        # anchos 0 → empates
+            px.append(cur)
+        x = rng.choice([rng.uniform(-5, cur + 5), rng.choice(px) + rng.choice([-2.0, 0.0, 2.0])])
+        forbidden = set(rng.sample(anchors, rng.randint(0, n)))
+        assert d2c.nearest_anchor(anchors, px, x) == _linear(anchors, px, x)
+        assert d2c.nearest_anchor(anchors, px, x, forbidden) == _linear(anchors, px, x, forbidden)
+
+
+def test_anchors_and_injection():
+    assert d2c.syllable_starts_in_word("benditos") == (0, 3, 5)
+    assert d2c.syllable_starts_in_word("benditos") is d2c.syllable_starts_in_word("benditos")
+    text = "VENID BENDITOS"
+    pos = [10.0 * i for i in range(len(text) + 1)]
+    anchors = d2c.line_anchors(text, pos)
+    assert anchors.word == (0, 6, 14) and anchors.syl == (0, 2, 6, 9, 11, 14)
+    assert anchors.syl_px == (0.0, 20.0, 60.0, 90.0, 110.0, 140.0)
+    chords = [(21.0, "DO"), (60.0, "FA")]
+    assert d2c.inject_chords(text, pos, chords) == "VE[C]NID [F]BENDITOS"
+    assert d2c.inject_chords(text, pos, chords, anchors=anchors, word_pref_px=30.0) == "[C]VENID [F]BENDITOS"
+    # Dos acordes en la misma ancla: se apilan si están cerca, si no se reparten
+    assert d2c.inject_chords(text, pos, [(60.0, "DO"), (65.0, "FA")]) == "VENID [C][F]BENDITOS"
+    assert d2c.inject_chords(text, pos, [(60.0, "DO"), (65.0, "FA")], stack_px=2.0) == "VENID [C]BEN[F]DITOS"
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del barrido de parámetros de colocación (docx_sweep.py) sobre un
+docx sintético (synth_corpus.py).
+
+Corre sin dependencias:  python scripts/test_docx_sweep.py
+(También vale con pytest:  pytest scripts/test_docx_sweep.py)
+"""
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import chord_eval as ce  # noqa: E402
+import docx2chordpro as d2c  # noqa: E402
+import docx_sweep as sw  # noqa: E402
+import synth_corpus as sc  # noqa: E402
+
+
+def test_parse_values_and_grid():
+    assert sw.parse_values("10:30:10") == (10.0, 20.0, 30.0)
+    assert sw.parse_values("0.5,0.6") == (0.5, 0.6)
+    assert len(sw.grid((1, 2), (3,), (0.5, 0.6))) == 4
+    assert sw.current_setting() == (d2c.CHORD_STACK_THRESHOLD_PX, d2c.WORD_PREFERENCE_PX,
+                                    d2c.CHORD_LINE_RATIO)
+
+
+def test_assemble_from_geometry_matches_convert_song():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = sc.write_docx_corpus(Path(tmp) / sc.DOCX_NAME, 5, seed=4)
+        for song in d2c.split_into_songs(d2c.load_paragraphs(path)):
+            geom = d2c.warm_geometry(d2c.song_geometry(song))
+            again = pickle.loads(pickle.dumps(geom))         # como lo recibe un worker
+            assert d2c.assemble_song(again) == d2c.convert_song(song)
+
+
+def test_sweep_scores_against_curated():
+    with tempfile.TemporaryDirectory() as tmp:
+        docx = sc.write_docx_corpus(Path(tmp) / sc.DOCX_NAME, 6, seed=1)
+        songs_dir = Path(tmp) / "songs" / "A. Entrada"
+        songs_dir.mkdir(parents=True)
+        # Los .cho "revisados" son la conversión con los valores actuales
+        for i, song in enumerate(d2c.split_into_songs(d2c.load_paragraphs(docx))[:4]):
+            conv = d2c.convert_song(song)
+            (songs_dir / f"{i:02d}.{conv['slug']}.cho").write_text(d2c.render_cho(conv), encoding="utf-8")
+        corpus = sw.load_corpus(docx, ce.CuratedIndex(songs_dir.parent))
+        assert len(corpus) == 4
+        settings = [sw.current_setting(), (0.0, 0.0, 0.99)]
+        rows = sw.sweep(corpus, settings)
+        assert rows[0]["exactRate"] == 1.0 and rows[0]["songs"] == 4
+        assert rows[1]["exactRate"] < 1.0                    # casi todo pasa a ser letra
+        assert sw.sweep(corpus, settings, workers=2) == rows
+        assert sorted(rows, key=sw.rank_key)[0] is rows[0]
+
+
+def test_main_without_curated_songs_exits_early():
+    saved = sw.load_corpus
+    sw.load_corpus = lambda *a, **k: []
+    try:
+        assert sw.main(["--stack", "10", "--word-pref", "5", "--ratio", "0.5"]) == 1
+    finally:
+        sw.load_corpus = saved
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del cliente REST de Firebase (firebase_client.py) contra una RTDB
+de pega en local (http.server, en memoria).
+
+Corre sin dependencias:  python scripts/test_firebase_client.py
+(También vale con pytest:  pytest scripts/test_firebase_client.py)
+"""
+import gzip
+import http.server
+import json
+import sys
+import tempfile
+import threading
+import urllib.parse
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import firebase_client as fbc  # noqa: E402
+
+
+# ── RTDB de pega ────────────────────────────────────────────────────────────────
+class FakeRTDB:
+    """Árbol JSON en memoria con la API REST mínima: GET (shallow, orderBy
+    "$key" + startAt + limitToFirst), PUT, PATCH multi-ruta y DELETE.
+    `fail` es una lista de estados a devolver antes de atender de verdad."""
+
+    def __init__(self, data=None):
+        self.data = data or {}
+        self.fail = []
+        self.requests = []        # (método, ruta, query)
+        self.connections = 0
+        rtdb = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def setup(self):
+                rtdb.connections += 1
+                super().setup()
+
+            def _reply(self, status, value):
+                body = json.dumps(value).encode("utf-8")
+                self.send_response(status)
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _handle(self):
+                url = urllib.parse.urlsplit(self.path)
+                parts = [p for p in url.path[:-len(".json")].split("/") if p]
+                query = dict(urllib.parse.parse_qsl(url.query))
+                n = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(n)) if n else None
+                rtdb.requests.append((self.command, "/".join(parts), query))
+                if rtdb.fail:
+                    return self._reply(rtdb.fail.pop(0), {"error": "ocupado"})
+                if query.get("auth") != "tok":
+                    return self._reply(401, {"error": "Permission denied"})
+                self._reply(200, rtdb.apply(self.command, parts, query, body))
+
+            do_GET = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _node(self, parts, create=False):
+        node = self.data
+        for p in parts:
+            if not isinstance(node, dict) or (p not in node and not create):
+                return None
+            node = node.setdefault(p, {}) if create else node[p]
+        return node
+
+    def apply(self, method, parts, query, body):
+        parent = self._node(parts[:-1], create=method in ("PUT", "PATCH")) if parts else None
+        if method == "GET":
+            node = self._node(parts)
+            if isinstance(node, dict) and query.get("shallow") == "true":
+                return {k: True for k in node}
+            if isinstance(node, dict) and query.get("orderBy") == '"$key"':
+                keys = sorted(node)
+                if "startAt" in query:
+                    keys = [k for k in keys if k >= json.loads(query["startAt"])]
+                keys = keys[:int(query.get("limitToFirst", len(keys)))]
+                return {k: node[k] for k in keys}
+            return node
+        if method == "PUT":
+            parent[parts[-1]] = body
+            return body
+        if method == "PATCH":
+            node = parent.setdefault(parts[-1], {})
+            for k, v in body.items():
+                if v is None:
+                    node.pop(k, None)
+                else:
+                    node[k] = v
+            return body
+        if method == "DELETE" and isinstance(parent, dict):
+            parent.pop(parts[-1], None)
+        return None
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _client(rtdb, **kw):
+    kw.setdefault("backoff", 0.01)
+    return fbc.FirebaseClient(rtdb.url, "tok", **kw)
+
+
+# ── tests ──────────────────────────────────────────────────────────────────────
+def test_get_put_reuse_connection_and_gzip():
+    rtdb = FakeRTDB({"songs": {"contentHash": "abc"}})
+    try:
+        fb = _client(rtdb)
+        assert fb.get("songs/contentHash") == "abc"
+        fb.put("songs/updatedAt", 123)
+        assert fb.get("songs/updatedAt") == 123 and rtdb.data["songs"]["updatedAt"] == 123
+        assert rtdb.connections == 1                      # keep-alive: una sola conexión
+        assert fb.get("no/existe") is None
+    finally:
+        rtdb.close()
+
+
+def test_retries_on_5xx_and_rewinds_file_body():
+    rtdb = FakeRTDB()
+    try:
+        fb = _client(rtdb)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "data.json"
+            path.write_text(json.dumps({"entrada": {"songs": ["ñ" * 1000]}}), encoding="utf-8")
+            rtdb.fail = [503, 500]
+            assert fb.put_file("songs/data", str(path)) == path.stat().st_size
+        assert rtdb.data["songs"]["data"]["entrada"]["songs"][0] == "ñ" * 1000
+        assert [m for m, _, _ in rtdb.requests] == ["PUT", "PUT", "PUT"]
+        rtdb.fail = [404]                                 # no reintentable
+        try:
+            fb.get("songs")
+        except fbc.FirebaseError as e:
+            assert e.status == 404
+        else:
+            raise AssertionError("debía fallar")
+        rtdb.fail = [503] * 3
+        try:
+            _client(rtdb, retries=2).get("songs")
+        except fbc.FirebaseError as e:
+            assert e.status == 503 and rtdb.fail == []
+        else:
+            raise AssertionError("debía agotar los reintentos")
+    finally:
+        rtdb.close()
+
+
+def test_shallow_paged_reads_and_delete_many():
+    eds = {f"-N{i:03d}": {"filename": f"{i:02d}.cho"} for i in range(7)}
+    rtdb = FakeRTDB({"songs": {"ediciones": dict(eds)}})
+    try:
+        fb = _client(rtdb)
+        assert fb.keys("songs/ediciones") == sorted(eds)
+        assert fb.get_children("songs/ediciones", page_size=3) == eds
+        pages = [q for m, _, q in rtdb.requests if q.get("orderBy")]
+        assert len(pages) == 3                            # 3 + 3 + 1
+        fb.delete_many("songs/ediciones", list(eds)[:5], chunk=2)
+        assert sorted(rtdb.data["songs"]["ediciones"]) == ["-N005", "-N006"]
+        assert [m for m, _, _ in rtdb.requests].count("PATCH") == 3
+    finally:
+        rtdb.close()
+
+
+def test_auth_rules():
+    assert fbc.auth_headers_and_params("Bearer x") == ({"Authorization": "Bearer x"}, {})
+    assert fbc.auth_headers_and_params("tok") == ({}, {"auth": "tok"})
+    assert fbc.auth_headers_and_params("AIzaXYZ") == ({}, {})      # API key: no vale
+    calls = []
+    bearer = lambda: calls.append(1) or "Bearer sa"
+    assert fbc.auth_headers_and_params("", bearer) == ({"Authorization": "Bearer sa"}, {})
+    assert calls == [1]
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la métrica de fuente.ttf (font_metrics.py): la tabla precalculada
+mide igual que Pillow y los importadores funcionan sin Pillow.
+
+Corre sin dependencias:  python scripts/test_font_metrics.py
+(También vale con pytest:  pytest scripts/test_font_metrics.py)
+"""
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import font_metrics as fm  # noqa: E402
+
+SAMPLES = ["VENID BENDITOS DE MI PADRE", "FA", "  DO-mim  SOL7", "¿Por qué lloras? «Él» – ﬁn…",
+           "AVATAR Ya Ťé", "🡨 x"]
+
+
+def test_table_matches_pillow():
+    table = fm.load_table()
+    assert table is not None and table["fontSize"] == fm.FONT_PATH.stat().st_size
+    if not fm.pillow_available():
+        return
+    for size in (8, 14, 16, 21, 64):
+        t, p = fm._from_table(table, size), fm.PillowMetrics(size)
+        for s in SAMPLES:
+            assert t.getlength(s) == p.getlength(s), (size, s)
+    assert isinstance(fm.get_metrics(16), fm.TableMetrics)
+    assert isinstance(fm.get_metrics(99), fm.PillowMetrics)          # fuera de la tabla
+
+
+def test_generate_and_write_roundtrip():
+    if not fm.pillow_available():
+        return
+    table = fm.generate_table(sizes=(16,), chars="FAV o")
+    assert table["sizes"]["16"]["kerning"].get("FA") == -1           # 1/64 px
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "m.json"
+        fm.write_table(table, path)
+        assert fm.load_table(path) == table
+        assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_importers_without_pillow():
+    code = textwrap.dedent(f"""
+        import sys
+        sys.modules["PIL"] = None                      # como si no estuviera instalado
+        sys.path.insert(0, {str(SCRIPTS_DIR)!r})
+        import tempfile
+        from pathlib import Path
+        import docx2chordpro as d2c, font_metrics as fm, synth_corpus as sc
+        assert not fm.pillow_available()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = sc.write_docx_corpus(Path(tmp) / sc.DOCX_NAME, 3)
+            songs = d2c.split_into_songs(d2c.load_paragraphs(path))
+            print(d2c.render_cho(d2c.convert_song(songs[0])))
+        scaled = fm.get_metrics(100)                   # sin tabla ni Pillow: escalado
+        assert abs(scaled.getlength("FA") - fm.get_metrics(64).getlength("FA") * 100 / 64) < 1e-9
+    """)
+    r = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    assert "{title:" in r.stdout and "[" in r.stdout
+    assert "escalado" in r.stderr
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
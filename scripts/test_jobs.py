@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de las tareas en segundo plano del admin (admin/jobs.py).
+
+Corre sin dependencias:  python scripts/test_jobs.py
+(También vale con pytest:  pytest scripts/test_jobs.py)
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+import jobs as jb  # noqa: E402
+
+
+def _wait_done(mgr, job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    seen = 0
+    while not job.done and time.monotonic() < deadline:
+        events, _ = mgr.wait(job, seen, timeout=0.5)
+        seen += len(events)
+    assert job.done
+
+
+def test_job_progress_and_result():
+    mgr = jb.JobManager()
+
+    def fn(progress):
+        progress("paso 1", 50)
+        progress("paso 2", 100)
+        return {"ok": True, "n": 2}, 200
+
+    job = mgr.submit("demo", fn)
+    _wait_done(mgr, job)
+    d = mgr.get(job.id).to_dict()
+    assert d["status"] == jb.DONE and d["result"] == {"ok": True, "n": 2}
+    assert [e["message"] for e in d["events"]] == ["paso 1", "paso 2"]
+    assert d["progress"]["pct"] == 100
+
+
+def test_job_exception_is_error():
+    mgr = jb.JobManager()
+
+    def fn(progress):
+        raise RuntimeError("sin red")
+
+    job = mgr.submit("demo", fn)
+    _wait_done(mgr, job)
+    assert job.status == jb.ERROR and job.http_status == 500
+    assert job.result == {"ok": False, "error": "sin red"}
+
+
+def test_exclusive_jobs_run_one_at_a_time():
+    mgr = jb.JobManager()
+    running = []
+    overlap = threading.Event()
+
+    def fn(progress):
+        running.append(1)
+        if len(running) > 1:
+            overlap.set()
+        time.sleep(0.05)
+        running.pop()
+        return {"ok": True}, 200
+
+    started = [mgr.submit("git", fn, exclusive="git") for _ in range(3)]
+    for job in started:
+        _wait_done(mgr, job)
+    assert not overlap.is_set()
+
+
+def test_dedupe_joins_running_job():
+    mgr = jb.JobManager()
+    gate = threading.Event()
+
+    def fn(progress):
+        gate.wait(2)
+        return {"ok": True}, 200
+
+    first = mgr.submit("build-json", fn, dedupe=True)
+    assert mgr.submit("build-json", fn, dedupe=True) is first
+    gate.set()
+    _wait_done(mgr, first)
+    assert mgr.submit("build-json", fn, dedupe=True) is not first
+
+
+def test_cancel_is_cooperative():
+    mgr = jb.JobManager()
+
+    def fn(progress):
+        while not progress.cancelled():
+            time.sleep(0.01)
+        raise RuntimeError("Cancelado")
+
+    job = mgr.submit("build-json", fn)
+    mgr.cancel(job.id)
+    assert mgr.wait_done(job, timeout=2)
+    assert job.status == jb.CANCELLED and job.result["cancelled"] is True
+
+
+def test_cancel_while_queued_never_runs():
+    mgr = jb.JobManager()
+    gate = threading.Event()
+    pushed = []
+
+    def blocker(progress):
+        gate.wait(2)
+        return {"ok": True}, 200
+
+    def push(progress):
+        pushed.append(1)
+        return {"pushed": True}, 200
+
+    first = mgr.submit("git", blocker, exclusive="git")
+    queued = mgr.submit("git", push, exclusive="git")
+    assert queued.status == jb.QUEUED
+    mgr.cancel(queued.id)
+    gate.set()
+    assert mgr.wait_done(queued, timeout=2) and mgr.wait_done(first, timeout=2)
+    assert pushed == [] and queued.status == jb.CANCELLED and queued.http_status == 409
+    assert queued.result == {"ok": False, "cancelled": True}
+
+
+def test_keep_prunes_finished_jobs():
+    mgr = jb.JobManager(keep=2)
+    done = []
+    for _ in range(4):
+        job = mgr.submit("demo", lambda progress: ({"ok": True}, 200))
+        _wait_done(mgr, job)
+        done.append(job)
+    mgr.submit("demo", lambda progress: ({"ok": True}, 200))
+    assert mgr.get(done[0].id) is None and mgr.get(done[-1].id) is not None
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
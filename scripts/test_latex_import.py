@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del escaneo de .tex del admin (admin/latex_import.py).
+
+Corre sin dependencias:  python scripts/test_latex_import.py
+(También vale con pytest:  pytest scripts/test_latex_import.py)
+"""
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+import latex_import as lx  # noqa: E402
+import synth_corpus as sc  # noqa: E402
+import tab2chordpro as t2c  # noqa: E402
+
+
+def _touch(path: Path, text: str) -> None:
+    st = path.stat()
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_scan_reparses_only_changed_files():
+    saved = (lx.INPUT_DIR, lx.REPO_DIR, lx.parse_latex_song)
+    calls = []
+
+    def counting(path):
+        calls.append(path.name)
+        return saved[2](path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        paths = sc.write_tex_corpus(root / "input", 5)
+        lx.INPUT_DIR, lx.REPO_DIR, lx.parse_latex_song = root / "input", root, counting
+        lx.clear_parse_cache()
+        try:
+            files = lx.list_tex_files()
+            first = lx.scan_latex_files(include_parsed=True, files=files)
+            assert len(first) == len(calls) == 5 and all(it["body"] for it in first)
+            assert lx.scan_latex_files(include_parsed=True) == first and len(calls) == 5
+
+            _touch(paths[0], paths[0].read_text(encoding="utf-8").replace(
+                r"\beginsong{", r"\beginsong{Nuevo "))
+            paths[1].unlink()
+            assert lx.files_snapshot(lx.list_tex_files()) != lx.files_snapshot(files)
+            again = lx.scan_latex_files()
+            assert calls[5:] == [paths[0].name] and len(again) == 4
+            assert any(it["title"].startswith("Nuevo ") for it in again)
+            assert str(paths[1]) not in lx._parse_cache
+
+            # preview/import reutilizan el parseo del escaneo (con el cuerpo)
+            parsed = lx.parse_latex_cached(paths[2])
+            assert parsed is lx.parse_latex_cached(paths[2]) and parsed["body"]
+            assert len(calls) == 6
+        finally:
+            lx.INPUT_DIR, lx.REPO_DIR, lx.parse_latex_song = saved
+            lx.clear_parse_cache()
+
+
+BOOK = r"""\documentclass{book}
+\usepackage[chorded]{songs}
+\begin{document}
+\begin{songs}{}
+\songchapter{Entrada}
+\beginsong{Vienen con alegría}[by={Popular}]
+\beginverse
+\[G]Vienen con a\[D]legría
+\endverse
+\endsong
+% \beginsong{Comentada} no cuenta
+\beginsong{Juntos cantando}
+\beginverse
+\[la]Juntos \[mi]cantando
+\endverse
+\endsong
+\section*{Comunión}
+\beginsong{Pan de vida} \beginverse
+\[C]Pan de \[G]vida
+\endverse \endsong
+\end{songs}
+\end{document}
+"""
+
+
+def test_songbook_is_split_into_songs_with_categories():
+    saved = (lx.INPUT_DIR, lx.REPO_DIR, lx.BOOK_PARALLEL_MIN)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        book = root / "input" / "cancioneros" / "libro.tex"
+        book.parent.mkdir(parents=True)
+        book.write_text(BOOK, encoding="utf-8")
+        lx.INPUT_DIR, lx.REPO_DIR = root / "input", root
+        lx.clear_parse_cache()
+        try:
+            items = lx.scan_latex_files(include_parsed=True)
+            assert [it["id"] for it in items] == ["input/cancioneros/libro.tex#%d" % i
+                                                  for i in (1, 2, 3)]
+            assert [it["title"] for it in items] == ["Vienen con alegría", "Juntos cantando",
+                                                     "Pan de vida"]
+            assert [it["category_letter"] for it in items] == ["A", "A", "I"]
+            assert items[1]["body"] == "[A]Juntos [E]cantando" and items[0]["artist"] == "Popular"
+            assert items[2]["suggested_slug"] == "pan_de_vida"
+
+            path, parsed = lx.load_tex_song(items[2]["id"])
+            assert path == book and parsed["source"].endswith("\\endsong\n")
+            for bad in ("input/cancioneros/libro.tex#4", "input/cancioneros/libro.tex#0",
+                        "input/cancioneros/libro.tex#x"):
+                try:
+                    lx.load_tex_song(bad)
+                    assert False, bad
+                except (ValueError, FileNotFoundError):
+                    pass
+
+            # En paralelo (varios procesos) sale exactamente lo mismo
+            lx.BOOK_PARALLEL_MIN = 2
+            assert lx.parse_latex_file(book, workers=2) == lx.parse_latex_file(book, workers=1) \
+                == list(lx.parse_latex_file_cached(book))
+        finally:
+            lx.INPUT_DIR, lx.REPO_DIR, lx.BOOK_PARALLEL_MIN = saved
+            lx.clear_parse_cache()
+
+
+def test_songbook_imported_over_several_batches():
+    saved = (lx.INPUT_DIR, lx.REPO_DIR, lx.PROCESSED_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        book = root / "input" / "cancioneros" / "libro.tex"
+        book.parent.mkdir(parents=True)
+        book.write_text(BOOK, encoding="utf-8")
+        lx.INPUT_DIR, lx.REPO_DIR = root / "input", root
+        lx.PROCESSED_DIR = lx.INPUT_DIR / "processed"
+        lx.clear_parse_cache()
+        try:
+            ids = [it["id"] for it in lx.scan_latex_files()]
+            # Primera tanda: dos canciones; solo queda la tercera en la lista
+            for rel in ids[:2]:
+                assert lx.mark_imported(*lx.load_tex_song(rel))[1] == 3
+            assert [it["id"] for it in lx.scan_latex_files()] == ids[2:]
+            # Si el .tex cambia el título de una ya importada, vuelve a salir
+            _touch(book, BOOK.replace("Juntos cantando", "Juntos caminando"))
+            assert [it["title"] for it in lx.scan_latex_files()] == ["Juntos caminando",
+                                                                     "Pan de vida"]
+            _touch(book, BOOK)
+            # Segunda tanda: con la última el cancionero está completo
+            assert lx.mark_imported(*lx.load_tex_song(ids[2])) == (3, 3)
+            assert lx.scan_latex_files() == []
+            lx.move_to_processed(book)
+            assert not (lx.INPUT_DIR / lx.IMPORTED_NAME).exists()
+            assert (lx.PROCESSED_DIR / "libro.tex").exists()
+        finally:
+            lx.INPUT_DIR, lx.REPO_DIR, lx.PROCESSED_DIR = saved
+            lx.clear_parse_cache()
+
+
+def test_big_songbook_parses_in_workers_from_a_thread():
+    # Como en el admin: desde un hilo que no es el principal y con otro hilo
+    # sujetando un lock mientras se lanzan los procesos
+    song = "\\beginsong{Canto %d}\n\\beginverse\n\\[re]Ale\\[la]luya %d\n\\endverse\n\\endsong\n"
+    held, release = threading.Lock(), threading.Event()
+    holder = threading.Thread(target=lambda: held.acquire() and release.wait(30), daemon=True)
+    holder.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        book = Path(tmp) / "libro.tex"
+        book.write_text("".join(song % (i, i) for i in range(lx.BOOK_PARALLEL_MIN)),
+                        encoding="utf-8")
+        out = {}
+        worker = threading.Thread(target=lambda: out.update(songs=lx.parse_latex_file(book, workers=2)))
+        worker.start()
+        worker.join(60)
+        release.set()
+        assert not worker.is_alive() and len(out["songs"]) == lx.BOOK_PARALLEL_MIN
+        assert out["songs"] == lx.parse_latex_file(book, workers=1)
+        assert out["songs"][-1]["body"] == "[D]Ale[A]luya %d" % (lx.BOOK_PARALLEL_MIN - 1)
+
+
+def test_hash_in_filename_is_not_a_song_number():
+    saved = (lx.INPUT_DIR, lx.REPO_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        tex = root / "input" / "salmos" / "salmo#23.tex"
+        tex.parent.mkdir(parents=True)
+        tex.write_text("\\beginsong{Salmo 23}\n\\beginverse\n\\[re]El Señor\n\\endverse\n\\endsong\n",
+                       encoding="utf-8")
+        lx.INPUT_DIR, lx.REPO_DIR = root / "input", root
+        lx.clear_parse_cache()
+        try:
+            assert lx.split_tex_id("input/salmos/salmo#23.tex") == ("input/salmos/salmo#23.tex", None)
+            assert lx.split_tex_id("input/libro#2.tex#7") == ("input/libro#2.tex", 7)
+            [item] = lx.scan_latex_files()
+            path, parsed = lx.load_tex_song(item["id"])
+            assert item["id"] == "input/salmos/salmo#23.tex" and path == tex
+            assert parsed["title"] == "Salmo 23"
+        finally:
+            lx.INPUT_DIR, lx.REPO_DIR = saved
+            lx.clear_parse_cache()
+
+
+def test_concurrent_parses_keep_their_own_unknown_chords():
+    # Antes los acordes desconocidos iban a una lista global compartida
+    rare = "\\beginsong{Rara}\n\\beginverse\n\\[zzz]a \\[G]b \\[qq%d]c\n\\endverse\n\\endsong\n"
+    clean = "\\beginsong{Limpia}\n\\beginverse\n\\[do]a \\[sol]b\n\\endverse\n\\endsong\n"
+    texts = [rare % i if i % 2 else clean for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        parsed = list(pool.map(lambda t: lx.parse_latex_text(t, "x"), texts))
+    for i, p in enumerate(parsed):
+        assert p["unknown_chords"] == (sorted(["zzz", "qq%d" % i]) if i % 2 else []), (i, p)
+        assert p["body"].startswith("[zzz]a [G]b" if i % 2 else "[C]a [G]b")
+    assert t2c.translate.unknown == [] and t2c.USER_MAP == {}
+
+
+def test_interactive_translator_remembers_answers():
+    asked = []
+    tr = t2c.ChordTranslator(ask=lambda tok, line: asked.append((tok, line)) or "Am7")
+    assert [tr("lam7", 3), tr("lam7", 9), tr("sol/si", 9), tr("la", 1)] == \
+        ["Am7", "Am7", "G/B", "A"]
+    assert asked == [("lam7", 3)] and tr.user_map == {"lam7": "Am7"} and tr.unknown == []
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del lexer LaTeX (paquete songs) → ChordPro (latex_songs.py).
+
+Corre sin dependencias:  python scripts/test_latex_songs.py
+(También vale con pytest:  pytest scripts/test_latex_songs.py)
+"""
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import latex_songs as ls  # noqa: E402
+
+SONG = r"""\beginsong{Magnificat \\ Proclama}[by={Hermana Glenda}, m={Popular}]
+\capo{3}
+\renewcommand{\trchordformat}[2]{\vbox{\hbox{#1}\hbox{#2}}}
+\beginverse % primera estrofa
+\ifchorded
+{\nolyrics Intro: \[Am G]}
+\else
+Intro sin acordes
+\fi
+Pro\[Am]clama mi \[F]alma, \brk la gran\[G]deza, \memorize
+\[Am]porque ha mi\[(F)]rado
+% comentario entre líneas
+\endverse
+\beginchorus
+¡Pro\[F]clama mi {al\[G]ma}! \echo{mi alma \rep{2}}
+\endchorus
+\beginverse\replay
+Él ^hace pro^ezas ^con ^su ^bra^zo \textbf{fuerte}
+\endverse
+\endsong
+"""
+
+
+def test_convert_structure_and_metadata():
+    song = ls.convert(SONG, lambda tok, line: tok.upper() if tok == "am" else tok)
+    assert (song.capo, song.transpose, song.musica) == ("3", "", "Popular")
+    assert song.body.split("\n") == [
+        "Intro: [Am] [G]",
+        "",
+        "Pro[Am]clama mi [F]alma, la gran[G]deza,",
+        "[Am]porque ha mi([F])rado",
+        "",
+        "{soc}",
+        "¡Pro[F]clama mi al[G]ma! (mi alma (x2))",
+        "{eoc}",
+        "",
+        # \memorize al final de la línea cuenta desde el principio de esa línea
+        # (5 acordes memorizados para 6 ^: el último se queda sin acorde)
+        "Él [Am]hace pro[F]ezas [G]con [Am]su [F]brazo \\textbf{fuerte}",
+    ]
+    assert song.unknown_macros == ((18, "textbf"),)
+
+
+def test_translate_gets_line_numbers_and_replay_runs_out():
+    seen = []
+    body = ls.convert("\\beginverse\\memorize\n\\[la]x\n\\endverse\n\\beginverse\n^a ^b\n\\endverse\n",
+                      lambda tok, line: seen.append((tok, line)) or tok.upper()).body
+    assert seen == [("la", 2)] and body == "[LA]x\n\n[LA]a b"
+
+
+def test_lexer_tokens_and_raw_args():
+    lex = ls.Lexer("\\rep{2} % nota\n\\[G]a^{b}\\%")
+    kinds = [(t.kind, t.value) for t in lex]
+    assert kinds == [(ls.MACRO, "rep"), (ls.BGROUP, "{"), (ls.TEXT, "2"), (ls.EGROUP, "}"),
+                     (ls.TEXT, " "), (ls.CHORD, "G"), (ls.TEXT, "a"), (ls.REPLAY, "^"),
+                     (ls.BGROUP, "{"), (ls.TEXT, "b"), (ls.EGROUP, "}"), (ls.TEXT, "%")]
+    lex = ls.Lexer("[by={a]b}, m={c}]{x{y}z}")
+    assert lex.read_optional() == "by={a]b}, m={c}" and lex.read_arg() == "x{y}z"
+
+
+def test_many_ifchorded_without_else_stay_separate():
+    # La cadena de regex anterior juntaba cada \ifchorded con el siguiente
+    # \else de todo el fichero (y tardaba O(n²) en un cancionero grande).
+    block = "\\beginverse\n\\ifchorded\n\\[G]intro\n\\fi\nletra\n\\endverse\n"
+    body = ls.convert(block * 500 + "\\ifchorded\nA\n\\else\nB\n\\fi\n").body
+    assert body.count("[G]intro\n\nletra") == 500 and body.endswith("\nA")
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
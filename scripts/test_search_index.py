@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del índice de búsqueda full-text (search_index.py).
+
+Corre sin dependencias:  python scripts/test_search_index.py
+(También vale con pytest:  pytest scripts/test_search_index.py)
+"""
+import json
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import search_index as si  # noqa: E402
+
+VEN = (
+    "{title: Ven a Celebrar}\n"
+    "{artist: Alborada}\n"
+    "{key: G}\n"
+    "{tiempo: Entrada}\n"
+    "{youtube: Oficial | https://yt/abc}\n"
+    "\n"
+    "{soc}\n"
+    "[G]Ven a cele[D]brar el [Em]amor de [C]Dios\n"
+    "{eoc}\n"
+)
+PESCADOR = (
+    "{title: Pescador de Hombres}\n"
+    "{artist: Cesáreo Gabaráin}\n"
+    "\n"
+    "[D]Tú has ve[Em]nido a la [A]orilla\n"
+    "Señor, me has mirado a los ojos\n"
+)
+
+
+def _index():
+    idx = si.SearchIndex()
+    idx.update("a/ven.cho", VEN, extra={"category_folder": "A. Entrada"})
+    idx.update("i/pescador.cho", PESCADOR)
+    return idx
+
+
+# ── normalización ──────────────────────────────────────────────────────────────
+def test_fold_and_tokenize():
+    assert si.fold("Canción SEÑOR") == "cancion senor"
+    assert si.tokenize("¡Oh, Señor!") == ["oh", "senor"]
+
+
+def test_extract_fields():
+    fields, chords, lines, meta = si.extract_fields(VEN)
+    assert fields["title"] == ["ven", "a", "celebrar"]
+    assert meta == {"title": "Ven a Celebrar", "author": "Alborada"}
+    assert "entrada" in fields["meta"] and "oficial" in fields["meta"]
+    assert "yt" not in fields["meta"]            # la URL no se indexa
+    assert chords == ["G", "D", "Em", "C"]
+    assert lines == ["Ven a celebrar el amor de Dios"]
+
+
+# ── búsqueda ───────────────────────────────────────────────────────────────────
+def test_search_accent_insensitive():
+    hits = _index().search("senor")
+    assert [h["id"] for h in hits] == ["i/pescador.cho"]
+    assert hits[0]["snippet"] == "Señor, me has mirado a los ojos"
+
+
+def test_search_title_ranks_first_and_prefix():
+    idx = _index()
+    assert idx.search("celeb")[0]["id"] == "a/ven.cho"       # prefijo en la última palabra
+    assert idx.search("celeb", prefix=False) == []
+    assert idx.search("titulo:pescador")[0]["id"] == "i/pescador.cho"
+    assert idx.search("autor:alborada")[0]["category_folder"] == "A. Entrada"
+
+
+def test_search_all_terms_required():
+    assert _index().search("ven pescador") == []
+
+
+def test_search_chord_sequence():
+    idx = _index()
+    assert [h["id"] for h in idx.search("[D][Em][A]")] == ["i/pescador.cho"]
+    assert [h["id"] for h in idx.search("acordes:G-D")] == ["a/ven.cho"]
+    assert idx.search("[G][Em]") == []                        # no consecutivos
+
+
+# ── mantenimiento incremental ──────────────────────────────────────────────────
+def test_update_replaces_and_remove_cleans_postings():
+    idx = _index()
+    idx.update("a/ven.cho", VEN.replace("{title: Ven a Celebrar}", "{title: Ven a Cantar}"))
+    assert idx.search("titulo:celebrar", prefix=False) == []
+    assert idx.search("titulo:cantar")[0]["id"] == "a/ven.cho"
+    idx.remove("a/ven.cho")
+    assert "alborada" not in idx.postings["artist"]
+    assert len(idx) == 1
+
+
+def test_sync_dir():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        cat = root / "songs" / "A. Entrada"
+        cat.mkdir(parents=True)
+        (cat / "01.ven.cho").write_text(VEN, encoding="utf-8")
+        idx = si.build_index(root / "songs", root)
+        assert "songs/A. Entrada/01.ven.cho" in idx
+        assert idx.sync_dir(root / "songs", root)["updated"] == 0   # nada cambió
+        (cat / "02.pescador.cho").write_text(PESCADOR, encoding="utf-8")
+        (cat / "01.ven.cho").unlink()
+        stats = idx.sync_dir(root / "songs", root)
+        assert stats == {"updated": 1, "removed": 1, "total": 1}
+
+
+def test_roundtrip_dict():
+    idx = _index()
+    data = json.loads(json.dumps(idx.to_dict()))
+    clone = si.SearchIndex.from_dict(data)
+    for q in ("senor", "[D][Em]", "autor:alborada"):
+        assert [h["id"] for h in clone.search(q)] == [h["id"] for h in idx.search(q)]
+
+
+# ── índice precalculado para la app ───────────────────────────────────────────
+def test_build_app_index():
+    songs = {
+        "entrada": {"categoryTitle": "A. Entrada", "songs": [
+            {"title": "01. Ven a Celebrar", "author": "Alborada",
+             "content": VEN, "liturgicalTime": "Entrada | Pascua"},
+        ]},
+        "comunion": {"categoryTitle": "I. Comunión", "songs": [
+            {"title": "01. Pescador de Hombres", "author": "Cesáreo Gabaráin",
+             "content": PESCADOR},
+        ]},
+    }
+    data = si.build_app_index(songs, "songs-v1.2.json")
+    assert data["docs"] == [["entrada", 0], ["comunion", 0]]
+    assert data["postings"]["lyrics"]["senor"] == [1, 1]
+    assert data["postings"]["title"]["01"] == [0, 1, 1, 1]
+    assert data["postings"]["liturgicalTime"]["pascua"] == [0, 1]
+    assert data["lengths"][1] == [4, 2, 13, 0]
+    assert si.app_index_filename("songs-v1.2.json") == "songs-v1.2.search.json"
+    keys = [t for f in data["postings"].values() for t in f]
+    assert all(t.isascii() and t.isalnum() for t in keys)   # claves válidas en Firebase
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
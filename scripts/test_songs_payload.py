@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests de la librería de construcción de songs-vX.json (songs_payload.py).
+
+Corre sin dependencias:  python scripts/test_songs_payload.py
+(También vale con pytest:  pytest scripts/test_songs_payload.py)
+"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import songs_payload as sp  # noqa: E402
+
+VEN = (
+    "{title: Ven a Celebrar}\n"
+    "{artist: Alborada}\n"
+    "{key: G}\n"
+    "{tiempo: Entrada}\n"
+    "{youtube: Oficial | https://yt/abc}\n"
+    "{transpose: 2}\n"
+    "\n"
+    "[G]Ven a cele[D]brar\n"
+)
+
+
+def _tree(tmp: Path) -> Path:
+    songs = tmp / "songs"
+    (songs / "A. Entrada").mkdir(parents=True)
+    (songs / "B. Perdón").mkdir()
+    (songs / "A. Entrada" / "01.ven.cho").write_text(VEN, encoding="utf-8")
+    (songs / "A. Entrada" / "02.otra.cho").write_text("{title: Otra}\n[C]la", encoding="utf-8")
+    (songs / "indice.json").write_text(json.dumps({
+        "entrada": {"categoryTitle": "A. Entrada"},
+        "perdon": {"categoryTitle": "B. Perdón"},        # carpeta sin .cho
+        "salida": {"categoryTitle": "Z. Salida"},        # sin carpeta
+    }), encoding="utf-8")
+    (songs / "songs-v1.9.json").write_text("{}", encoding="utf-8")
+    return songs
+
+
+def test_song_entry():
+    e = sp.song_entry("01.ven.cho", VEN)
+    assert e["title"] == "01. Ven a Celebrar" and e["key"] == "A"
+    assert e["liturgicalTime"] == "Entrada"
+    assert "rhythm" not in e                              # vacío → no se emite
+    assert "[A]Ven a cele[E]brar" in e["content"]
+    assert e["hash"] == sp.entry_hash(e) and len(e["hash"]) == sp.ENTRY_HASH_LEN
+
+
+def test_hashes_are_stable_and_local():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        before = sp.build_songs(str(songs))["entrada"]
+        assert sp.build_songs(str(songs))["entrada"] == before        # estable
+        (songs / "A. Entrada" / "02.otra.cho").write_text("{title: Otra}\n[D]la", encoding="utf-8")
+        after = sp.build_songs(str(songs))["entrada"]
+        assert after["songs"][0]["hash"] == before["songs"][0]["hash"]
+        assert after["songs"][1]["hash"] != before["songs"][1]["hash"]
+        assert after["hash"] != before["hash"]
+        assert sp.category_summary(after)["songs"][1] == ["02.otra.cho", after["songs"][1]["hash"]]
+
+
+def test_build_songs_skips_and_logs():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        lines = []
+        payload = sp.build_songs(str(songs), log=lines.append)
+        assert list(payload) == ["entrada"]
+        assert [s["filename"] for s in payload["entrada"]["songs"]] == ["01.ven.cho", "02.otra.cho"]
+        assert any("sin archivos .cho" in ln for ln in lines)
+        assert any("No hay carpeta para 'salida'" in ln for ln in lines)
+
+
+def test_parallel_matches_serial():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        (songs / "B. Perdón" / "01.perdon.cho").write_text("{title: Perdón}\n", encoding="utf-8")
+        assert sp.build_songs(str(songs), workers=2) == sp.build_songs(str(songs))
+
+
+def test_build_with_memory_writer():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        mem = sp.MemoryWriter()
+        name, search, content_hash, changed = sp.build(str(songs), [mem])
+        assert name == "songs-v2.json"                        # 1.9 → 2
+        assert set(mem.files) == {"songs-v2.json", "songs-v2.search.json"}
+        assert json.loads(mem.files[name]) == mem.payload
+        assert list(mem.payload) == ["entrada"]
+        assert search["docs"] == [["entrada", 0], ["entrada", 1]]
+        assert not (songs / name).exists()                    # en memoria, no en disco
+        assert changed and content_hash == mem.content_hash
+
+
+def test_identical_build_is_noop():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        first = sp.build(str(songs), [sp.FileWriter(str(songs))])
+        assert first.name == "songs-v2.json" and first.changed
+        assert first.content_hash == sp.file_hash(str(songs / first.name))
+        manifest = sp.load_manifest(str(songs))
+        assert manifest["file"] == "songs-v2.json" and manifest["version"] == [2, 0]
+        assert [s for s, _ in manifest["categories"]["entrada"]["songs"]] == ["01.ven.cho", "02.otra.cho"]
+        again = sp.build(str(songs), [sp.FileWriter(str(songs))])
+        assert again == (first.name, None, first.content_hash, False)
+        assert not (songs / "songs-v2.1.json").exists()
+        (songs / "A. Entrada" / "03.nueva.cho").write_text("{title: Nueva}\n", encoding="utf-8")
+        third = sp.build(str(songs), [sp.FileWriter(str(songs))])
+        assert third.name == "songs-v2.1.json" and third.changed
+        assert sp.latest_version_file(str(songs)) == "songs-v2.1.json"
+
+
+def test_cancel_before_writing():
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = _tree(Path(tmp))
+        mem = sp.MemoryWriter()
+        before = sorted(p.name for p in songs.iterdir())
+        try:
+            sp.build(str(songs), [mem, sp.FileWriter(str(songs))], cancelled=lambda: True)
+        except sp.BuildCancelled:
+            pass
+        else:
+            raise AssertionError("debía cancelarse")
+        assert mem.files == {}
+        assert sorted(p.name for p in songs.iterdir()) == before   # ni .tmp ni .json
+
+
+# ── streaming ──────────────────────────────────────────────────────────────────
+def test_payload_stream_matches_json_dump():
+    payload = {
+        "entrada": {"categoryTitle": "A. Entrada", "songs": [
+            sp.song_entry("01.ven.cho", VEN), {"title": "x", "audioLinks": [], "n": None}]},
+        "vacía": {"categoryTitle": "B. \"Perdón\"\n", "songs": []},
+    }
+    for data in (payload, {}):
+        out = []
+        stream = sp.PayloadStream(out.append)
+        for k, v in data.items():
+            stream.add(k, v)
+        stream.close()
+        assert "".join(out) == sp.dumps_payload(data)
+
+
+def test_firebase_writer_streams_put():
+    import http.server
+    import threading
+
+    received = {}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = received.get(self.path.split("?")[0], b"null")
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_PUT(self):
+            n = int(self.headers["Content-Length"])
+            received[self.path.split("?")[0]] = self.rfile.read(n)
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"null")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            songs = _tree(Path(tmp))
+            fb = sp.FirebaseWriter(f"http://127.0.0.1:{server.server_port}", "tok")
+            mem = sp.MemoryWriter()
+            sp.build(str(songs), [fb, mem])
+            assert received["/songs/data.json"].decode("utf-8") == mem.files["songs-v2.json"]
+            assert received["/songs/searchIndex.json"].decode("utf-8") == mem.files["songs-v2.search.json"]
+            assert int(received["/songs/updatedAt.json"]) > 0
+            assert json.loads(received["/songs/contentHash.json"]) == mem.content_hash
+            remote = json.loads(received["/songs/manifest.json"])
+            assert remote == {"contentHash": mem.content_hash, "categories": mem.categories}
+            assert remote["categories"]["entrada"]["hash"] == mem.payload["entrada"]["hash"]
+            received.pop("/songs/data.json")
+            sp.build(str(songs), [fb])                  # mismo hash en Firebase → no sube
+            assert "/songs/data.json" not in received
+            path = songs / "songs-v1.9.json"
+            fb.put_file("songs/data", str(path))
+            assert received["/songs/data.json"] == path.read_bytes()
+    finally:
+        server.shutdown()
+
+
+def test_writer_is_abstract():
+    class Partial(sp.Writer):
+        def begin(self, name):
+            pass
+
+    for cls in (sp.Writer, Partial):
+        try:
+            cls()
+            assert False, cls
+        except TypeError:
+            pass
+    assert isinstance(sp.MemoryWriter(), sp.Writer)
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del arranque del admin (admin/startup.py): importadores perezosos,
+precarga en segundo plano e informe de tiempos.
+
+Corre sin dependencias:  python scripts/test_startup.py
+(También vale con pytest:  pytest scripts/test_startup.py)
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+import startup as st  # noqa: E402
+
+
+def test_lazy_module_imports_on_first_use():
+    report = st.StartupReport()
+    mod = st.LazyModule("colorsys", report)
+    assert not mod.loaded and "import colorsys" not in report.as_dict()
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert mod.loaded and report.as_dict()["import colorsys"]["ms"] >= 0
+    assert mod.load() is sys.modules["colorsys"]
+
+
+def test_warm_up_records_phases_and_survives_errors():
+    report = st.StartupReport()
+    seen = []
+
+    def boom():
+        raise SystemExit("sin docx")
+
+    w = st.WarmUp([("a", lambda: seen.append("a")), ("roto", boom),
+                   ("b", lambda: seen.append("b"))], report)
+    assert w.state == "off"
+    assert w.start().wait(5) and w.state == "done"
+    phases = report.as_dict()
+    assert seen == ["a", "b"] and "sin docx" in phases["roto"]["error"]
+    assert "ms" not in phases["precarga completa"]
+    assert report.format().startswith("a ") and "roto" in report.format()
+
+
+def test_server_import_does_not_load_importers():
+    code = ("import sys; sys.path.insert(0, %r); import server; "
+            "print(sorted(m for m in ('docx2chordpro', 'latex_import', 'doceacordes_import') "
+            "if m in sys.modules))" % str(SCRIPTS_DIR / "admin"))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         env={**os.environ, "CANTORAL_ADMIN_WARMUP": "0"}, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "[]"
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -152,6 +152,138 @@ def test_conflict_ignores_only_whitespace_and_media():
     )
     assert sync.content_conflict({"contentOld": old, "contentNew": "x"}, CHO) is False
 
+def test_conflict_hash_old_shortcut():
+    # hashOld igual al `hash` del .cho actual -> sin conflicto aunque contentOld difiera
+    h = sync.sp.song_entry("01.ven.cho", CHO)["hash"]
+    ed = {"filename": "01.ven.cho", "hashOld": h, "contentOld": "viejo", "contentNew": "x"}
+    assert sync.content_conflict(ed, CHO) is False
+    # hash distinto -> se decide comparando cuerpos
+    ed["hashOld"] = "0" * 16
+    assert sync.content_conflict(ed, CHO) is True
+
+def test_hash_old_entry_computed_once_per_text():
+    calls = []
+    orig = sync.sp.song_entry
+    sync.sp.song_entry = lambda f, t: calls.append(f) or orig(f, t)
+    try:
+        ed = {"filename": "01.ven.cho", "hashOld": "0" * 16,
+              "contentOld": "{title: X}\n[C]vieja\n", "contentNew": "x"}
+        _, outcomes = sync.merge_editions([(str(i), dict(ed)) for i in range(4)], CHO)
+        assert [st for _, st in outcomes] == ["conflict"] * 4 and calls == ["01.ven.cho"]
+    finally:
+        sync.sp.song_entry = orig
+
+
+def test_conflict_content_old_hash():
+    # contentOldHash se compara directamente con el hash del cuerpo actual
+    h = sync.body_hash(cp.strip_media(CHO) + "   \n\n")   # normalizado = mismo hash
+    assert h == sync.body_hash(CHO)
+    assert sync.content_conflict({"contentOldHash": h, "contentNew": "x"}, CHO) is False
+    ed = {"contentOldHash": "f" * 64, "contentOld": cp.strip_media(CHO), "contentNew": "x"}
+    assert sync.content_conflict(ed, CHO) is True                 # manda el hash
+
+def test_cho_cache_reads_once():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "01.ven.cho"
+        path.write_text(CHO, encoding="utf-8")
+        files = sync.ChoCache()
+        assert files.read(path) == CHO
+        path.write_text("otro", encoding="utf-8")               # no se relee
+        hashes = files.hashes(path)
+        assert hashes.body == sync.body_hash(CHO) and files.hashes(path) is hashes
+        files.write(path, "nuevo\n")
+        assert files.read(path) == "nuevo\n" == path.read_text(encoding="utf-8")
+        assert files.hashes(path).body == sync.body_hash("nuevo\n")
+
+
+# ── sync: ediciones agrupadas por fichero ──────────────────────────────────────
+def test_group_by_file_orders_by_timestamp():
+    import json, tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        songs = Path(tmp)
+        (songs / "A. Entrada").mkdir()
+        (songs / "A. Entrada" / "01.ven.cho").write_text(CHO, encoding="utf-8")
+        (songs / "A. Entrada" / "02.otra.cho").write_text("{title: Otra}\n", encoding="utf-8")
+        (songs / "indice.json").write_text(json.dumps({"entrada": {"categoryTitle": "A. Entrada"}}))
+        letters = sync.load_category_letter_map(songs / "indice.json")
+        eds = [
+            ("-b", {"category": "entrada", "filename": "01.ven.cho", "timestamp": 1}),
+            ("-a", {"category": "entrada", "filename": "01.ven.cho", "timestamp": 2}),
+            ("-c", {"category": "entrada", "filename": "02.otra.cho"}),
+            ("-d", {"category": "entrada", "filename": "99.no.cho"}),
+        ]
+        groups, skipped = sync.group_by_file(eds, songs, letters)
+        ven = songs / "A. Entrada" / "01.ven.cho"
+        assert [i for i, _ in groups[ven]] == ["-b", "-a"]
+        assert len(groups) == 2 and [i for i, _ in skipped] == ["-d"]
+
+def test_merge_editions_in_memory():
+    body = cp.strip_media(CHO)
+    eds = [
+        ("1", {"contentOld": body, "contentNew": body.replace("Ven a", "Vamos a")}),
+        ("2", {"keyOld": "G", "keyNew": "A"}),
+        ("3", {"contentOld": "{title: X}\n[C]vieja\n", "contentNew": "otra"}),   # conflicto
+        ("4", {"keyOld": "A", "keyNew": "A", "capoOld": 2, "capoNew": 2}),        # nada que hacer
+        ("5", {"capoOld": 2, "capoNew": 0}),
+    ]
+    merged, outcomes = sync.merge_editions(eds, CHO)
+    assert outcomes == [("1", "changed"), ("2", "changed"), ("3", "conflict"),
+                        ("4", "noop"), ("5", "changed")]
+    # igual que aplicarlas una a una
+    text = CHO
+    for _, ed in (eds[0], eds[1], eds[4]):
+        text = sync.apply_edition(ed, text)
+    assert merged == text
+    assert "{key: A}" in merged and "{capo: 0}" in merged and "Vamos a" in merged
+    assert "{ritmo: 4x4}" in merged                       # multimedia conservada
+
+def test_merge_editions_hashes_file_once_per_text():
+    body = cp.strip_media(CHO)
+    seen = []
+    orig = sync._norm_body
+    sync._norm_body = lambda t: seen.append(t) or orig(t)
+    sync.body_hash.cache_clear()
+    try:
+        eds = [(str(i), {"contentOldHash": sync.body_hash(CHO), "contentNew": "x",
+                         "contentOld": "y"}) for i in range(5)]
+        seen.clear()
+        sync.body_hash.cache_clear()
+        hashes = sync.TextHashes(CHO)
+        merged, outcomes = sync.merge_editions(eds, CHO, hashes)
+        # la 1ª aplica (texto nuevo → un hash más); las demás son conflicto y
+        # reutilizan el hash del texto ya fusionado
+        assert [st for _, st in outcomes] == ["changed"] + ["conflict"] * 4
+        assert seen == [CHO, merged] and hashes.body == sync.body_hash(CHO)
+    finally:
+        sync._norm_body = orig
+        sync.body_hash.cache_clear()
+
+def test_fb_delete_many_is_one_patch():
+    import http.server, json, threading
+    calls = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_PATCH(self):
+            n = int(self.headers["Content-Length"])
+            calls.append((self.path.split("?")[0], json.loads(self.rfile.read(n))))
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"null")
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_port}"
+        sync.fb_delete_many(base, "songs/ediciones", ["-a", "-b", "-c"], chunk=2)
+    finally:
+        server.shutdown()
+    assert calls == [("/songs/ediciones.json", {"-a": None, "-b": None}),
+                     ("/songs/ediciones.json", {"-c": None})]
+
 
 # ── runner sin pytest ───────────────────────────────────────────────────────────
 def _run():
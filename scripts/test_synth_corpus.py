@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del generador de corpus sintéticos (synth_corpus.py): lo generado
+tiene que poder leerse con las mismas herramientas que el corpus real.
+
+Corre sin dependencias:  python scripts/test_synth_corpus.py
+(También vale con pytest:  pytest scripts/test_synth_corpus.py)
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR / "admin"))
+
+import chordpro as cp  # noqa: E402
+import synth_corpus as sc  # noqa: E402
+
+
+def test_cho_corpus_is_deterministic_and_parseable():
+    with tempfile.TemporaryDirectory() as tmp:
+        a = sc.write_cho_corpus(Path(tmp) / "a", 40, seed=3)
+        b = sc.write_cho_corpus(Path(tmp) / "b", 40, seed=3)
+        assert [p.name for p in a] == [p.name for p in b]
+        assert a[5].read_text(encoding="utf-8") == b[5].read_text(encoding="utf-8")
+        assert (Path(tmp) / "a" / "indice.json").exists()
+        text = a[0].read_text(encoding="utf-8")
+        meta = cp.parse_basic_meta(text)
+        assert meta["title"] and meta["author"] and meta["key"]
+        assert "[" in cp.strip_media(text) and "{soc}" in text
+        letters = {p.parent.name.split(".")[0] for p in a}
+        assert len(letters) > 5                      # repartidas por categorías
+
+
+def test_es_chord():
+    assert sc.es_chord("C") == "DO"
+    assert sc.es_chord("Am") == "lam"
+    assert sc.es_chord("F#m") == "fa#m"
+    assert sc.es_chord("E7") == "MI7"
+
+
+def test_docx_corpus_reads_with_docx2chordpro():
+    import docx2chordpro as d2c
+    with tempfile.TemporaryDirectory() as tmp:
+        path = sc.write_docx_corpus(Path(tmp) / sc.DOCX_NAME, 6)
+        songs = d2c.split_into_songs(d2c.load_paragraphs(path))
+        assert len(songs) == 6
+        conv = d2c.convert_song(songs[0])
+        assert conv["title"] and "[" in d2c.render_cho(conv)
+        assert d2c.section_letter(songs[0]["section"])
+
+
+def test_tex_corpus_reads_with_latex_import():
+    import latex_import as lx
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = sc.write_tex_corpus(Path(tmp) / "input", 4)
+        parsed = lx.parse_latex_song(paths[0])
+        assert parsed["title"] and parsed["artist"]
+        assert parsed["unknown_chords"] == [] and "[" in parsed["body"]
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
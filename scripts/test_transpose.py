@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests del motor de transposición (transpose.py).
+
+Corre sin dependencias:  python scripts/test_transpose.py
+(También vale con pytest:  pytest scripts/test_transpose.py)
+"""
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import transpose as tp  # noqa: E402
+
+SONG = (
+    "{title: Ven a Celebrar}\n"
+    "{key: G}\n"
+    "{comment: [G] aquí no se toca}\n"
+    "\n"
+    "[G]Ven a cele[D/F#]brar el [Em7]amor [C-D]de Dios [N.C.]\n"
+)
+
+
+# ── acordes sueltos ────────────────────────────────────────────────────────────
+def test_transpose_chord():
+    assert tp.transpose_chord("Dm7/F#", 2) == "Em7/G#"
+    assert tp.transpose_chord("C-D", 2) == "D-E"
+    assert tp.transpose_chord("Bb", 1, use_flats=False) == "B"
+    assert tp.transpose_chord("N.C.", 3) == "N.C."        # no es acorde: intacto
+
+
+def test_transposed_key_spelling():
+    assert tp.transposed_key("G", 3) == ("Bb", True)
+    assert tp.transposed_key("Em", -2) == ("Dm", False)
+    assert tp.transposed_key("A", 1) == ("Bb", True)
+    assert tp.transposed_key("Am", 4) == ("C#m", False)
+    assert tp.semitones_between("G", "F") == -2
+    assert tp.semitones_between("C", "xx") is None
+
+
+# ── tabla por canción ──────────────────────────────────────────────────────────
+def test_table_transpose_and_to_key():
+    table = tp.ChordTable.from_text(SONG)
+    assert table.key == "G" and len(table) == 4
+    out = table.transpose(3)
+    assert "{key: Bb}" in out
+    assert "[Bb]Ven a cele[F/A]brar el [Gm7]amor [Eb-F]de Dios [N.C.]" in out
+    assert "{comment: [G] aquí no se toca}" in out
+    assert table.to_key("A") == table.transpose(2)
+    assert table.transpose(0) == SONG and table.transpose(-12) == SONG
+
+
+def test_table_roundtrip_preserves_text():
+    table = tp.ChordTable.from_text(SONG)
+    assert tp.ChordTable.from_text(table.transpose(2)).transpose(-2) == SONG
+
+
+def test_apply_transpose_directive():
+    text = "{title: X}\n{key: C}\n{transpose: -2}\n[C]a [G7]b\n"
+    out, semis = tp.apply_transpose_directive(text)
+    assert semis == -2
+    assert out == "{title: X}\n{key: Bb}\n[Bb]a [F7]b\n"
+    assert tp.apply_transpose_directive(SONG) == (SONG, 0)
+
+
+def test_cache_invalidates_on_change():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        p = Path(tmp) / "01.x.cho"
+        p.write_text(SONG, encoding="utf-8")
+        cache = tp.ChordTableCache()
+        first = cache.get(p)
+        assert cache.get(p) is first
+        p.write_text(SONG.replace("{key: G}", "{key: A}") + "[E]\n", encoding="utf-8")
+        assert cache.get(p).key == "A"
+
+
+# ── runner sin pytest ───────────────────────────────────────────────────────────
+def _run():
+    tests = [v for k, v in sorted(globals().items())
+             if k.startswith("test_") and callable(v)]
+    passed = 0
+    for t in tests:
+        t()
+        print(f"  ✓ {t.__name__}")
+        passed += 1
+    print(f"\n✅ {passed}/{len(tests)} tests OK")
+
+if __name__ == "__main__":
+    _run()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Motor de transposición de acordes para los .cho del cantoral.
+
+Cada canción se analiza UNA vez a una `ChordTable`: el texto queda partido en
+trozos literales y "huecos" (los [acordes] y el valor de {key:}), y cada acorde
+se guarda ya descompuesto en notas (índice cromático 0–11) y sufijos. Transponer
+a cualquier tono es entonces solo sustituir los huecos, sin volver a parsear.
+
+Gramática de acordes: la misma que emiten los importadores (docx/LaTeX/doce) y
+que usa el editor del admin (app.js): raíz [A-G] + alteración opcional (#/b),
+sufijo libre y bajo opcional tras '/'. Los acordes compuestos con guion
+(«C-D») se transponen por partes. Lo que no encaja («N.C.», «x2»…) se deja
+intacto. Las líneas de directiva no se tocan, salvo el valor de {key:}.
+
+La elección de sostenidos/bemoles sigue la convención del tono destino
+(`transposed_key`), igual que el editor.
+
+Uso:
+  python scripts/transpose.py "songs/A. Entrada/01.ven.cho" +2
+  python scripts/transpose.py "songs/A. Entrada/01.ven.cho" --to-key Bb
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# ─────────── Notas ─────────── #
+
+NOTES_SHARP = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+NOTES_FLAT = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+NOTE_INDEX: Dict[str, int] = {
+    "C": 0, "C#": 1, "Db": 1, "D": 2, "D#": 3, "Eb": 3, "E": 4, "Fb": 4, "E#": 5,
+    "F": 5, "F#": 6, "Gb": 6, "G": 7, "G#": 8, "Ab": 8, "A": 9, "A#": 10, "Bb": 10,
+    "B": 11, "Cb": 11, "B#": 0,
+}
+# Tonos que se escriben con bemoles (por la tónica ya escrita en bemol)
+FLAT_MAJOR = {"F", "Bb", "Eb", "Ab", "Db", "Gb", "Cb"}
+FLAT_MINOR = {"D", "G", "C", "F", "Bb", "Eb", "Ab"}
+
+_NOTE_RX = re.compile(r"^([A-G][#b]?)(.*)$")
+_KEY_RX = re.compile(r"^([A-G][#b]?)(m?)(.*)$")
+
+# Un solo barrido: líneas de directiva completas (para saltarlas o capturar
+# {key:}) o acordes entre corchetes.
+_SCAN_RX = re.compile(
+    r"(?P<dir>^[ \t]*\{[^\n]*)|\[(?P<chord>[^\]\n]*)\]",
+    re.MULTILINE,
+)
+_KEY_DIRECTIVE_RX = re.compile(r"^[ \t]*\{\s*key\s*:\s*(?P<val>[^}]*?)\s*\}", re.IGNORECASE)
+_TRANSPOSE_DIRECTIVE_RX = re.compile(
+    r"^[ \t]*\{\s*transpose\s*:\s*([+-]?\d+)\s*\}[ \t]*\n?", re.IGNORECASE | re.MULTILINE
+)
+
+# Parte de un acorde ya analizado: int = nota (0–11), str = texto literal
+Part = Union[int, str]
+
+
+def note_name(idx: int, use_flats: bool) -> str:
+    return (NOTES_FLAT if use_flats else NOTES_SHARP)[idx % 12]
+
+
+def normalize_semis(semis: int) -> int:
+    """Lleva un intervalo a -6..+6 (el camino más corto)."""
+    semis %= 12
+    return semis - 12 if semis > 6 else semis
+
+
+def semitones_between(from_key: str, to_key: str) -> Optional[int]:
+    """Semitonos (-6..+6) de un tono a otro; None si alguno no se reconoce."""
+    fm = _KEY_RX.match((from_key or "").strip())
+    tm = _KEY_RX.match((to_key or "").strip())
+    if not fm or not tm:
+        return None
+    fi, ti = NOTE_INDEX.get(fm.group(1)), NOTE_INDEX.get(tm.group(1))
+    if fi is None or ti is None:
+        return None
+    return normalize_semis(ti - fi)
+
+
+def transposed_key(key: str, semis: int) -> Optional[Tuple[str, bool]]:
+    """Nuevo tono tras transponer y si se escribe con bemoles: ("Bb", True).
+
+    None si `key` no es un tono reconocible."""
+    m = _KEY_RX.match((key or "").strip())
+    if not m or m.group(1) not in NOTE_INDEX:
+        return None
+    root, minor, suffix = m.group(1), m.group(2) == "m", m.group(3)
+    idx = NOTE_INDEX[root] + semis
+    sharp, flat = note_name(idx, False), note_name(idx, True)
+    if sharp == flat:
+        use_flats = root.endswith("b")  # nota natural: respeta el spelling original
+    else:
+        use_flats = flat in (FLAT_MINOR if minor else FLAT_MAJOR)
+    tonic = flat if use_flats else sharp
+    return tonic + ("m" if minor else "") + suffix, use_flats
+
+
+# ─────────── Análisis de un acorde ─────────── #
+
+def _parse_simple(tok: str) -> Optional[List[Part]]:
+    """«Dm7/F#» → [2, "m7", "/", 6, ""]; None si no es un acorde."""
+    head, sep, bass = tok.partition("/")
+    m = _NOTE_RX.match(head)
+    if not m or m.group(1) not in NOTE_INDEX or any(c.isspace() for c in head):
+        return None
+    parts: List[Part] = [NOTE_INDEX[m.group(1)], m.group(2)]
+    if sep:
+        bm = _NOTE_RX.match(bass)
+        if not bm or bm.group(1) not in NOTE_INDEX:
+            return None
+        parts += ["/", NOTE_INDEX[bm.group(1)], bm.group(2)]
+    return parts
+
+
+def parse_chord(text: str) -> Optional[Tuple[Part, ...]]:
+    """Descompone el texto de un acorde en partes transponibles.
+
+    Soporta compuestos con guion («C-D») y espacios alrededor («[ G ]»).
+    Devuelve None si alguna parte no es un acorde: se deja literal."""
+    lead = text[:len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    core = text.strip()
+    if not core:
+        return None
+    parts: List[Part] = [lead] if lead else []
+    for i, tok in enumerate(core.split("-")):
+        sub = _parse_simple(tok)
+        if sub is None:
+            return None
+        if i:
+            parts.append("-")
+        parts.extend(sub)
+    if trail:
+        parts.append(trail)
+    return tuple(parts)
+
+
+def render_chord(parts: Tuple[Part, ...], semis: int, use_flats: bool) -> str:
+    return "".join(note_name(p + semis, use_flats) if isinstance(p, int) else p
+                   for p in parts)
+
+
+def transpose_chord(text: str, semis: int, use_flats: bool = False) -> str:
+    """Transpone el texto de un acorde suelto («Dm7/F#», +2 → «Em7/G#»)."""
+    parts = parse_chord(text)
+    return text if parts is None else render_chord(parts, semis, use_flats)
+
+
+# ─────────── Tabla de acordes de una canción ─────────── #
+
+class ChordTable:
+    """Canción pre-analizada: literales + huecos transponibles.
+
+    `literals` tiene siempre un elemento más que `slots`; el texto es
+    literals[0] + slot[0] + literals[1] + … . Cada slot es ("c", partes) para un
+    acorde o ("k", tono) para el valor de {key:}."""
+
+    __slots__ = ("literals", "slots", "key", "text")
+
+    def __init__(self, literals: List[str], slots: List[Tuple[str, object]], key: str,
+                 text: str) -> None:
+        self.literals = literals
+        self.slots = slots
+        self.key = key
+        self.text = text
+
+    @classmethod
+    def from_text(cls, text: str) -> "ChordTable":
+        literals: List[str] = []
+        slots: List[Tuple[str, object]] = []
+        key = ""
+        last = 0
+        for m in _SCAN_RX.finditer(text):
+            if m.group("dir") is not None:
+                km = _KEY_DIRECTIVE_RX.match(m.group("dir"))
+                if not km or not km.group("val"):
+                    continue
+                start, end = m.start() + km.start("val"), m.start() + km.end("val")
+                if not key:
+                    key = km.group("val")
+                literals.append(text[last:start])
+                slots.append(("k", km.group("val")))
+                last = end
+                continue
+            parts = parse_chord(m.group("chord"))
+            if parts is None:
+                continue  # acorde no reconocido: queda dentro del literal
+            start, end = m.start("chord"), m.end("chord")
+            literals.append(text[last:start])
+            slots.append(("c", parts))
+            last = end
+        literals.append(text[last:])
+        return cls(literals, slots, key, text)
+
+    def __len__(self) -> int:
+        """Número de acordes transponibles."""
+        return sum(1 for kind, _ in self.slots if kind == "c")
+
+    def chords(self) -> List[str]:
+        return [render_chord(p, 0, False) for kind, p in self.slots if kind == "c"]  # type: ignore[arg-type]
+
+    def spelling_for(self, semis: int) -> Tuple[str, bool]:
+        """(nuevo tono, usar bemoles) para un desplazamiento dado."""
+        tk = transposed_key(self.key, semis) if self.key else None
+        if tk:
+            return tk
+        return "", semis < 0
+
+    def transpose(self, semis: int, use_flats: Optional[bool] = None) -> str:
+        """Texto completo transpuesto `semis` semitonos (también el {key:})."""
+        if semis % 12 == 0 and use_flats is None:
+            return self.text  # mismo tono: se respeta el spelling original
+        new_key, flats = self.spelling_for(semis)
+        if use_flats is not None:
+            flats = use_flats
+        out = [self.literals[0]]
+        for (kind, val), lit in zip(self.slots, self.literals[1:]):
+            if kind == "c":
+                out.append(render_chord(val, semis, flats))  # type: ignore[arg-type]
+            else:
+                tk = transposed_key(val, semis)  # type: ignore[arg-type]
+                out.append(tk[0] if tk else val)  # type: ignore[arg-type]
+            out.append(lit)
+        return "".join(out)
+
+    def to_key(self, target_key: str) -> str:
+        """Texto transpuesto hasta `target_key` (ValueError si no hay {key:} válido)."""
+        semis = semitones_between(self.key, target_key)
+        if semis is None:
+            raise ValueError(f"No se puede transponer de {self.key!r} a {target_key!r}")
+        return self.transpose(semis)
+
+
+# ─────────── Caché de tablas por fichero ─────────── #
+
+class ChordTableCache:
+    """Tablas por ruta, invalidadas por (mtime, tamaño) del fichero."""
+
+    def __init__(self) -> None:
+        self._tables: Dict[str, Tuple[Tuple[int, int], ChordTable]] = {}
+
+    def get(self, path: Path) -> ChordTable:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = self._tables.get(str(path))
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        table = ChordTable.from_text(path.read_text(encoding="utf-8"))
+        self._tables[str(path)] = (stamp, table)
+        return table
+
+    def put(self, path: Path, text: str) -> ChordTable:
+        """Registra una tabla para un texto recién escrito (evita releerlo)."""
+        st = path.stat()
+        table = ChordTable.from_text(text)
+        self._tables[str(path)] = ((st.st_mtime_ns, st.st_size), table)
+        return table
+
+    def discard(self, path: Path) -> None:
+        self._tables.pop(str(path), None)
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+
+# ─────────── Directiva {transpose: N} (build) ─────────── #
+
+def transpose_directive(text: str) -> int:
+    """Valor de la primera {transpose: N} del texto (0 si no hay)."""
+    m = _TRANSPOSE_DIRECTIVE_RX.search(text)
+    return int(m.group(1)) if m else 0
+
+
+def apply_transpose_directive(text: str) -> Tuple[str, int]:
+    """Aplica {transpose: N}: devuelve (texto transpuesto sin la directiva, N).
+
+    Pensado para `crear_songs_json.py`: la app recibe los acordes ya en el tono
+    final y no necesita entender la directiva."""
+    semis = transpose_directive(text)
+    if not semis:
+        return text, 0
+    body = _TRANSPOSE_DIRECTIVE_RX.sub("", text)
+    return ChordTable.from_text(body).transpose(semis), semis
+
+
+# ─────────── CLI ─────────── #
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Transpone un .cho")
+    parser.add_argument("path", help="Fichero .cho")
+    parser.add_argument("semis", nargs="?", type=int, default=0, help="Semitonos (+/-)")
+    parser.add_argument("--to-key", help="Tono destino (en vez de semitonos)")
+    parser.add_argument("--write", action="store_true", help="Sobrescribe el fichero")
+    args = parser.parse_args(argv)
+
+    path = Path(args.path)
+    table = ChordTable.from_text(path.read_text(encoding="utf-8"))
+    try:
+        out = table.to_key(args.to_key) if args.to_key else table.transpose(args.semis)
+    except ValueError as e:
+        print(f"💥 {e}", file=sys.stderr)
+        sys.exit(1)
+    if args.write:
+        path.write_text(out, encoding="utf-8")
+        print(f"✅ {os.fspath(path)} transpuesto ({len(table)} acordes)")
+    else:
+        sys.stdout.write(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,10 @@
 import os
-import urllib.request
-import urllib.error
-import time
-import re
+
+import songs_payload as sp
 
 
 def find_latest_version(songs_dir):
-    version_pattern = re.compile(r'^songs-v(\d+)(?:\.(\d+))?\.json$')
-    versions = []
-    for fname in os.listdir(songs_dir):
-        m = version_pattern.match(fname)
-        if m:
-            major = int(m.group(1))
-            minor = int(m.group(2)) if m.group(2) else 0
-            versions.append((major, minor, fname))
-    if not versions:
-        raise RuntimeError('No songs versions found')
-    versions.sort()
-    return versions[-1][2]  # return filename of latest version
+    return sp.latest_version_file(songs_dir)  # return filename of latest version
 
 
 def main():
@@ -27,24 +14,34 @@ def main():
 
     latest_file = find_latest_version(songs_dir)
     json_path = os.path.join(songs_dir, latest_file)
-
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = f.read().encode('utf-8')
-
-    def request(url, body):
-        req = urllib.request.Request(url, data=body, method='PUT', headers={'Content-Type': 'application/json'})
-        with urllib.request.urlopen(req) as resp:
-            if resp.status < 200 or resp.status >= 300:
-                raise RuntimeError(f"Request to {url} failed with status {resp.status}")
-            resp.read()
-    # Update songs/data
-    url_data = f"{firebase_url}/songs/data.json?auth={token}"
-    request(url_data, data)
-
-    # Update songs/updatedAt with Unix timestamp
-    timestamp = str(int(time.time()))
-    url_time = f"{firebase_url}/songs/updatedAt.json?auth={token}"
-    request(url_time, timestamp.encode('utf-8'))
+    fb = sp.FirebaseWriter(firebase_url, token, log=print)
+
+    # Si Firebase ya tiene este contenido (songs/contentHash), no se sube nada
+    # y songs/updatedAt no cambia: la app no vuelve a descargar.
+    manifest = sp.load_manifest(songs_dir)
+    content_hash = manifest.get('contentHash')
+    if manifest.get('file') != latest_file or not content_hash:
+        manifest = {}
+        content_hash = sp.file_hash(json_path)
+    if fb.up_to_date(content_hash):
+        return
+
+    # Update songs/data: se sube el fichero por bloques, sin cargarlo en memoria
+    fb.put_file('songs/data', json_path)
+
+    # Update songs/searchIndex (índice precalculado de la misma versión, si existe)
+    index_path = os.path.join(songs_dir, latest_file[:-len('.json')] + '.search.json')
+    if os.path.exists(index_path):
+        fb.put_file('songs/searchIndex', index_path)
+
+    # songs/manifest: hashes por categoría y canción (solo si el manifiesto
+    # local corresponde a este fichero)
+    if manifest.get('categories'):
+        fb.put_manifest(content_hash, manifest['categories'])
+
+    # songs/contentHash y, por último, songs/updatedAt con el timestamp Unix
+    fb.put_hash(content_hash)
+    fb.put_updated_at()
 
 
 if __name__ == '__main__':